@@ -0,0 +1,30 @@
+"""MAG 7+2 Dark Pool & Short Interest 분석 엔진 (Streamlit 없이 import 가능)"""
+from .backtest import backtest_signals, forward_returns, run_backtest, signal_matrices
+from .cache import SharedCache, cached, get_shared_cache
+from .charts import (
+    OVERVIEW_FIGURES, RESOLUTION_LABELS, data_version, history_figure, line_trace, lttb_indices, rollup_trend_figure,
+    window_label
+)
+from .config import LONG_HORIZON_SNAPSHOT_DAYS, LONG_HORIZON_YEARS, MAG7_STOCKS
+from .cross_section import (
+    CROSS_SECTION_METRICS, SCORE_COLUMNS, cross_sectional_scores, latest_scores, percentile_ranks, robust_zscores,
+    rolling_zscores
+)
+from .engine import compute_analysis, compute_screener, get_universe_store
+from .fetch import (
+    MarketDataStore, ShortInterestProvider, collect_market_data, get_market_store, get_short_interest_provider,
+    get_symbol_index, load_finra_universe, load_short_interest_table, rebuild_symbol_index
+)
+from .metrics import (
+    attach_cross_section, attach_short_info, build_metrics_panel, build_screener, daily_metrics, finalize_rollups, latest_snapshot,
+    rollup_sums, ticker_history
+)
+from .partitions import PanelPartitions, get_panel_partitions, warm_partitions
+from .rolling import RollingMetricsStore
+from .rollups import RollupStore
+from .scheduler import PrecomputeScheduler, ResultStore, is_current
+from .signals import (
+    INSIGHT_RULES, SIGNAL_RULES, assign_signals, insight_lines, move_spans, sharp_moves, signal_codes, signal_masks
+)
+from .symbol_index import SymbolIndex
+from .trading_calendar import get_trading_dates, latest_published_date, trading_dates_between
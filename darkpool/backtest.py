@@ -0,0 +1,142 @@
+"""시그널 백테스트: 과거 전 거래일 × 종목에 신호 규칙을 적용하고 이후 수익률로 검증 (날짜 × 종목 행렬 연산)"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .config import BACKTEST_HORIZONS, MAG7_STOCKS, PRICE_DOWNLOAD_CHUNK
+from .cross_section import observation_means
+from .fetch import (
+    fetch_price_history, get_fetch_engine, get_symbol_index, load_short_interest_history, update_symbol_index
+)
+from .signals import DEFAULT_SIGNAL, SIGNAL_RULES, signal_codes
+
+BASELINE_LABEL = '📊 전체 (기준)'
+
+def signal_matrices(short, total, market_vol, dtc):
+    """거래일 × 종목 행렬 → 신호 입력 지표 행렬 (daily_metrics 와 같은 계산, 거래가 없는 칸은 NaN)
+
+    10일 평균은 daily_metrics 와 같이 종목별 최근 10개 관측치 (거래가 없는 칸은 건너뜀).
+    """
+    valid = (market_vol > 0) & (total > 0)
+    short, total, market_vol = short.where(valid), total.where(valid), market_vol.where(valid)
+
+    dp_short_ratio = (short / total * 100).round(2)
+    return {
+        'dp_ratio': (total / market_vol * 100).clip(upper=100).round(2),
+        'dp_short_ratio': dp_short_ratio,
+        'dp_short_change_pct': dp_short_ratio - observation_means(dp_short_ratio.to_numpy(dtype=float), 10),
+        'yf_short_ratio_days': dtc
+    }
+
+def dtc_matrix(tables, dates, symbols):
+    """게시일별 공매도 잔고 표 → 거래일 × 종목 Days to Cover (각 거래일에 이미 게시된 가장 최근 값)"""
+    if not tables:
+        return pd.DataFrame(np.nan, index=dates, columns=symbols)
+    dtc = pd.DataFrame({published: df['days_to_cover'] for published, df in tables.items()}).T.sort_index()
+    dtc = dtc.reindex(columns=symbols)
+    # 게시일 행 전체를 기준으로 이어 씀 (최근 표에서 빠진 종목에 예전 값이 남지 않도록)
+    return dtc.reindex(dates, method='ffill')
+
+def forward_returns(close, horizon):
+    """신호일 다음 거래일 종가 진입 → horizon 거래일 뒤 수익률, 보유 기간 최저/최고 종가 기준 수익률 (%)
+
+    FINRA 일일 파일은 장 마감 후 게시되므로 신호일 종가로는 진입할 수 없다.
+    마지막 horizon + 1 거래일과 보유 중 종가가 빠진 칸은 NaN.
+    """
+    # 행 단위로 밀어 비교하므로 행 우선 배열로 변환 (DataFrame 값은 열 우선일 수 있음)
+    values = np.ascontiguousarray(close.to_numpy(dtype=float))
+    n = len(values) - 1 - horizon
+    ret, low, high = (np.full(values.shape, np.nan) for _ in range(3))
+    if n > 0:
+        entry = values[1:n + 1]
+        # 신호일 t 의 보유 구간은 t+2 ~ t+1+horizon 행 — 보유 일수만큼 한 칸씩 민 행렬과 비교 (빈 칸은 NaN 전파)
+        path_low, path_high = values[2:n + 2].copy(), values[2:n + 2].copy()
+        for k in range(3, horizon + 2):
+            np.minimum(path_low, values[k:n + k], out=path_low)
+            np.maximum(path_high, values[k:n + k], out=path_high)
+        ret[:n] = values[1 + horizon:] / entry
+        low[:n] = path_low / entry
+        high[:n] = path_high / entry
+    return tuple(pd.DataFrame((m - 1) * 100, index=close.index, columns=close.columns) for m in (ret, low, high))
+
+def backtest_signals(metrics, close, horizons=BACKTEST_HORIZONS, rules=SIGNAL_RULES):
+    """신호 지표 행렬 + 종가 행렬 → 신호 × 보유 기간별 적중률·평균 수익률·낙폭
+
+    적중은 신호 방향(direction)으로 움직인 경우, 낙폭은 보유 중 신호 방향과 반대로 가장 크게 움직인 폭 (%).
+    기준 행은 신호와 무관한 전체 종목·거래일 (상승 방향 기준).
+    """
+    codes, ordered = signal_codes(pd.DataFrame({k: m.to_numpy(dtype=float).ravel() for k, m in metrics.items()}),
+                                  rules)
+    codes = np.where(codes < 0, len(ordered), codes)
+    names = [r['name'] for r in ordered] + [DEFAULT_SIGNAL]
+    direction = np.array([r.get('direction', 1) for r in ordered] + [1])
+
+    # 신호 번호순 정렬 위치 (보유 기간마다 유효 칸만 골라 구간별로 통계)
+    order = np.argsort(codes, kind='stable')
+    rows = []
+    for horizon in horizons:
+        ret, low, high = (m.to_numpy(dtype=float).ravel()[order] for m in forward_returns(close, horizon))
+        valid = np.isfinite(ret) & np.isfinite(low) & np.isfinite(high)
+        code, ret, low, high = codes[order][valid], ret[valid], low[valid], high[valid]
+        sign = direction[code]
+        hit = sign * ret > 0
+        drawdown = np.where(sign > 0, np.minimum(low, 0), -np.maximum(high, 0))
+
+        bounds = np.searchsorted(code, np.arange(len(names) + 1))
+        for i, name in enumerate(names):
+            lo, hi = bounds[i], bounds[i + 1]
+            rows.append({'signal': name, 'direction': direction[i], 'horizon': horizon,
+                         **_event_stats(ret[lo:hi], hit[lo:hi], drawdown[lo:hi])})
+        rows.append({'signal': BASELINE_LABEL, 'direction': 1, 'horizon': horizon,
+                     **_event_stats(ret, ret > 0, np.minimum(low, 0))})
+
+    summary = pd.DataFrame(rows)
+    columns = ['hit_rate', 'avg_return', 'median_return', 'avg_drawdown', 'max_drawdown']
+    summary[columns] = summary[columns].round(2)
+    return summary
+
+def _event_stats(ret, hit, drawdown):
+    """신호 발생 칸들의 적중률·평균/중앙 수익률·평균/최대 낙폭 (%) — 발생이 없으면 NaN"""
+    if not len(ret):
+        return {'events': 0, 'hit_rate': np.nan, 'avg_return': np.nan, 'median_return': np.nan,
+                'avg_drawdown': np.nan, 'max_drawdown': np.nan}
+    return {'events': len(ret), 'hit_rate': hit.mean() * 100, 'avg_return': ret.mean(),
+            'median_return': np.median(ret), 'avg_drawdown': drawdown.mean(), 'max_drawdown': drawdown.min()}
+
+def load_prices(tickers, start):
+    """Yahoo 수정 종가 + 시장 거래량 (PRICE_DOWNLOAD_CHUNK 종목씩 병렬 수집) → (종가 행렬, 거래량 행렬)"""
+    engine = get_fetch_engine()
+    tickers = list(tickers)
+    futures = [engine.submit(fetch_price_history, engine, tickers[i:i + PRICE_DOWNLOAD_CHUNK], start, None,
+                             ('Adj Close', 'Volume'))
+               for i in range(0, len(tickers), PRICE_DOWNLOAD_CHUNK)]
+    parts = [p for p in (f.result() for f in futures) if p is not None]
+    if not parts:
+        return None, None
+    return tuple(pd.concat([p[field] for p in parts], axis=1) for field in ('Adj Close', 'Volume'))
+
+def run_backtest(tickers=None, days_back=365, top=None, horizons=BACKTEST_HORIZONS):
+    """종목 인덱스 + Yahoo 시세 + FINRA 공매도 잔고로 전체 기간 신호 백테스트 → 요약 테이블, 데이터 없으면 None
+
+    tickers 가 없으면 top 개의 FINRA 거래량 상위 종목 (top 도 없으면 MAG 7+2).
+    """
+    update_symbol_index(days_back)
+    index = get_symbol_index()
+    start = (datetime.now() - timedelta(days=days_back)).strftime('%Y%m%d')
+    if not tickers:
+        tickers = index.top_symbols(top, start) if top else list(MAG7_STOCKS)
+
+    short, total = index.matrix(tickers, start)
+    if short.empty:
+        return None
+    symbols, dates = short.columns, short.index
+
+    close, market_vol = load_prices(symbols, dates[0])
+    if close is None:
+        return None
+    close = close.reindex(index=dates, columns=symbols)
+    market_vol = market_vol.reindex(index=dates, columns=symbols)
+    dtc = dtc_matrix(load_short_interest_history(dates[0]), dates, symbols)
+
+    return backtest_signals(signal_matrices(short, total, market_vol, dtc), close, horizons)
@@ -0,0 +1,247 @@
+"""프로세스 공유 캐시 (같은 키 동시 요청 합치기 + 만료 항목 즉시 반환 후 백그라운드 갱신)
+
+프로세스 메모리(L1) 뒤에 여러 프로세스·레플리카가 함께 쓰는 백엔드(L2)를 둘 수 있다.
+DARKPOOL_CACHE_URL: memory:// (기본, 프로세스 내), sqlite:///경로, redis://호스트:포트/DB
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .config import (
+    CACHE_MAX_AGE_SECONDS, CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_REFRESH_WORKERS, CACHE_URL,
+    CACHE_VERSION
+)
+
+# redis 패키지가 있을 때만 Redis 호환 백엔드 사용 가능
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# ==================== 공유 백엔드 (L2) ====================
+
+class SQLiteCacheBackend:
+    """로컬 디스크 SQLite 백엔드 (WAL 모드, 같은 호스트의 여러 프로세스가 공유) — 용량/기간 초과 시 오래 안 쓴 항목부터 삭제"""
+
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE_SECONDS):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, stored_at REAL, accessed_at REAL, size INTEGER, value BLOB)'
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT stored_at, value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return row[0], pickle.loads(row[1])
+
+    def set(self, key, stored_at, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                               (key, stored_at, time.time(), len(blob), blob))
+            self._evict()
+
+    def _evict(self):
+        """기간 초과 항목 삭제 후, 총 용량이 넘치면 마지막 사용이 오래된 순으로 삭제"""
+        self._conn.execute('DELETE FROM entries WHERE stored_at < ?', (time.time() - self.max_age,))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY accessed_at').fetchall():
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+
+class RedisCacheBackend:
+    """Redis 호환 서버 백엔드 (여러 호스트의 레플리카가 공유) — 항목마다 만료 시간, 용량 초과는 서버 maxmemory 정책에 맡김"""
+
+    def __init__(self, url, max_age=CACHE_MAX_AGE_SECONDS, prefix='darkpool:'):
+        if redis is None:
+            raise ImportError("redis 패키지가 필요합니다: pip install redis")
+        self.client = redis.Redis.from_url(url)
+        self.max_age = max_age
+        self.prefix = prefix
+
+    def get(self, key):
+        blob = self.client.get(self.prefix + key)
+        return None if blob is None else pickle.loads(blob)
+
+    def set(self, key, stored_at, value):
+        blob = pickle.dumps((stored_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self.prefix + key, blob, ex=int(self.max_age))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+def create_cache_backend(url=CACHE_URL):
+    """캐시 URL → 공유 백엔드 (memory:// 이면 None, 프로세스 메모리만 사용)"""
+    parsed = urlparse(url)
+    if parsed.scheme in ('', 'memory'):
+        return None
+    if parsed.scheme == 'sqlite':
+        return SQLiteCacheBackend(url[len('sqlite:///'):] if url.startswith('sqlite:///') else parsed.path)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        return RedisCacheBackend(url)
+    raise ValueError(f"지원하지 않는 캐시 URL: {url}")
+
+# ==================== 공유 캐시 ====================
+
+class SharedCache:
+    """키별 (저장 시각, 값) 보관 — 같은 키 로드는 한 번만 실행하고 나머지 요청은 그 결과를 기다림
+
+    stale-while-revalidate: TTL 이 지난 항목은 기존 값을 바로 돌려주고 백그라운드에서 새 값으로 교체한다.
+    백엔드가 있으면 L1 에 없거나 만료된 항목을 백엔드에서 먼저 찾고, 새로 로드한 값은 백엔드에도 저장한다.
+    """
+
+    def __init__(self, backend=None, max_entries=CACHE_MAX_ENTRIES, version=CACHE_VERSION,
+                 refresh_workers=CACHE_REFRESH_WORKERS):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.version = version
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='darkpool-cache')
+
+    def backend_key(self, key):
+        """백엔드 저장 키 (버전 포함 — 데이터 형식이 바뀌면 CACHE_VERSION 을 올려 이전 항목 무시)"""
+        return f"v{self.version}:" + hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def _remember(self, key, entry):
+        """L1 저장 (최대 개수 초과 시 오래 안 쓴 항목부터 제거)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key, loader, future, validate=None):
+        """로더 실행 → 성공 시 저장 (실패하면 기존 값 유지, 대기 중인 요청에는 예외 전달)
+
+        validate 가 거짓인 값(수집 실패로 빈 결과 등)은 저장하지 않고 대기 중인 요청에만 돌려준다.
+        """
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        if validate is not None and not validate(value):
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(value)
+            return
+        entry = (time.time(), value)
+        if self.backend is not None:
+            try:
+                self.backend.set(self.backend_key(key), *entry)
+            except Exception:
+                pass
+        with self._lock:
+            self._remember(key, entry)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def _lookup(self, key, ttl):
+        """L1 → (없거나 만료면) 백엔드 순으로 찾은 (저장 시각, 값) 또는 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if self.backend is None or (entry is not None and time.time() - entry[0] < ttl):
+            return entry
+
+        try:
+            shared = self.backend.get(self.backend_key(key))
+        except Exception:
+            shared = None
+        if shared is not None and (entry is None or shared[0] > entry[0]):
+            with self._lock:
+                self._remember(key, shared)
+            return shared
+        return entry
+
+    def get(self, key, loader, ttl=3600, stale_while_revalidate=True, refresh_loader=None, validate=None):
+        """캐시 값 (없으면 로드, 만료되었으면 기존 값 반환 + 백그라운드 갱신, validate 를 통과한 값만 저장)"""
+        entry = self._lookup(key, ttl)
+        if entry is not None and time.time() - entry[0] < ttl:
+            return entry[1]
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if entry is not None and stale_while_revalidate:
+            if owner:
+                self._refresher.submit(self._load, key, refresh_loader or loader, future, validate)
+            return entry[1]
+
+        if owner:
+            self._load(key, loader, future, validate)
+        return future.result()
+
+    def is_refreshing(self, key=None):
+        """진행 중인 로드/갱신 여부 (key 가 없으면 전체)"""
+        with self._lock:
+            return bool(self._inflight) if key is None else key in self._inflight
+
+    def clear(self):
+        """저장된 값 전부 삭제 (백엔드 포함, 진행 중인 로드는 끝나면 새로 저장됨)"""
+        with self._lock:
+            self._entries.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+_shared_lock = threading.Lock()
+_shared = {}
+
+def get_shared_cache():
+    """프로세스 전체에서 공유하는 캐시 (백엔드는 DARKPOOL_CACHE_URL 로 선택)"""
+    with _shared_lock:
+        if 'cache' not in _shared:
+            _shared['cache'] = SharedCache(create_cache_backend())
+        return _shared['cache']
+
+def cached(ttl=3600, stale_while_revalidate=True, cache=None, validate=None):
+    """함수 결과 캐시 데코레이터 — `_` 로 시작하는 키워드 인자는 키에서 제외하고 백그라운드 갱신 때는 넘기지 않음
+
+    validate: 결과를 저장할지 판단 (실패를 예외 대신 빈 값으로 알리는 함수용 — 거짓이면 기존 항목 유지).
+    갱신 때 함수가 다른 캐시 항목을 다시 읽으면 그 항목은 아직 만료·갱신 중이라 이전 값이 돌아온다.
+    상위 데이터와 함께 새로 만들어야 하는 결과는 상위 수집까지 한 함수(한 항목)로 캐시할 것.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            public = {k: v for k, v in kwargs.items() if not k.startswith('_')}
+            key = (fn.__module__, fn.__qualname__, args, tuple(sorted(public.items())))
+            return (cache or get_shared_cache()).get(
+                key, lambda: fn(*args, **kwargs), ttl, stale_while_revalidate,
+                refresh_loader=lambda: fn(*args, **public), validate=validate
+            )
+        return wrapper
+    return decorator
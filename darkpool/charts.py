@@ -0,0 +1,455 @@
+"""Plotly 차트 생성 (Streamlit 없이 사용 가능, 긴 시계열은 WebGL + LTTB 다운샘플링)"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from .config import CHART_MAX_POINTS, CHART_WEBGL_THRESHOLD
+from .signals import move_spans, sharp_moves
+
+# ==================== 공통 도구 ====================
+
+def data_version(df):
+    """차트 캐시 키용 데이터 버전 (요약 테이블 내용 해시 — 새 거래일이 반영되면 바뀜)"""
+    hashed = pd.util.hash_pandas_object(df, index=False)
+    return hashlib.blake2b(hashed.to_numpy().tobytes(), digest_size=8).hexdigest()
+
+def lttb_indices(y, n_out):
+    """Largest-Triangle-Three-Buckets 다운샘플링 — 유지할 위치 인덱스 (x 는 등간격 거래일로 간주)"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = (end + next_end - 1) / 2
+        avg_y = y[end:next_end].mean()
+        xs = np.arange(start, end)
+        area = np.abs((prev - avg_x) * (y[start:end] - y[prev]) - (prev - xs) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        keep[i + 1] = prev
+    return keep
+
+def line_trace(x, y, max_points=CHART_MAX_POINTS, webgl_threshold=CHART_WEBGL_THRESHOLD, **kwargs):
+    """선 차트 trace — 포인트가 많으면 LTTB 로 줄이고 Scattergl 로 렌더링"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) > max_points:
+        idx = lttb_indices(y, max_points)
+        x, y = x[idx], y[idx]
+    trace_cls = go.Scattergl if len(y) > webgl_threshold else go.Scatter
+    return trace_cls(x=x, y=y, **kwargs)
+
+# 시계열 차트 해상도 → 표시 이름
+RESOLUTION_LABELS = {'daily': '일별', 'weekly': '주간', 'monthly': '월간'}
+
+def window_label(window):
+    """분석 기간 표시 (1년 이상은 년 단위)"""
+    return f"{window // 365}년" if window >= 365 else f"{window}일"
+
+# ==================== 종목 비교 차트 (df_main) ====================
+
+def dtc_figure(df_main):
+    """Chart 1: Days to Cover 막대"""
+    fig1 = go.Figure()
+
+    colors_dtc = []
+    for x in df_main['yf_short_ratio_days']:
+        if x < 3:
+            colors_dtc.append('green')
+        elif x < 5:
+            colors_dtc.append('yellow')
+        elif x < 7:
+            colors_dtc.append('orange')
+        else:
+            colors_dtc.append('red')
+
+    fig1.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['yf_short_ratio_days'],
+        text=[f"{x:.2f}일" for x in df_main['yf_short_ratio_days']],
+        textposition='auto',
+        marker_color=colors_dtc,
+        hovertemplate='<b>%{x}</b><br>Days to Cover: %{y:.2f}일<br>청산 소요 기간<extra></extra>'
+    ))
+
+    fig1.add_hline(y=3, line_dash="dash", line_color="green", annotation_text="정상 (3일)")
+    fig1.add_hline(y=5, line_dash="dash", line_color="orange", annotation_text="주의 (5일)")
+    fig1.add_hline(y=7, line_dash="dash", line_color="red", annotation_text="위험 (7일)")
+
+    fig1.update_layout(
+        title='Days to Cover (Short Ratio): 공매도 청산 소요 일수 - Short Squeeze 핵심 지표',
+        height=550,
+        template='plotly_white',
+        xaxis_title='종목',
+        yaxis_title='Days to Cover (일)'
+    )
+
+    return fig1
+
+def short_float_figure(df_main):
+    """Chart 2: Short % of Float 막대"""
+    fig2 = go.Figure()
+
+    colors_float = ['green' if x < 2 else 'yellowgreen' if x < 5 else 'orange' if x < 10 else 'red'
+                   for x in df_main['yf_short_percent_float']]
+
+    fig2.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['yf_short_percent_float'],
+        text=[f"{x:.2f}%" for x in df_main['yf_short_percent_float']],
+        textposition='auto',
+        marker_color=colors_float,
+        hovertemplate='<b>%{x}</b><br>Short % Float: %{y:.2f}%<extra></extra>'
+    ))
+
+    fig2.add_hline(y=2, line_dash="dash", line_color="green", annotation_text="매우 낮음 (2%)")
+    fig2.add_hline(y=5, line_dash="dash", line_color="yellowgreen", annotation_text="정상 (5%)")
+    fig2.add_hline(y=10, line_dash="dash", line_color="red", annotation_text="높음 (10%)")
+
+    fig2.update_layout(
+        title='Short % of Float: 유통주식 대비 공매도 비율',
+        xaxis_title='종목',
+        yaxis_title='Short % of Float (%)',
+        height=550,
+        template='plotly_white'
+    )
+
+    return fig2
+
+def dp_ratio_figure(df_main):
+    """Chart 2-1: DP Ratio 막대"""
+    fig2_1 = go.Figure()
+
+    colors_dp = []
+    for x in df_main['dp_ratio']:
+        if x < 40:
+            colors_dp.append('green')
+        elif x < 50:
+            colors_dp.append('yellowgreen')
+        elif x < 60:
+            colors_dp.append('orange')
+        else:
+            colors_dp.append('red')
+
+    fig2_1.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['dp_ratio'],
+        text=[f"{x:.1f}%" for x in df_main['dp_ratio']],
+        textposition='auto',
+        marker_color=colors_dp,
+        hovertemplate='<b>%{x}</b><br>DP Ratio: %{y:.2f}%<br>장외 거래 비중<extra></extra>'
+    ))
+
+    fig2_1.add_hline(y=40, line_dash="dash", line_color="green", annotation_text="정상 (40%)")
+    fig2_1.add_hline(y=50, line_dash="dash", line_color="orange", annotation_text="과열 (50%)")
+    fig2_1.add_hline(y=60, line_dash="dash", line_color="red", annotation_text="극도과열 (60%)")
+
+    fig2_1.update_layout(
+        title='DP Ratio (Dark Pool 비중): 전체 시장 대비 장외 거래 비중',
+        height=550,
+        template='plotly_white',
+        xaxis_title='종목',
+        yaxis_title='DP Ratio (%)'
+    )
+
+    return fig2_1
+
+def short_comparison_figure(df_main):
+    """Chart 3: 공매도 종합 비교"""
+    fig3 = go.Figure()
+
+    fig3.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['dp_short_ratio'],
+        name='DP Internal Short',
+        marker_color='darkblue',
+        text=df_main['dp_short_ratio'].round(1),
+        textposition='auto'
+    ))
+
+    fig3.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['dp_short_market_impact'],
+        name='DP Market Impact',
+        marker_color='gray',
+        text=df_main['dp_short_market_impact'].round(1),
+        textposition='auto'
+    ))
+
+    fig3.add_trace(go.Bar(
+        x=df_main['ticker'],
+        y=df_main['finra_yf_short_ratio'],
+        name='FINRA/YF Ratio (신선도)',
+        marker_color='purple',
+        text=df_main['finra_yf_short_ratio'].round(1),
+        textposition='auto'
+    ))
+
+    fig3.add_hline(y=50, line_dash="dash", line_color="orange", annotation_text="50% 기준")
+
+    fig3.update_layout(
+        title='공매도 종합 비교: DP Internal vs Market Impact vs 신선도',
+        barmode='group',
+        height=550,
+        template='plotly_white',
+        xaxis_title='종목',
+        yaxis_title='비율 (%)',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return fig3
+
+def squeeze_matrix_figure(df_main):
+    """Chart 4: Days to Cover vs Short % Float"""
+    fig4 = go.Figure()
+
+    fig4.add_trace(go.Scatter(
+        x=df_main['yf_short_percent_float'],
+        y=df_main['yf_short_ratio_days'],
+        mode='markers+text',
+        text=df_main['ticker'],
+        textposition='top center',
+        marker=dict(
+            size=df_main['dp_short_ratio'] * 1.2,
+            color=df_main['yf_short_ratio_days'],
+            colorscale='RdYlGn_r',
+            showscale=True,
+            colorbar=dict(title="Days to Cover"),
+            line=dict(width=1, color='black')
+        ),
+        hovertemplate='<b>%{text}</b><br>Float: %{x:.2f}%<br>DTC: %{y:.2f}일<extra></extra>'
+    ))
+
+    fig4.add_vline(x=10, line_dash="dot", line_color="gray", line_width=2)
+    fig4.add_hline(y=5, line_dash="dot", line_color="gray", line_width=2)
+
+    fig4.add_annotation(x=15, y=8, text="<b>🔥 극도 위험<br>Squeeze Zone</b>",
+                      showarrow=False, font=dict(color="darkred", size=12),
+                      bgcolor="rgba(255,200,200,0.3)", bordercolor="red", borderwidth=2, borderpad=4)
+    fig4.add_annotation(x=3, y=2, text="<b>💚 안정적<br>Safe Zone</b>",
+                      showarrow=False, font=dict(color="darkgreen", size=12),
+                      bgcolor="rgba(200,255,200,0.3)", bordercolor="green", borderwidth=2, borderpad=4)
+
+    fig4.update_layout(
+        title='Short Squeeze Risk Matrix: Float % vs Days to Cover',
+        xaxis_title='Short % of Float (%)',
+        yaxis_title='Days to Cover (일)',
+        height=600,
+        template='plotly_white'
+    )
+
+    return fig4
+
+def position_matrix_figure(df_main):
+    """Chart 4-1: DP Ratio vs DP Short Ratio"""
+    fig4_1 = go.Figure()
+
+    fig4_1.add_trace(go.Scatter(
+        x=df_main['dp_ratio'],
+        y=df_main['dp_short_ratio'],
+        mode='markers+text',
+        text=df_main['ticker'],
+        textposition='top center',
+        marker=dict(
+            size=df_main['yf_short_ratio_days'] * 8,
+            color=df_main['dp_short_ratio'],
+            colorscale='RdYlGn_r',
+            showscale=True,
+            colorbar=dict(title="DP Short<br>Ratio (%)"),
+            line=dict(width=1, color='black'),
+            cmin=40,
+            cmax=60
+        ),
+        hovertemplate='<b>%{text}</b><br>DP Ratio: %{x:.1f}%<br>DP Short: %{y:.1f}%<br>DTC: ' + 
+                      df_main['yf_short_ratio_days'].round(2).astype(str) + '일<extra></extra>'
+    ))
+
+    fig4_1.add_vline(x=50, line_dash="dot", line_color="gray", line_width=2)
+    fig4_1.add_hline(y=50, line_dash="dot", line_color="gray", line_width=2)
+    fig4_1.add_vline(x=40, line_dash="dash", line_color="lightgray", line_width=1)
+    fig4_1.add_hline(y=45, line_dash="dash", line_color="lightgray", line_width=1)
+    fig4_1.add_hline(y=55, line_dash="dash", line_color="lightgray", line_width=1)
+
+    fig4_1.add_annotation(
+        x=60, y=60,
+        text="<b>🔴 기관 강한 약세<br>Active Short</b>",
+        showarrow=False,
+        font=dict(color="darkred", size=12),
+        bgcolor="rgba(255,200,200,0.3)",
+        bordercolor="red",
+        borderwidth=2,
+        borderpad=4
+    )
+
+    fig4_1.add_annotation(
+        x=60, y=40,
+        text="<b>💚 기관 매집<br>Accumulation</b>",
+        showarrow=False,
+        font=dict(color="darkgreen", size=12),
+        bgcolor="rgba(200,255,200,0.3)",
+        bordercolor="green",
+        borderwidth=2,
+        borderpad=4
+    )
+
+    fig4_1.add_annotation(
+        x=35, y=50,
+        text="<b>⚪ 정상 범위<br>Normal Market</b>",
+        showarrow=False,
+        font=dict(color="gray", size=11),
+        bgcolor="rgba(240,240,240,0.3)",
+        bordercolor="gray",
+        borderwidth=1,
+        borderpad=4
+    )
+
+    fig4_1.update_layout(
+        title='기관 포지션 매트릭스: DP Ratio vs DP Short Ratio<br><sub>버블 크기 = Days to Cover (Short Squeeze 위험도)</sub>',
+        xaxis_title='DP Ratio (%) - 장외 거래 비중',
+        yaxis_title='DP Short Ratio (%) - 장외 내부 공매도 비율',
+        height=650,
+        template='plotly_white',
+        xaxis=dict(range=[30, 70]),
+        yaxis=dict(range=[25, 65])
+    )
+
+    return fig4_1
+
+OVERVIEW_FIGURES = {
+    'dtc': dtc_figure,
+    'short_float': short_float_figure,
+    'dp_ratio': dp_ratio_figure,
+    'short_comparison': short_comparison_figure,
+    'squeeze_matrix': squeeze_matrix_figure,
+    'position_matrix': position_matrix_figure
+}
+
+# ==================== 장기 추세 (주간/월간 롤업) ====================
+
+def rollup_trend_figure(rollups, window):
+    """Chart 4-2: 종목별 거래량 가중 DP 비중 / DP 내부 공매도 장기 추세 (롤업 기간당 1포인트)"""
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        subplot_titles=("DP 비중 (시장 거래량 가중)", "DP 내부 공매도 (FINRA 거래량 가중)"),
+        vertical_spacing=0.12
+    )
+
+    for ticker, df in rollups.groupby('ticker', sort=False, observed=True):
+        fig.add_trace(line_trace(
+            df['date'], df['dp_ratio'],
+            mode='lines', name=ticker, legendgroup=ticker,
+            hovertemplate=f'{ticker}: %{{y:.2f}}%<extra></extra>'
+        ), row=1, col=1)
+        fig.add_trace(line_trace(
+            df['date'], df['dp_short_ratio'],
+            mode='lines', name=ticker, legendgroup=ticker, showlegend=False,
+            hovertemplate=f'{ticker}: %{{y:.2f}}%<extra></extra>'
+        ), row=2, col=1)
+
+    fig.add_hline(y=50, line_dash="dot", line_color="red", annotation_text="과열 (50%)", row=1, col=1)
+    fig.add_hline(y=50, line_dash="dot", line_color="gray", annotation_text="분기점", row=2, col=1)
+
+    fig.update_layout(
+        height=700,
+        title_text=f"📆 {window_label(window)} 장기 추세 (월별 롤업)",
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    fig.update_yaxes(title_text="DP 비중 (%)", row=1, col=1)
+    fig.update_yaxes(title_text="DP 내부 공매도 (%)", row=2, col=1)
+
+    return fig
+
+# ==================== 종목별 시계열 ====================
+
+def history_figure(summary, df_hist, window, resolution='daily'):
+    """Chart 5-6: 종목별 DP 비중 / DP 내부 공매도 시계열 (summary: 요약 테이블의 해당 종목 행)
+
+    resolution 이 weekly/monthly 면 df_hist 는 롤업 행 — 10일 평균·급변 구간 없이 기간별 가중 비율만 그린다.
+    """
+    ticker = summary['ticker']
+    name = summary['name']
+    daily = resolution == 'daily'
+
+    fig_ts = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        subplot_titles=(
+            f"{ticker} - Dark Pool 비중 Trend",
+            f"{ticker} - DP 내부 공매도 Trend" + (" + 10일 평균" if daily else "")
+        ),
+        vertical_spacing=0.12
+    )
+
+    # 차트 1: DP 비중
+    fig_ts.add_trace(line_trace(
+        df_hist['date'], df_hist['dp_ratio'],
+        mode='lines+markers',
+        name='DP 비중',
+        line=dict(color='blue', width=2),
+        showlegend=False,
+        hovertemplate='날짜: %{x}<br>DP비중: %{y:.2f}%<extra></extra>'
+    ), row=1, col=1)
+
+    fig_ts.add_hline(y=50, line_dash="dot", line_color="red",
+                    annotation_text="과열 (50%)", row=1, col=1)
+
+    # 차트 2: DP 내부 공매도 + 10일 평균
+    fig_ts.add_trace(line_trace(
+        df_hist['date'], df_hist['dp_short_ratio'],
+        mode='lines+markers',
+        name='DP 내부 공매도',
+        line=dict(color='orange', width=2),
+        showlegend=False,
+        hovertemplate='DP Short: %{y:.2f}%<extra></extra>'
+    ), row=2, col=1)
+
+    if daily:
+        fig_ts.add_trace(line_trace(
+            df_hist['date'], df_hist['dp_short_ratio_10d_avg'],
+            mode='lines',
+            name='10일 평균',
+            line=dict(color='gray', dash='dot', width=1.5),
+            showlegend=False,
+            hovertemplate='10일평균: %{y:.2f}%<extra></extra>'
+        ), row=2, col=1)
+
+    fig_ts.add_hline(y=50, line_dash="dot", line_color="gray",
+                    annotation_text="분기점", row=2, col=1)
+
+    # 급락/급등 구간 하이라이트 (원본 일별 데이터 기준, 연속 구간 병합, 한 번의 레이아웃 갱신)
+    move_shapes = []
+    if daily:
+        moves = sharp_moves(df_hist['dp_short_ratio'])
+        move_shapes = [
+            dict(type='rect', xref='x2', yref='y2 domain', x0=x0, x1=x1, y0=0, y1=1,
+                 fillcolor='green' if direction < 0 else 'red', opacity=0.15,
+                 layer='below', line_width=0)
+            for x0, x1, direction in move_spans(df_hist['date'], moves)
+        ]
+
+    fig_ts.update_layout(
+        shapes=list(fig_ts.layout.shapes) + move_shapes,
+        height=700,
+        title_text=(f"📊 {ticker} ({name}) - {window_label(window)} {RESOLUTION_LABELS[resolution]} 트렌드"
+                    f" | DTC: {summary['yf_short_ratio_days']:.2f}일"),
+        template='plotly_white',
+        hovermode='x unified'
+    )
+
+    fig_ts.update_xaxes(title_text="날짜", row=2, col=1)
+    fig_ts.update_yaxes(title_text="DP 비중 (%)", row=1, col=1)
+    fig_ts.update_yaxes(title_text="DP 내부 공매도 (%)", row=2, col=1)
+
+    return fig_ts
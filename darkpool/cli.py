@@ -0,0 +1,159 @@
+"""명령행 인터페이스: python -m darkpool compute|screener|index|partitions|backtest|schedule"""
+import argparse
+import sys
+
+from .backtest import run_backtest
+from .config import BACKTEST_HORIZONS, LONG_HORIZON_YEARS, MAG7_STOCKS, PRECOMPUTE_LONG_DAYS, PRECOMPUTE_WINDOWS
+from .engine import compute_analysis, compute_screener
+from .fetch import get_symbol_index, rebuild_symbol_index
+from .partitions import warm_partitions
+from .scheduler import PrecomputeScheduler, ResultStore
+
+def write_frame(df, path):
+    """확장자(.parquet/.csv/.json)에 맞춰 저장, 경로가 없으면 표준 출력"""
+    if not path:
+        print(df.to_string(index=False))
+    elif path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    elif path.endswith('.json'):
+        df.to_json(path, orient='records', date_format='iso', force_ascii=False, indent=2)
+    else:
+        df.to_csv(path, index=False)
+
+def cmd_compute(args):
+    panel, df_main = compute_analysis(args.tickers, args.days)
+    if df_main is None:
+        print("❌ 데이터를 가져올 수 없습니다.", file=sys.stderr)
+        return 1
+
+    write_frame(df_main, args.out)
+    if args.history_out:
+        write_frame(panel, args.history_out)
+    return 0
+
+def cmd_screener(args):
+    screener = compute_screener(args.days, window=args.window)
+    if screener is None or screener.empty:
+        print("❌ 데이터를 가져올 수 없습니다.", file=sys.stderr)
+        return 1
+
+    screener = screener[screener['finra_total_volume'] >= args.min_volume]
+    write_frame(screener.sort_values(args.sort, ascending=args.ascending).head(args.top), args.out)
+    return 0
+
+def cmd_index(args):
+    if args.rebuild:
+        print(f"🗂️ {rebuild_symbol_index(args.days)}개 거래일 반영", file=sys.stderr)
+
+    index = get_symbol_index()
+    if not args.ticker:
+        print(f"종목 {len(index.symbols):,}개 | 거래일 {len(index.dates)}개 | 마지막 {index.last_date}")
+        return 0
+
+    history = index.history(args.ticker)
+    if history is None:
+        print(f"❌ 인덱스에 없는 종목: {args.ticker}", file=sys.stderr)
+        return 1
+    write_frame(history.reset_index(), args.out)
+    return 0
+
+def cmd_partitions(args):
+    rows = warm_partitions(args.tickers, args.days)
+    if not rows:
+        print("❌ 데이터를 가져올 수 없습니다.", file=sys.stderr)
+        return 1
+    print(f"🗂️ 월간 롤업 {rows}행 반영 ({args.days}일)", file=sys.stderr)
+    return 0
+
+def cmd_backtest(args):
+    summary = run_backtest(args.tickers, args.days, args.top, tuple(args.horizons))
+    if summary is None:
+        print("❌ 데이터를 가져올 수 없습니다.", file=sys.stderr)
+        return 1
+
+    write_frame(summary, args.out)
+    return 0
+
+def print_status(scheduler):
+    status = scheduler.status()
+    if status['last_error']:
+        print(f"❌ 실패: {status['last_error']}", file=sys.stderr)
+    if status['last_success']:
+        start, end = status['dates_covered']
+        print(f"✅ {status['last_success']:%Y-%m-%d %H:%M %Z} 완료 "
+              f"({status['last_duration']:.1f}초, {start} ~ {end})")
+
+def cmd_schedule(args):
+    scheduler = PrecomputeScheduler(ResultStore(), windows=args.windows, tickers=args.tickers, long_days=args.long_days)
+    if args.once:
+        ok = scheduler.run_once()
+        print_status(scheduler)
+        return 0 if ok else 1
+
+    scheduler.start()
+    try:
+        while scheduler.is_alive():
+            scheduler.join(timeout=60)
+            if scheduler.status()['next_run']:
+                print_status(scheduler)
+                print(f"⏰ 다음 실행: {scheduler.status()['next_run']:%Y-%m-%d %H:%M %Z}")
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='darkpool', description='Dark Pool & Short Interest 분석 엔진')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    compute = sub.add_parser('compute', help='종목별 지표 계산 및 결과 저장')
+    compute.add_argument('--tickers', nargs='+', default=list(MAG7_STOCKS.keys()))
+    compute.add_argument('--days', type=int, default=60)
+    compute.add_argument('--out', help='요약 결과 파일 (.parquet/.csv/.json)')
+    compute.add_argument('--history-out', help='일별 히스토리 파일 (.parquet/.csv/.json)')
+    compute.set_defaults(func=cmd_compute)
+
+    screener = sub.add_parser('screener', help='FINRA 전 종목 스크리너')
+    screener.add_argument('--days', type=int, default=60)
+    screener.add_argument('--top', type=int, default=50)
+    screener.add_argument('--window', type=int, default=10, help='평균 기간 (거래일)')
+    screener.add_argument('--sort', default='dp_short_change_pct',
+                          choices=['dp_short_change_pct', 'dp_short_ratio', 'dp_short_10d_avg', 'dp_short_ratio_rank',
+                                   'dp_short_ratio_z', 'dp_short_change_pct_z', 'finra_total_volume'])
+    screener.add_argument('--ascending', action='store_true')
+    screener.add_argument('--min-volume', type=float, default=100_000)
+    screener.add_argument('--out', help='결과 파일 (.parquet/.csv/.json)')
+    screener.set_defaults(func=cmd_screener)
+
+    index = sub.add_parser('index', help='FINRA 아카이브 종목 우선 인덱스 생성/조회')
+    index.add_argument('--rebuild', action='store_true', help='일일 파일(미러 우선)로 처음부터 다시 생성')
+    index.add_argument('--days', type=int, default=365, help='--rebuild 대상 기간 (일)')
+    index.add_argument('--ticker', help='조회할 종목 (전체 히스토리 출력)')
+    index.add_argument('--out', help='결과 파일 (.parquet/.csv/.json)')
+    index.set_defaults(func=cmd_index)
+
+    partitions = sub.add_parser('partitions', help='장기 모드 연/월 파티션·주간/월간 롤업 미리 계산')
+    partitions.add_argument('--tickers', nargs='+', default=list(MAG7_STOCKS.keys()))
+    partitions.add_argument('--days', type=int, default=LONG_HORIZON_YEARS * 365)
+    partitions.set_defaults(func=cmd_partitions)
+
+    backtest = sub.add_parser('backtest', help='과거 전 거래일 신호 백테스트 (이후 수익률 기준 적중률·낙폭)')
+    backtest.add_argument('--tickers', nargs='+', help='대상 종목 (없으면 --top 또는 MAG 7+2)')
+    backtest.add_argument('--top', type=int, help='FINRA 거래량 상위 N개 종목')
+    backtest.add_argument('--days', type=int, default=365)
+    backtest.add_argument('--horizons', nargs='+', type=int, default=list(BACKTEST_HORIZONS), help='보유 기간 (거래일)')
+    backtest.add_argument('--out', help='결과 파일 (.parquet/.csv/.json)')
+    backtest.set_defaults(func=cmd_backtest)
+
+    schedule = sub.add_parser('schedule', help='FINRA 게시 이후 결과 사전 계산 (백그라운드 워커)')
+    schedule.add_argument('--windows', nargs='+', type=int, default=list(PRECOMPUTE_WINDOWS))
+    schedule.add_argument('--tickers', nargs='+', default=list(MAG7_STOCKS.keys()))
+    schedule.add_argument('--long-days', type=int, default=PRECOMPUTE_LONG_DAYS,
+                          help='파티션·롤업을 미리 만들 장기 기간 (일, 0 이면 건너뜀)')
+    schedule.add_argument('--once', action='store_true', help='한 번만 계산하고 종료')
+    schedule.set_defaults(func=cmd_schedule)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
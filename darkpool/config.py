@@ -0,0 +1,102 @@
+"""분석 대상 종목 및 수집 설정"""
+import os
+
+# ==================== 설정 및 종목 리스트 ====================
+MAG7_STOCKS = {
+    'AAPL': 'Apple', 'MSFT': 'Microsoft', 'GOOGL': 'Alphabet',
+    'AMZN': 'Amazon', 'NVDA': 'NVIDIA', 'META': 'Meta',
+    'TSLA': 'Tesla', 'COIN': 'Coinbase', 'IBIT': 'Bitcoin ETF'
+}
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FINRA_DAILY_URL = "https://cdn.finra.org/equity/regsho/daily/CNMSshvol{date_str}.txt"
+YAHOO_HOST = 'query1.finance.yahoo.com'
+
+# FINRA 공매도 잔고 (월 2회 결제일 기준, 전 종목) — 결제일 이후 약 7~8 거래일 뒤 게시
+FINRA_SHORT_INTEREST_URL = "https://api.finra.org/data/group/otcMarket/name/consolidatedShortInterest"
+FINRA_API_HOST = 'api.finra.org'
+SHORT_INTEREST_PUBLICATION_LAG = 8
+SHORT_INTEREST_PAGE_SIZE = 5000
+# 유통 주식 수(% Float 계산용)는 자주 바뀌지 않으므로 Yahoo 조회 결과를 이 기간 동안 재사용
+FLOAT_SHARES_TTL_SECONDS = 7 * 24 * 3600
+
+# FINRA 일일 파일은 게시 후 변경되지 않으므로 로컬 미러에 영구 보관
+FINRA_MIRROR_DIR = os.environ.get(
+    'DARKPOOL_FINRA_MIRROR',
+    os.path.join(PROJECT_DIR, 'data', 'finra')
+)
+
+# 종목 우선 시계열 인덱스 (FINRA 아카이브를 종목별 연속 블록으로 전치한 메모리 맵 파일)
+SYMBOL_INDEX_DIR = os.environ.get(
+    'DARKPOOL_SYMBOL_INDEX',
+    os.path.join(PROJECT_DIR, 'data', 'index')
+)
+# 종목별 첫 블록 용량 (거래일 수), 가득 차면 두 배로 늘려 이동
+SYMBOL_INDEX_INITIAL_CAPACITY = 64
+
+# 장기(1~5년) 모드: 종목별 일별 지표를 연/월 파티션으로 저장 (마감된 달은 한 번만 계산)
+PANEL_PARTITION_DIR = os.environ.get(
+    'DARKPOOL_PANEL_PARTITIONS',
+    os.path.join(PROJECT_DIR, 'data', 'panel')
+)
+LONG_HORIZON_YEARS = 5
+# 파티션 10일 평균 계산용 앞쪽 여유 기간 (일), 메모리에 보관할 파티션 수
+PARTITION_WARMUP_DAYS = 21
+PARTITION_CACHE_ENTRIES = 96
+# 장기 모드에서 요약 테이블·비교 차트·스크리너에 쓰는 최근 기간 (일)
+LONG_HORIZON_SNAPSHOT_DAYS = 60
+# 종목별 주간/월간 거래량 합계 (새 거래일만 증분 반영, 긴 구간 추세 차트용)
+ROLLUP_PATH = os.environ.get(
+    'DARKPOOL_ROLLUPS',
+    os.path.join(PANEL_PARTITION_DIR, 'rollups.pkl')
+)
+
+# 시그널 백테스트: 게시 다음 거래일 종가 진입 후 보유 거래일 수, Yahoo 시세 한 번에 받는 종목 수
+BACKTEST_HORIZONS = (1, 5, 20)
+PRICE_DOWNLOAD_CHUNK = 200
+
+# 횡단면 지표: 종목별 롤링 z-점수 기간 (거래일), 10일 평균·롤링 z 계산용 앞쪽 여유 기간 (일)
+CROSS_SECTION_WINDOW = 20
+CROSS_SECTION_WARMUP_DAYS = 45
+
+# 최근 날짜의 누락 기록은 이 시간이 지나면 다시 확인
+MISSING_RECHECK_SECONDS = 3600
+
+FETCH_MAX_WORKERS = 8
+HOST_CONCURRENCY = {
+    'cdn.finra.org': 4,
+    FINRA_API_HOST: 2,
+    YAHOO_HOST: 4
+}
+
+# 수집 저장소: Yahoo 거래량 재수집 주기 (초), 게시된 FINRA 파일은 다시 받지 않음
+MARKET_REFRESH_SECONDS = 3600
+
+# 공유 캐시: 만료 항목 백그라운드 갱신에 쓰는 스레드 수
+CACHE_REFRESH_WORKERS = 2
+
+# 공유 캐시 백엔드 (memory:// | sqlite:///data/cache.sqlite | redis://host:6379/0)
+# 여러 레플리카가 같은 SQLite 파일 또는 Redis 를 가리키면 한 번 수집한 결과를 함께 사용
+CACHE_URL = os.environ.get('DARKPOOL_CACHE_URL', 'memory://')
+CACHE_VERSION = 3                      # 캐시 데이터 형식이 바뀌면 올림 (이전 항목 무시)
+CACHE_MAX_ENTRIES = 256                # 프로세스 메모리(L1) 최대 항목 수
+CACHE_MAX_BYTES = int(os.environ.get('DARKPOOL_CACHE_MAX_MB', '1024')) * 1024 * 1024
+CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600  # 공유 백엔드 항목 보관 기간
+
+# 롤링 저장소가 종목별로 보관하는 최근 값 개수 (이 이내의 창 길이 변경은 재다운로드 없이 재계산)
+ROLLING_CAPACITY = 20
+
+# 백그라운드 사전 계산 대상 분석 기간 (쉼표 구분, 예: "30,60,90")
+PRECOMPUTE_WINDOWS = tuple(
+    int(w) for w in os.environ.get('DARKPOOL_PRECOMPUTE_WINDOWS', '30,60,90').split(',') if w.strip()
+)
+# 사전 계산 때 연/월 파티션·롤업을 미리 만들어 둘 장기 기간 (일, 0 이면 건너뜀 — 기본값은 장기 모드 최대 기간)
+PRECOMPUTE_LONG_DAYS = int(os.environ.get('DARKPOOL_PRECOMPUTE_LONG_DAYS', str(LONG_HORIZON_YEARS * 365)))
+RESULTS_DIR = os.environ.get('DARKPOOL_RESULTS_DIR', os.path.join(PROJECT_DIR, 'data', 'results'))
+# 게시 후 이 시간이 지난 결과는 사용하지 않음 (스케줄러가 멈췄을 때 대비, 연휴 주말보다 길게)
+RESULT_MAX_AGE_SECONDS = int(os.environ.get('DARKPOOL_RESULT_MAX_AGE_HOURS', '96')) * 3600
+
+# 시계열 차트: 이 포인트 수를 넘으면 WebGL(Scattergl), 최대 포인트 수를 넘으면 LTTB 다운샘플링
+CHART_WEBGL_THRESHOLD = 1000
+CHART_MAX_POINTS = 2000
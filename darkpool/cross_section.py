@@ -0,0 +1,116 @@
+"""전 종목 횡단면 지표: 거래일별 백분위 순위·로버스트 z-점수, 종목별 롤링 z-점수 (거래일 × 종목 행렬 한 번에 계산)"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .config import CROSS_SECTION_WINDOW
+
+# 전 종목에서 계산 가능한 지표 (FINRA 파일만으로 계산 — DP 비중은 시장 거래량이 필요해 제외)
+CROSS_SECTION_METRICS = ['dp_short_ratio', 'dp_short_change_pct']
+# 지표별 점수 컬럼: 당일 전 종목 중 백분위(0~100), 중앙값·MAD 기준 z, 종목 자체 직전 기간 대비 z
+SCORE_SUFFIXES = ['_rank', '_z', '_ts_z']
+SCORE_COLUMNS = [f"{m}{s}" for m in CROSS_SECTION_METRICS for s in SCORE_SUFFIXES]
+
+# 정규분포에서 MAD → 표준편차 환산 계수
+MAD_SCALE = 1.4826
+
+def rolling_moments(values, window, min_periods=1):
+    """시간 축(행) 롤링 평균·표준편차 — 빈 칸(NaN) 제외, 누적합 차분으로 전 종목 한 번에 계산"""
+    valid = np.isfinite(values)
+    x = np.where(valid, values, 0.0)
+
+    def windowed(a):
+        total = np.cumsum(a, axis=0)
+        total[window:] -= total[:-window].copy()
+        return total
+
+    n, s, s2 = windowed(valid.astype(float)), windowed(x), windowed(x * x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n
+        std = np.sqrt(np.clip((s2 - s * mean) / (n - 1), 0, None))
+    mean[n < min_periods] = np.nan
+    std[(n < max(min_periods, 2))] = np.nan
+    return mean, std
+
+def observation_means(values, window):
+    """종목(열)별 최근 window 개 관측치 평균 — 빈 칸(거래 없는 날)은 건너뛰고 그 앞 관측치까지 포함, 빈 칸 자리는 NaN"""
+    valid = np.isfinite(values)
+    rows, cols = np.nonzero(valid)
+    order = (np.cumsum(valid, axis=0) - 1)[rows, cols]     # 열 안에서 몇 번째 관측치인지
+
+    # 열별 관측치를 앞으로 모은 뒤 누적합 차분으로 window 개 평균
+    packed = np.zeros((int(valid.sum(axis=0).max(initial=0)), values.shape[1]))
+    packed[order, cols] = values[rows, cols]
+    total = np.cumsum(packed, axis=0)
+    total[window:] -= total[:-window].copy()
+    count = np.minimum(np.arange(1, len(packed) + 1), window)[:, None]
+
+    mean = np.full(values.shape, np.nan)
+    mean[rows, cols] = (total / count)[order, cols]
+    return mean
+
+def universe_metrics(short, total):
+    """FINRA 거래일 × 종목 거래량 행렬 → 지표 행렬
+
+    daily_metrics·RollingMetricsStore 와 같은 반올림, 같은 10일 평균(종목별 최근 10개 관측치) 대비 변화.
+    """
+    ratio = (short / total.where(total > 0) * 100).round(2).to_numpy(dtype=float)
+    avg = observation_means(ratio, 10)
+    return {'dp_short_ratio': ratio, 'dp_short_change_pct': np.where(np.isfinite(ratio), ratio - avg, np.nan)}
+
+def percentile_ranks(values):
+    """행(거래일)별 전 종목 백분위 순위 (0~100, 동점은 평균 순위, 빈 칸 NaN)"""
+    return pd.DataFrame(values).rank(axis=1, pct=True).to_numpy() * 100
+
+def robust_zscores(values):
+    """행(거래일)별 (값 - 중앙값) / (1.4826 × MAD) — 극단값에 덜 민감, MAD 가 0 이면 NaN"""
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)   # 거래가 없는 날(전부 NaN)
+        median = np.nanmedian(values, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(values - median), axis=1, keepdims=True) * MAD_SCALE
+        return np.where(mad > 0, (values - median) / mad, np.nan)
+
+def rolling_zscores(values, window=CROSS_SECTION_WINDOW):
+    """종목별 직전 window 거래일 평균·표준편차 대비 당일 z (당일 값은 기준에서 제외)"""
+    mean, std = rolling_moments(values, window, min_periods=window // 2)
+    prior_mean, prior_std = np.full_like(mean, np.nan), np.full_like(std, np.nan)
+    prior_mean[1:], prior_std[1:] = mean[:-1], std[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(prior_std > 0, (values - prior_mean) / prior_std, np.nan)
+
+def cross_sectional_scores(short, total, tickers=None, start=None, window=CROSS_SECTION_WINDOW):
+    """전 종목 행렬로 순위·z-점수 계산 후 요청 종목·기간만 long format (ticker, date, 점수 컬럼) 으로 반환
+
+    순위·로버스트 z 는 그날 FINRA 파일의 모든 종목 기준이므로 tickers 와 무관하게 전 종목을 한 번에 계산하고,
+    start 이전 행은 10일 평균·롤링 z 의 앞쪽 여유 기간으로만 쓴다.
+    """
+    rows = np.ones(len(short.index), dtype=bool) if start is None else short.index >= pd.Timestamp(start).normalize()
+    columns = (np.arange(len(short.columns)) if tickers is None
+               else short.columns.get_indexer([t.upper() for t in tickers]))
+    columns = columns[columns >= 0]
+
+    scores = {}
+    for metric, values in universe_metrics(short, total).items():
+        scores[f"{metric}_rank"] = percentile_ranks(values)[rows][:, columns]
+        scores[f"{metric}_z"] = robust_zscores(values)[rows][:, columns]
+        # 종목 자체 기준은 요청 종목 열만 계산
+        scores[f"{metric}_ts_z"] = rolling_zscores(values[:, columns], window)[rows]
+
+    dates, symbols = short.index[rows], short.columns[columns]
+    frame = pd.DataFrame({
+        'ticker': np.tile(symbols.to_numpy(dtype=object), len(dates)),
+        'date': np.repeat(dates.to_numpy(), len(symbols)),
+        **{name: values.ravel() for name, values in scores.items()}
+    })
+    # 당일 거래가 없던 칸은 제외
+    return frame.dropna(subset=[f"{m}_rank" for m in CROSS_SECTION_METRICS], how='all').reset_index(drop=True)
+
+def latest_scores(df):
+    """한 거래일 스냅샷(종목 행) 의 지표 컬럼 → 같은 날 전 종목 기준 백분위·로버스트 z 컬럼 추가 (복사본)"""
+    df = df.copy()
+    for metric in CROSS_SECTION_METRICS:
+        values = df[metric].to_numpy(dtype=float)[None, :]
+        df[f"{metric}_rank"] = percentile_ranks(values)[0]
+        df[f"{metric}_z"] = robust_zscores(values)[0]
+    return df
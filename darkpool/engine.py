@@ -0,0 +1,28 @@
+"""헤드리스 분석 엔진 (수집 → 지표 패널 → 요약 테이블, Streamlit 불필요)"""
+from .config import MAG7_STOCKS, ROLLING_CAPACITY
+from .fetch import collect_market_data, load_finra_universe, load_short_interest_table
+from .metrics import build_metrics_panel, build_screener, latest_snapshot
+from .rolling import RollingMetricsStore
+
+_universe_store = RollingMetricsStore(window=10, capacity=ROLLING_CAPACITY)
+
+def compute_analysis(tickers=None, days_back=60):
+    """전체 분석 실행 → (지표 패널, 종목 요약 테이블); 데이터가 없으면 (None, None)"""
+    tickers = tuple(tickers or MAG7_STOCKS.keys())
+
+    market_data = collect_market_data(tickers, days_back)
+    panel = build_metrics_panel(market_data, tickers, days_back)
+    df_main = latest_snapshot(panel, market_data['yf_short_info'])
+    if df_main is None:
+        return None, None
+
+    return panel, df_main
+
+def get_universe_store():
+    """프로세스 전체에서 공유하는 전 종목 롤링 저장소 (새 거래일만 증분 반영)"""
+    return _universe_store
+
+def compute_screener(days_back=60, market_snapshot=None, window=10):
+    """전체 시장 스크리너 실행"""
+    return build_screener(load_finra_universe(days_back), market_snapshot, get_universe_store(), window,
+                          load_short_interest_table())
@@ -0,0 +1,698 @@
+"""FINRA / Yahoo Finance 병렬 수집 (공유 세션, 로컬 미러, 네거티브 캐시)"""
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+import yfinance as yf
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    CROSS_SECTION_WARMUP_DAYS, FETCH_MAX_WORKERS, FINRA_DAILY_URL, FINRA_MIRROR_DIR, FINRA_SHORT_INTEREST_URL,
+    FLOAT_SHARES_TTL_SECONDS, HOST_CONCURRENCY, MARKET_REFRESH_SECONDS, MISSING_RECHECK_SECONDS,
+    SHORT_INTEREST_PAGE_SIZE, SHORT_INTEREST_PUBLICATION_LAG, YAHOO_HOST
+)
+from .cross_section import cross_sectional_scores
+from .files import atomic_write
+from .symbol_index import SymbolIndex
+from .trading_calendar import (
+    MARKET_TZ, get_trading_dates, latest_published_date, latest_short_interest_settlement,
+    next_short_interest_publication, short_interest_publication_time, short_interest_settlements,
+    trading_dates_between
+)
+
+# pyarrow가 설치되어 있으면 멀티스레드 CSV 파서 사용
+try:
+    import pyarrow  # noqa: F401
+    FINRA_CSV_ENGINE = 'pyarrow'
+except ImportError:
+    FINRA_CSV_ENGINE = 'c'
+
+# ==================== 병렬 수집 엔진 ====================
+
+class FetchEngine:
+    """공유 HTTP 세션 + 스레드 풀 기반 병렬 수집기 (호스트별 동시 요청 수 제한)"""
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, host_concurrency=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(HOST_CONCURRENCY), pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='darkpool-fetch')
+        self.host_concurrency = host_concurrency or HOST_CONCURRENCY
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def host_slot(self, host):
+        """호스트별 세마포어 (동시 요청 수 제한)"""
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.host_concurrency.get(host, 2))
+            return self._host_slots[host]
+
+    def get(self, url, timeout=3):
+        """keep-alive 세션으로 GET 요청"""
+        with self.host_slot(urlparse(url).hostname):
+            return self.session.get(url, timeout=timeout)
+
+    def post(self, url, json=None, timeout=10, headers=None):
+        """keep-alive 세션으로 POST 요청 (JSON 본문)"""
+        with self.host_slot(urlparse(url).hostname):
+            return self.session.post(url, json=json, timeout=timeout, headers=headers)
+
+    def submit(self, fn, *args):
+        return self.executor.submit(fn, *args)
+
+class MissingFileCache:
+    """존재하지 않는 FINRA 파일 기록 (네거티브 캐시, 미러 디렉토리에 영구 저장)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def contains(self, date_str):
+        checked_at = self._entries.get(date_str)
+        if checked_at is None:
+            return False
+        # 게시 직후(1일 이내) 누락은 지연 게시일 수 있으므로 일정 시간 뒤 재확인
+        published = datetime.strptime(date_str, '%Y%m%d').date()
+        if latest_published_date() - published <= timedelta(days=1):
+            return time.time() - checked_at < MISSING_RECHECK_SECONDS
+        return True
+
+    def add(self, date_str):
+        with self._lock:
+            self._entries[date_str] = time.time()
+            try:
+                with atomic_write(self.path) as tmp_path, open(tmp_path, 'w') as f:
+                    json.dump(self._entries, f)
+            except OSError:
+                pass
+
+_shared_lock = threading.Lock()
+_shared = {}
+
+def get_fetch_engine():
+    """프로세스 전체에서 공유하는 수집 엔진"""
+    with _shared_lock:
+        if 'engine' not in _shared:
+            _shared['engine'] = FetchEngine()
+        return _shared['engine']
+
+def get_missing_file_cache():
+    """프로세스 전체에서 공유하는 FINRA 네거티브 캐시"""
+    with _shared_lock:
+        if 'missing' not in _shared:
+            _shared['missing'] = MissingFileCache(os.path.join(FINRA_MIRROR_DIR, 'missing.json'))
+        return _shared['missing']
+
+def get_short_interest_provider():
+    """프로세스 전체에서 공유하는 FINRA 공매도 잔고 제공자"""
+    engine = get_fetch_engine()
+    with _shared_lock:
+        if 'short_interest' not in _shared:
+            _shared['short_interest'] = ShortInterestProvider(engine)
+        return _shared['short_interest']
+
+def get_symbol_index():
+    """프로세스 전체에서 공유하는 종목 우선 시계열 인덱스"""
+    with _shared_lock:
+        if 'index' not in _shared:
+            _shared['index'] = SymbolIndex()
+        return _shared['index']
+
+def get_market_store():
+    """프로세스 전체에서 공유하는 기간 인지 수집 저장소"""
+    engine = get_fetch_engine()
+    missing = get_missing_file_cache()
+    short_interest = get_short_interest_provider()
+    index = get_symbol_index()
+    with _shared_lock:
+        if 'store' not in _shared:
+            _shared['store'] = MarketDataStore(engine, missing, short_interest, index)
+        return _shared['store']
+
+# ==================== 데이터 수집 함수 ====================
+
+def fetch_price_history(engine, tickers, start_date, end_date=None, fields=('Volume',)):
+    """Yahoo Finance 일별 시세를 한 번에 가져오기 (필드 → 날짜 × 티커 행렬), 실패하면 None"""
+    try:
+        end_date = end_date or datetime.now()
+        with engine.host_slot(YAHOO_HOST):
+            df = yf.download(list(tickers), start=start_date, end=end_date,
+                             auto_adjust=False, progress=False, threads=True)
+
+        matrices = {}
+        for field in fields:
+            values = df[field]
+            if isinstance(values, pd.Series):
+                values = values.to_frame(tickers[0])
+            values.index = pd.DatetimeIndex(values.index).tz_localize(None).normalize()
+            matrices[field] = values.dropna(how='all')
+        return matrices
+    except:
+        return None
+
+def fetch_market_volumes(engine, tickers, start_date, end_date=None):
+    """Yahoo Finance에서 전체 종목 시장 거래량을 한 번에 가져오기 (날짜 × 티커 행렬)"""
+    history = fetch_price_history(engine, tickers, start_date, end_date)
+    return None if history is None else history['Volume']
+
+# Yahoo 조회 실패 시 공매도 정보
+EMPTY_SHORT_INFO = {
+    'shares_short': 0,
+    'short_percent_float': 0,
+    'short_ratio_days': 0,
+    'shares_outstanding': 0,
+    'float_shares': 0,
+    'source': 'none'
+}
+
+def fetch_yf_short_info(engine, ticker):
+    """Yahoo Finance에서 공매도 정보 가져오기 (표준 지표)"""
+    try:
+        with engine.host_slot(YAHOO_HOST):
+            stock = yf.Ticker(ticker)
+            info = stock.info
+
+        return {
+            'shares_short': info.get('sharesShort', 0),
+            'short_percent_float': info.get('shortPercentOfFloat', 0) * 100,
+            'short_ratio_days': info.get('shortRatio', 0),
+            'shares_outstanding': info.get('sharesOutstanding', 0),
+            'float_shares': info.get('floatShares', 0),
+            'source': 'yahoo'
+        }
+    except:
+        return dict(EMPTY_SHORT_INFO)
+
+def finra_mirror_path(date_str):
+    """로컬 미러 내 FINRA 일일 파일 경로"""
+    return os.path.join(FINRA_MIRROR_DIR, f"CNMSshvol{date_str}.txt.gz")
+
+def load_finra_raw(engine, date_str, missing=None):
+    """FINRA 일일 파일 원본 (로컬 미러 우선, 없으면 다운로드 후 미러에 저장)"""
+    path = finra_mirror_path(date_str)
+    if os.path.exists(path):
+        try:
+            with gzip.open(path, 'rb') as f:
+                return f.read()
+        except (OSError, EOFError):
+            os.remove(path)
+
+    if missing is not None and missing.contains(date_str):
+        return None
+
+    response = engine.get(FINRA_DAILY_URL.format(date_str=date_str), timeout=3)
+    if response.status_code in (403, 404):
+        if missing is not None:
+            missing.add(date_str)
+        return None
+    if response.status_code != 200:
+        return None
+
+    raw = response.content
+    try:
+        with atomic_write(path) as tmp_path, gzip.open(tmp_path, 'wb') as f:
+            f.write(raw)
+    except OSError:
+        pass
+
+    return raw
+
+def parse_finra_file(raw, symbols=None):
+    """FINRA 파이프 구분 파일 파싱 (원본 bytes 직접 파싱, 필요한 컬럼만, 종목 조기 필터)"""
+    header_end = raw.find(b'\n')
+    header = raw[:header_end].rstrip(b'\r').decode().split('|')
+    columns = {name.lower(): name for name in header}
+    symbol_col = columns['symbol']
+    short_col = columns['shortvolume']
+    total_col = columns['totalvolume']
+
+    # 마지막 줄이 레코드 수 등 트레일러인 경우 제거
+    body = raw.rstrip()
+    last_line_start = body.rfind(b'\n') + 1
+    if body[last_line_start:].count(b'|') != len(header) - 1:
+        body = body[:last_line_start]
+
+    df = pd.read_csv(
+        BytesIO(body), sep='|',
+        usecols=[symbol_col, short_col, total_col],
+        dtype={symbol_col: 'object', short_col: 'float64', total_col: 'float64'},
+        # 'NA', 'NULL' 같은 실제 종목 코드가 결측으로 바뀌지 않도록 빈 칸만 결측 처리
+        keep_default_na=False, na_values=[''],
+        engine=FINRA_CSV_ENGINE
+    )
+    df.columns = [{symbol_col: 'symbol', short_col: 'shortVolume', total_col: 'totalVolume'}[c] for c in df.columns]
+
+    if symbols is not None:
+        df = df[df['symbol'].isin(symbols)]
+
+    df = df.dropna(subset=['symbol', 'shortVolume', 'totalVolume'])
+    df = df.drop_duplicates(subset='symbol', keep='first').set_index('symbol')
+    return df[['shortVolume', 'totalVolume']]
+
+def fetch_finra_daily_file(engine, date_str, missing=None, symbols=None):
+    """FINRA 일일 공매도 파일 로드 및 파싱 (날짜별 1회, 전 종목 공유)"""
+    try:
+        raw = load_finra_raw(engine, date_str, missing)
+        if raw is None:
+            return None
+        return parse_finra_file(raw, symbols)
+    except:
+        return None
+
+# ==================== FINRA 공매도 잔고 (월 2회, 전 종목) ====================
+
+# FINRA API 응답 필드 → 내부 컬럼
+SHORT_INTEREST_FIELDS = {
+    'symbolCode': 'symbol',
+    'currentShortPositionQuantity': 'shares_short',
+    'daysToCoverQuantity': 'days_to_cover',
+    'averageDailyVolumeQuantity': 'avg_daily_volume'
+}
+
+def short_interest_mirror_path(settlement):
+    """로컬 미러 내 결제 기준일별 공매도 잔고 파일 경로"""
+    return os.path.join(FINRA_MIRROR_DIR, 'short_interest', f"shrt{settlement:%Y%m%d}.csv.gz")
+
+def fetch_short_interest(engine, settlement, page_size=SHORT_INTEREST_PAGE_SIZE):
+    """FINRA API에서 결제 기준일의 전 종목 공매도 잔고를 페이지 단위로 수집 (미게시면 빈 표, 실패 시 None)"""
+    rows, offset = [], 0
+    while True:
+        response = engine.post(FINRA_SHORT_INTEREST_URL, json={
+            'fields': list(SHORT_INTEREST_FIELDS),
+            'compareFilters': [{'compareType': 'EQUAL', 'fieldName': 'settlementDate',
+                                'fieldValue': settlement.isoformat()}],
+            'limit': page_size,
+            'offset': offset
+        }, headers={'Accept': 'application/json'}, timeout=30)
+        if response.status_code == 204:
+            break
+        if response.status_code != 200:
+            return None
+        page = response.json()
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+
+    df = pd.DataFrame(rows, columns=list(SHORT_INTEREST_FIELDS)).rename(columns=SHORT_INTEREST_FIELDS)
+    df = df.dropna(subset=['symbol']).drop_duplicates(subset='symbol', keep='first').set_index('symbol')
+    return df.apply(pd.to_numeric, errors='coerce')
+
+def load_short_interest(engine, settlement):
+    """결제 기준일 공매도 잔고 (로컬 미러 우선, 없으면 API 수집 후 미러에 저장)"""
+    path = short_interest_mirror_path(settlement)
+    try:
+        if os.path.exists(path):
+            return pd.read_csv(path, index_col='symbol', dtype={'symbol': 'object'}, keep_default_na=False, na_values=[''])
+
+        df = fetch_short_interest(engine, settlement)
+        if df is None or df.empty:
+            return df
+        with atomic_write(path) as tmp_path:
+            df.to_csv(tmp_path, compression='gzip')
+        return df
+    except:
+        return None
+
+class ShortInterestProvider:
+    """FINRA 공매도 잔고 파일을 결제 기준일 단위로 한 번에 받아 다음 게시 시각까지 보관
+
+    종목별 공매도 수량·Days to Cover는 FINRA 표에서 가져오고, Yahoo 는 두 경우에만 조회한다.
+    FINRA 표에 없는 종목의 공매도 정보 (결제 기준일이 바뀌거나 새로고침할 때 다시 조회),
+    % Float 계산용 유통 주식 수 (자주 바뀌지 않으므로 FLOAT_SHARES_TTL_SECONDS 동안 유지, 새로고침과 무관).
+    """
+
+    def __init__(self, engine, lag=SHORT_INTEREST_PUBLICATION_LAG):
+        self.engine = engine
+        self.lag = lag
+        self._table = None
+        self._settlement = None
+        self._expires_at = 0.0
+        self._yahoo = {}            # ticker -> Yahoo 공매도 정보 (FINRA 표에 없는 종목, 현재 결제 기준일 동안 유지)
+        self._floats = {}           # ticker -> (조회 시각, Yahoo 정보) — 유통 주식 수용
+        self._yahoo_pending = {}    # ticker -> 진행 중인 Yahoo 요청 (동시 요청은 공유)
+        self._lock = threading.Lock()       # 상태 조회·갱신
+        self._loading = threading.Lock()    # 표 다운로드는 한 번에 하나만 (잠금 밖에서 대기)
+
+    def refresh(self):
+        """다음 요청 때 게시 여부를 다시 확인하고 FINRA 표에 없는 종목의 Yahoo 정보도 다시 조회 (유통 주식 수는 유지)"""
+        with self._lock:
+            self._expires_at = 0.0
+            self._yahoo.clear()
+
+    def table(self):
+        """가장 최근 게시된 결제 기준일의 전 종목 공매도 잔고 → (DataFrame, 결제 기준일), 없으면 (None, None)"""
+        with self._lock:
+            if time.time() < self._expires_at:
+                return self._table, self._settlement
+
+        with self._loading:
+            with self._lock:
+                if time.time() < self._expires_at:
+                    return self._table, self._settlement
+
+            # 예상 게시일이 지났는데 아직 없으면 직전 결제 기준일 데이터 사용
+            expected = latest_short_interest_settlement(self.lag)
+            df, settlement = None, None
+            for candidate in short_interest_settlements(expected - timedelta(days=45), expected)[::-1][:3]:
+                df = load_short_interest(self.engine, candidate)
+                if df is not None and not df.empty:
+                    settlement = candidate
+                    break
+                df = None
+
+            with self._lock:
+                if settlement != self._settlement:
+                    self._yahoo.clear()
+                self._table, self._settlement = df, settlement
+                if settlement == expected:
+                    self._expires_at = next_short_interest_publication(self.lag).timestamp()
+                else:
+                    self._expires_at = time.time() + MISSING_RECHECK_SECONDS
+            return df, settlement
+
+    def request(self, tickers):
+        """공매도 잔고 표 확인 + FINRA 표에 없거나 유통 주식 수가 오래된 종목만 Yahoo 병렬 요청"""
+        table, settlement = self.table()
+        now = time.time()
+        with self._lock:
+            futures = {}
+            for t in tickers:
+                if table is not None and t.upper() in table.index:
+                    cached = self._floats.get(t)
+                    if cached is not None and now - cached[0] < FLOAT_SHARES_TTL_SECONDS:
+                        continue
+                elif t in self._yahoo:
+                    continue
+                if t not in self._yahoo_pending:
+                    self._yahoo_pending[t] = self.engine.submit(fetch_yf_short_info, self.engine, t)
+                futures[t] = self._yahoo_pending[t]
+        return table, settlement, futures
+
+    def resolve(self, tickers, pending):
+        """ticker -> 공매도 정보 (fetch_yf_short_info 와 같은 키 + 결제 기준일)"""
+        table, settlement, futures = pending
+        results = {t: future.result() for t, future in futures.items()}
+        with self._lock:
+            for t, future in futures.items():
+                if self._yahoo_pending.get(t) is future:
+                    del self._yahoo_pending[t]
+            fetched = {t: info for t, info in results.items() if info['source'] != 'none'}
+            self._floats.update({t: (time.time(), info) for t, info in fetched.items()})
+            self._yahoo.update({t: info for t, info in fetched.items()
+                                if table is None or t.upper() not in table.index})
+            yahoo = {t: self._yahoo.get(t) or results.get(t) for t in tickers}
+            floats = {t: (self._floats[t][1] if t in self._floats else results.get(t)) for t in tickers}
+
+        short_info = {}
+        for t in tickers:
+            symbol = t.upper()
+            if table is None or symbol not in table.index:
+                short_info[t] = yahoo[t] or dict(EMPTY_SHORT_INFO)
+                continue
+
+            row = table.loc[symbol]
+            info = floats[t] or EMPTY_SHORT_INFO
+            float_shares = info['float_shares'] or 0
+            shares_short = float(row['shares_short'])
+            short_info[t] = {
+                'shares_short': shares_short,
+                'short_percent_float': (shares_short / float_shares * 100 if float_shares > 0
+                                        else info['short_percent_float']),
+                'short_ratio_days': float(row['days_to_cover']),
+                'shares_outstanding': info['shares_outstanding'],
+                'float_shares': float_shares,
+                'source': 'finra',
+                'settlement_date': settlement
+            }
+        return short_info
+
+    def short_info(self, tickers):
+        return self.resolve(tickers, self.request(tickers))
+
+# ==================== 기간 인지 수집 저장소 ====================
+
+class MarketDataStore:
+    """날짜별 FINRA 파일 / 날짜 × 티커 거래량을 보관하고 요청 기간만큼 잘라서 제공 (공매도 잔고는 제공자에 위임)
+
+    분석 기간을 늘리면 부족한 날짜만 추가로 수집하고, 줄이면 메모리에서 바로 응답한다.
+    종목 우선 인덱스가 있으면 인덱스에 반영된 날짜는 일일 파일을 읽지 않고 종목 블록에서 바로 복원한다.
+    """
+
+    def __init__(self, engine, missing=None, short_interest=None, index=None,
+                 refresh_seconds=MARKET_REFRESH_SECONDS):
+        self.engine = engine
+        self.missing = missing
+        self.short_interest = short_interest or ShortInterestProvider(engine)
+        self.index = index
+        self.refresh_seconds = refresh_seconds
+        self._finra = {}            # date -> (보유 종목 집합, None 이면 전 종목; DataFrame)
+        self._inflight = {}         # date -> (요청 종목 집합, Future) — 수집 중인 일일 파일
+        self._volumes = None        # 날짜 × 티커 거래량 행렬
+        self._volume_start = None
+        self._volume_fetched_at = 0.0
+        self._lock = threading.Lock()    # 저장소 조회·갱신에만 사용 (네트워크 대기는 잠금 밖)
+
+    def refresh(self):
+        """거래량/공매도 정보를 다음 요청 때 다시 확인 (게시된 FINRA 파일은 불변이므로 유지)"""
+        with self._lock:
+            self._volume_fetched_at = 0.0
+        self.short_interest.refresh()
+
+    def _request_finra(self, dates, symbols=None):
+        """저장된 날짜는 바로 사용, 종목 지정 요청은 인덱스에서 복원, 나머지 날짜만 병렬 수집 요청
+
+        같은 날짜를 이미 받고 있는 요청이 필요한 종목을 포함하면 그 요청을 기다린다 (중복 수집 없음).
+        잠금은 저장소 조회와 요청 등록에만 쓰고, 기다리는 일은 _resolve_finra 에서 잠금 밖에서 한다.
+        """
+        with self._lock:
+            files = {d: self._finra[d][1] for d in dates
+                     if d in self._finra and _covers(self._finra[d][0], symbols)}
+        pending = [d for d in dates if d not in files]
+
+        if symbols is not None and self.index is not None and pending:
+            files.update(self.index.frames(sorted(symbols), pending))
+
+        futures = {}
+        with self._lock:
+            for d in pending:
+                if d in files:
+                    continue
+                entry, inflight = self._finra.get(d), self._inflight.get(d)
+                if entry is not None and _covers(entry[0], symbols):
+                    files[d] = entry[1]
+                elif inflight is not None and _covers(inflight[0], symbols):
+                    futures[d] = inflight
+                else:
+                    wanted = None if symbols is None else symbols.union(
+                        *(e[0] for e in (entry, inflight) if e is not None and e[0] is not None))
+                    futures[d] = self._inflight[d] = (
+                        wanted, self.engine.submit(fetch_finra_daily_file, self.engine, d, self.missing, wanted))
+        return files, futures
+
+    def _resolve_finra(self, dates, files, futures):
+        """수집 요청 완료 대기 (잠금 밖) 후 결과를 저장소에 게시 — 더 많은 종목을 가진 항목은 덮어쓰지 않음"""
+        for d, (wanted, future) in futures.items():
+            df = future.result()
+            with self._lock:
+                if self._inflight.get(d, (None, None))[1] is future:
+                    del self._inflight[d]
+                entry = self._finra.get(d)
+                if df is not None and (entry is None or (entry[0] is not None and _covers(wanted, entry[0]))):
+                    self._finra[d] = (wanted, df)
+            if df is not None:
+                files[d] = df
+        return {d: files.get(d) for d in dates}
+
+    def _extend_index(self, files, chunk=FETCH_MAX_WORKERS * 4):
+        """인덱스 마지막 날짜 다음 거래일부터 빠짐없이 날짜순 추가
+
+        files 에 없는 앞쪽 거래일(건너뛴 실행 등)은 먼저 받아 채우고, 받지 못한 날짜(없는 파일로 확인된 날 제외)가
+        있으면 그 앞까지만 추가한다 (인덱스에 빈 거래일이 생기지 않도록).
+        """
+        last = self.index.last_date
+        if last is None:
+            dates = sorted(files)
+        else:
+            dates = trading_dates_between(datetime.strptime(last, '%Y%m%d') + timedelta(days=1), datetime.now())
+
+        for i in range(0, len(dates), chunk):
+            part = {d: files.get(d) for d in dates[i:i + chunk]}
+            # 빈 거래일은 저장소에 남기지 않고 바로 인덱스에 넣음 (전 종목 파일 여러 달치를 메모리에 두지 않도록)
+            futures = {d: self.engine.submit(fetch_finra_daily_file, self.engine, d, self.missing)
+                       for d in part if d not in files}
+            part.update({d: f.result() for d, f in futures.items()})
+
+            new = {}
+            for d, df in part.items():
+                if df is None:
+                    if self.missing is not None and self.missing.contains(d):
+                        continue
+                    self.index.update(new)
+                    return
+                new[d] = df
+            self.index.update(new)
+
+    def _plan_volumes(self, tickers, start):
+        """거래량 행렬에서 부족한 종목·앞쪽 기간·오래된 최근 구간 → 수집할 (종류, 종목, 시작, 끝) 목록 (잠금 안에서 호출)"""
+        cached = self._volumes
+        if cached is None:
+            return [('initial', list(tickers), start, None)]
+
+        jobs = []
+        new_tickers = [t for t in tickers if t not in cached.columns]
+        if new_tickers:
+            jobs.append(('tickers', new_tickers, min(start, self._volume_start), None))
+        if start < self._volume_start:
+            jobs.append(('backfill', list(cached.columns), start, self._volume_start + timedelta(days=1)))
+        if time.time() - self._volume_fetched_at > self.refresh_seconds:
+            jobs.append(('refresh', list(cached.columns), cached.index.max(), None))
+        return jobs
+
+    def _merge_volumes(self, kind, start, fetched):
+        """수집한 거래량을 현재 행렬에 합침 (잠금 안에서 호출, 행렬은 제자리 수정 없이 교체)"""
+        cached = self._volumes
+        if fetched is None:
+            return
+        if cached is None:
+            self._volumes, self._volume_start, self._volume_fetched_at = fetched, start, time.time()
+        elif kind == 'refresh':
+            self._volumes, self._volume_fetched_at = fetched.combine_first(cached), time.time()
+        else:
+            self._volumes = cached.combine_first(fetched)
+            if kind == 'backfill':
+                self._volume_start = min(self._volume_start, start)
+            elif kind == 'initial':
+                # 다른 요청이 먼저 만든 행렬과 합친 경우 — 두 요청 모두 보장하는 구간만 인정
+                self._volume_start = max(self._volume_start, start)
+
+    def _update_volumes(self, tickers, start):
+        """부족한 거래량만 수집 (Yahoo 다운로드는 잠금 밖에서) → 현재 행렬"""
+        with self._lock:
+            jobs = self._plan_volumes(tickers, start)
+        for kind, job_tickers, job_start, job_end in jobs:
+            fetched = fetch_market_volumes(self.engine, job_tickers, job_start, job_end)
+            with self._lock:
+                self._merge_volumes(kind, job_start, fetched)
+        with self._lock:
+            return self._volumes
+
+    def history(self, tickers, dates, start, end=None):
+        """지정 거래일의 FINRA 파일 + start ~ end 거래량 행렬 (공매도 잔고 제외)"""
+        tickers = tuple(tickers)
+        files, finra_futures = self._request_finra(dates, frozenset(t.upper() for t in tickers))
+        volumes = self._update_volumes(tickers, start)
+        finra_files = self._resolve_finra(dates, files, finra_futures)
+
+        if volumes is not None:
+            in_range = volumes.index >= pd.Timestamp(start).normalize()
+            if end is not None:
+                in_range &= volumes.index <= pd.Timestamp(end)
+            volumes = volumes.loc[in_range, [t for t in tickers if t in volumes.columns]]
+        return {
+            'finra_files': finra_files,
+            'market_volumes': volumes
+        }
+
+    def collect(self, tickers, days_back=60):
+        """요청 종목·기간의 FINRA 파일 + 거래량 행렬 + 공매도 정보"""
+        tickers = tuple(tickers)
+        dates = get_trading_dates(days_back)
+        start = datetime.now() - timedelta(days=days_back + 10)
+
+        short_pending = self.short_interest.request(tickers)
+        market_data = self.history(tickers, dates, start)
+        market_data['yf_short_info'] = self.short_interest.resolve(tickers, short_pending)
+        market_data['cross_section'] = self.cross_section(tickers, start)
+        return market_data
+
+    def cross_section(self, tickers, start):
+        """start 이후 요청 종목의 전 종목 기준 백분위·z-점수 (인덱스를 앞쪽 여유 기간까지 채워 계산), 인덱스가 없으면 None"""
+        if self.index is None:
+            return None
+        self.universe((datetime.now() - pd.Timestamp(start)).days + CROSS_SECTION_WARMUP_DAYS)
+        first = (pd.Timestamp(start) - timedelta(days=CROSS_SECTION_WARMUP_DAYS)).strftime('%Y%m%d')
+        short, total = self.index.matrix(None, first)
+        if short.empty:
+            return None
+        return cross_sectional_scores(short, total, tickers, start)
+
+    def universe(self, days_back=60):
+        """요청 기간의 전 종목 FINRA 파일"""
+        dates = get_trading_dates(days_back)
+        files, futures = self._request_finra(dates)
+        files = self._resolve_finra(dates, files, futures)
+        if self.index is not None:
+            self._extend_index(files)
+        return files
+
+def _covers(have, symbols):
+    """보유 종목 집합(None 이면 전 종목)이 요청 종목(None 이면 전 종목)을 모두 포함하는지"""
+    return have is None or (symbols is not None and symbols <= have)
+
+def collect_market_data(tickers, days_back=60):
+    """FINRA 일일 파일 + Yahoo 거래량 행렬 + 공매도 잔고 (저장소에 없는 날짜·종목만 병렬 수집)"""
+    return get_market_store().collect(tickers, days_back)
+
+def load_finra_universe(days_back=60):
+    """FINRA 일일 파일 전 종목 로드 (저장소에 없는 날짜만 수집, 미러 재사용)"""
+    return get_market_store().universe(days_back)
+
+def rebuild_symbol_index(days_back, chunk=FETCH_MAX_WORKERS * 4):
+    """최근 days_back 일의 FINRA 일일 파일(미러 우선)로 종목 우선 인덱스를 처음부터 다시 생성 → 반영된 거래일 수"""
+    engine = get_fetch_engine()
+    missing = get_missing_file_cache()
+    index = get_symbol_index()
+    index.reset()
+
+    dates = get_trading_dates(days_back)[::-1]
+    for i in range(0, len(dates), chunk):
+        futures = {d: engine.submit(fetch_finra_daily_file, engine, d, missing) for d in dates[i:i + chunk]}
+        index.update({d: f.result() for d, f in futures.items()})
+    index.compact()
+    return len(index.dates)
+
+def update_symbol_index(days_back):
+    """인덱스가 최근 days_back 일을 포함하도록 준비 (앞쪽 기간이 비면 재생성, 아니면 새 거래일만 추가) → 반영된 거래일 수"""
+    index = get_symbol_index()
+    dates = get_trading_dates(days_back)
+    # 맨 앞 며칠은 FINRA 미게시일일 수 있으므로 여유를 둠
+    if not dates or not index.dates or index.dates[0] > dates[-min(len(dates), 5)]:
+        return rebuild_symbol_index(days_back)
+    gap = (datetime.now() - datetime.strptime(index.last_date, '%Y%m%d')).days
+    get_market_store().universe(gap)
+    return len(index.dates)
+
+def load_short_interest_history(start, end=None, lag=SHORT_INTEREST_PUBLICATION_LAG):
+    """start ~ end 사이에 게시된 결제 기준일별 전 종목 공매도 잔고 (게시일 → 표, 오래된 순, 받지 못한 날은 제외)"""
+    engine = get_fetch_engine()
+    end = end or datetime.now()
+    settlements = short_interest_settlements(pd.Timestamp(start) - timedelta(days=31), end)
+    futures = {s: engine.submit(load_short_interest, engine, s) for s in settlements
+               if short_interest_publication_time(s, lag) <= datetime.now(MARKET_TZ)}
+    tables = {}
+    for settlement, future in futures.items():
+        df = future.result()
+        if df is not None and not df.empty:
+            tables[pd.Timestamp(short_interest_publication_time(settlement, lag).date())] = df
+    return tables
+
+def load_short_interest_table():
+    """최근 결제 기준일의 전 종목 공매도 잔고 (shares_short, days_to_cover, avg_daily_volume), 없으면 None"""
+    return get_short_interest_provider().table()[0]
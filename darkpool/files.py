@@ -0,0 +1,25 @@
+"""공유 data/ 디렉토리 파일 쓰기 도우미 (여러 프로세스·레플리카가 같은 경로를 써도 안전)"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(path, suffix='.tmp'):
+    """같은 디렉토리의 고유 임시 파일 경로를 넘겨주고, 블록이 정상 종료되면 os.replace 로 교체
+
+    임시 파일 이름은 mkstemp 가 프로세스 간에도 겹치지 않게 만든다. 실패하면 임시 파일을 지우고 예외를 그대로 올린다.
+    suffix 는 확장자를 강제하는 라이브러리용 (np.savez → '.npz').
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=suffix)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,212 @@
+"""FINRA × 시장 거래량 지표 계산, 전체 시장 스크리너"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .config import MAG7_STOCKS, ROLLING_CAPACITY
+from .cross_section import SCORE_COLUMNS, latest_scores
+from .rolling import RollingMetricsStore
+from .signals import DEFAULT_SIGNAL, SIGNAL_RULES, assign_signals
+
+# ==================== 지표 계산 ====================
+
+# 패널 컬럼 타입 (종목 × 날짜 long format): 비율 지표는 float32, 거래량은 int32 범위를 넘을 수 있어 int64
+PANEL_DTYPES = {
+    'dp_ratio': 'float32',
+    'dp_short_ratio': 'float32',
+    'dp_short_market_impact': 'float32',
+    'dp_short_ratio_10d_avg': 'float32',
+    'dp_short_change_pct': 'float32',
+    'yf_short_ratio_days': 'float32',
+    'market_vol': 'int64',
+    **{column: 'float32' for column in SCORE_COLUMNS}
+}
+SIGNAL_DTYPE = pd.CategoricalDtype([rule['name'] for rule in SIGNAL_RULES] + [DEFAULT_SIGNAL])
+
+# 패널 컬럼 순서
+PANEL_COLUMNS = ['ticker', 'date', 'dp_ratio', 'dp_short_ratio', 'dp_short_market_impact',
+                 'market_vol', 'dp_short_ratio_10d_avg', 'dp_short_change_pct',
+                 'yf_short_ratio_days', *SCORE_COLUMNS, 'Signal']
+
+def daily_metrics(finra_files, volume_matrix, tickers, days_back=None):
+    """FINRA × 시장 거래량 벡터화 병합 → 종목별 일별 지표 (float64, 공매도 잔고·신호 제외, 원 거래량 포함)"""
+    finra_files = {d: df for d, df in finra_files.items() if df is not None}
+    if volume_matrix is None or volume_matrix.empty or not finra_files:
+        return None
+
+    symbols = pd.Index(dict.fromkeys(t.upper() for t in tickers))
+    finra = pd.concat(
+        {d: df.loc[df.index.intersection(symbols)] for d, df in finra_files.items()},
+        names=['date', 'ticker']
+    ).reset_index()
+    finra['date'] = pd.to_datetime(finra['date'], format='%Y%m%d')
+
+    market = (volume_matrix.rename_axis(index='date', columns='ticker')
+              .stack().rename('market_vol').reset_index())
+    market['ticker'] = market['ticker'].str.upper()
+
+    panel = finra.merge(market, on=['date', 'ticker'], how='inner')
+    panel = panel[(panel['market_vol'] > 0) & (panel['totalVolume'] > 0)]
+
+    panel['dp_ratio'] = (panel['totalVolume'] / panel['market_vol'] * 100).clip(upper=100).round(2)
+    panel['dp_short_ratio'] = (panel['shortVolume'] / panel['totalVolume'] * 100).round(2)
+    panel['dp_short_market_impact'] = (panel['shortVolume'] / panel['market_vol'] * 100).round(2)
+
+    panel['ticker'] = pd.Categorical(panel['ticker'], categories=symbols)
+    panel = panel.sort_values(['ticker', 'date'])
+    if days_back is not None:
+        panel = panel.groupby('ticker', sort=False, observed=True).tail(days_back)
+    panel['dp_short_ratio_10d_avg'] = (panel.groupby('ticker', sort=False, observed=True)['dp_short_ratio']
+                                       .rolling(window=10, min_periods=1).mean()
+                                       .reset_index(level=0, drop=True))
+
+    # 일별 신호: 당일 vs 직전 10일 평균 변화량
+    panel['dp_short_change_pct'] = panel['dp_short_ratio'] - panel['dp_short_ratio_10d_avg']
+    return panel.reset_index(drop=True)
+
+def attach_short_info(panel, yf_short_info):
+    """일별 지표에 현재 Days to Cover(과거 일자에도 동일 값 적용)와 신호를 붙여 패널 형식으로 변환"""
+    panel = panel.copy()
+    panel['yf_short_ratio_days'] = panel['ticker'].map(
+        {t.upper(): info['short_ratio_days'] for t, info in yf_short_info.items()}
+    ).astype(float)
+    # 신호는 float64 값으로 판정한 뒤 저장 타입으로 변환 (임계값 경계 판정 보존)
+    panel['Signal'] = pd.Categorical(assign_signals(panel), dtype=SIGNAL_DTYPE)
+    # 횡단면 점수가 없는 패널(장기 모드 파티션 등)은 NaN
+    return panel.reindex(columns=PANEL_COLUMNS).astype(PANEL_DTYPES).reset_index(drop=True)
+
+def attach_cross_section(panel, scores):
+    """일별 지표에 전 종목 기준 백분위·z-점수 병합 (종목·날짜 기준, 없는 칸은 NaN)"""
+    if scores is None or scores.empty:
+        return panel
+    categories = panel['ticker'].dtype
+    merged = panel.assign(ticker=panel['ticker'].astype(object)).merge(scores, on=['ticker', 'date'], how='left')
+    return merged.assign(ticker=merged['ticker'].astype(categories))
+
+def build_metrics_panel(market_data, tickers, days_back=60):
+    """FINRA × 시장 거래량 벡터화 병합 → 전 종목·전 날짜 지표 패널 (long format, 컬럼형 압축 타입)"""
+    panel = daily_metrics(market_data['finra_files'], market_data['market_volumes'], tickers, days_back)
+    if panel is None:
+        return None
+    panel = attach_cross_section(panel, market_data.get('cross_section'))
+    return attach_short_info(panel, market_data['yf_short_info'])
+
+def ticker_history(panel, ticker):
+    """패널에서 한 종목의 날짜순 히스토리"""
+    return panel[panel['ticker'] == ticker.upper()].drop(columns='ticker').reset_index(drop=True)
+
+def latest_snapshot(panel, yf_short_info):
+    """패널의 종목별 최신 행 + Yahoo 공매도 정보 → 종목 요약 테이블 (Days to Cover 순, 데이터 없으면 None)"""
+    if panel is None or panel.empty:
+        return None
+
+    latest = panel.groupby('ticker', sort=False, observed=True).tail(1).reset_index(drop=True)
+    info = pd.DataFrame.from_dict({t.upper(): v for t, v in yf_short_info.items()}, orient='index')
+    info = info.reindex(latest['ticker'].astype(str))
+
+    shares_short = info['shares_short'].fillna(0).to_numpy(dtype=float)
+    impact_volume = latest['dp_short_market_impact'].astype(float).round(2).to_numpy() * latest['market_vol'].to_numpy()
+    # FINRA/YF 비율: FINRA 일일 공매도량 / YF 전체 공매도 잔고
+    finra_yf = np.divide(impact_volume, shares_short, out=np.zeros(len(latest)), where=shares_short > 0)
+
+    snapshot = pd.DataFrame({
+        'ticker': latest['ticker'].astype(str),
+        'name': [MAG7_STOCKS.get(t, t) for t in latest['ticker'].astype(str)],
+        'latest_date': latest['date'],
+        # 소수 2자리로 계산된 비율은 float32 저장 오차 없이 복원
+        'dp_ratio': latest['dp_ratio'].astype(float).round(2),
+        'dp_short_ratio': latest['dp_short_ratio'].astype(float).round(2),
+        'dp_short_market_impact': latest['dp_short_market_impact'].astype(float).round(2),
+        'dp_short_10d_avg': latest['dp_short_ratio_10d_avg'].astype(float),
+        'dp_short_change_pct': latest['dp_short_change_pct'].astype(float),
+        'yf_shares_short': shares_short,
+        'yf_short_percent_float': info['short_percent_float'].to_numpy(dtype=float),
+        'yf_short_ratio_days': info['short_ratio_days'].to_numpy(dtype=float),
+        'finra_yf_short_ratio': finra_yf,
+        **{column: latest[column].astype(float).round(2) for column in SCORE_COLUMNS},
+        'Signal': latest['Signal'].astype(str)
+    })
+    return snapshot.sort_values('yf_short_ratio_days', ascending=False)
+
+# ==================== 전체 시장 스크리너 ====================
+
+def update_universe_store(store, finra_files):
+    """FINRA 일일 파일 중 저장소에 반영되지 않은 날짜만 증분 추가 (과거 날짜가 늦게 도착하면 재구성)"""
+    files = {d: df for d, df in finra_files.items() if df is not None}
+    if store.last_date is not None and any(d < store.last_date and d not in store.dates for d in files):
+        store.reset()
+
+    for date_str in sorted(files):
+        if store.last_date is None or date_str > store.last_date:
+            df = files[date_str]
+            ratio = (df['shortVolume'] / df['totalVolume'].where(df['totalVolume'] > 0) * 100).round(2)
+            store.push(date_str, ratio, finra_total_volume=df['totalVolume'])
+    return store
+
+def build_screener(finra_files, market_snapshot=None, store=None, window=10, short_interest=None):
+    """전 종목 DP 내부 공매도 비율·창 평균·변화율·신호 계산 (롤링 저장소 증분 갱신)"""
+    if store is None or window > store.capacity:
+        store = RollingMetricsStore(window=window, capacity=max(window, ROLLING_CAPACITY))
+    update_universe_store(store, finra_files)
+    if store.last_date is None:
+        return None
+
+    snapshot = store.snapshot(window)
+    screener = pd.DataFrame({
+        'dp_short_ratio': snapshot['latest'],
+        'dp_short_10d_avg': snapshot['rolling_mean'],
+        'dp_short_change_pct': snapshot['change'],
+        'finra_total_volume': snapshot['finra_total_volume'],
+        'days_observed': snapshot['observations']
+    })
+    screener.index.name = 'ticker'
+    # 당일 전 종목 기준 백분위·로버스트 z (종목 자체 롤링 z 는 관심 종목 패널에서만)
+    screener = latest_scores(screener)
+
+    # DP 비중은 시장 거래량이 있는 관심 종목만, Days to Cover는 FINRA 공매도 잔고가 있는 종목만 반영
+    # (나머지는 NaN → 해당 조건 제외)
+    screener['dp_ratio'] = np.nan
+    screener['yf_short_ratio_days'] = np.nan
+    if short_interest is not None:
+        screener['yf_short_ratio_days'] = short_interest['days_to_cover'].reindex(screener.index).astype(float)
+    if market_snapshot is not None and not market_snapshot.empty:
+        watchlist = market_snapshot.set_index('ticker')[['dp_ratio', 'yf_short_ratio_days']]
+        screener.update(watchlist)
+
+    screener['Signal'] = assign_signals(screener)
+    screener['latest_date'] = datetime.strptime(store.last_date, '%Y%m%d').strftime('%Y-%m-%d')
+    return screener.reset_index()
+
+# ==================== 주간/월간 롤업 ====================
+
+# 롤업 단위 → pandas 기간 (주간은 금요일 마감)
+ROLLUP_FREQS = {'weekly': 'W-FRI', 'monthly': 'M'}
+
+def rollup_sums(daily, freq):
+    """일별 지표 → 종목 × 기간별 거래량 합계 (파티션 경계에 걸친 기간도 더해서 합칠 수 있는 형태)"""
+    sums = daily.assign(
+        period=daily['date'].dt.to_period(ROLLUP_FREQS[freq]).dt.start_time,
+        days=1
+    )
+    return (sums.groupby(['ticker', 'period'], sort=False, observed=True)
+            .agg(shortVolume=('shortVolume', 'sum'), totalVolume=('totalVolume', 'sum'),
+                 market_vol=('market_vol', 'sum'), days=('days', 'sum'), date=('date', 'max'))
+            .reset_index())
+
+def finalize_rollups(sums):
+    """기간별 거래량 합계 → 거래량 가중 비율 (DP 비중·시장 영향은 시장 거래량, DP 내부 공매도는 FINRA 거래량 가중)"""
+    sums = (sums.groupby(['ticker', 'period'], sort=True, observed=True)
+            .agg(shortVolume=('shortVolume', 'sum'), totalVolume=('totalVolume', 'sum'),
+                 market_vol=('market_vol', 'sum'), days=('days', 'sum'), date=('date', 'max'))
+            .reset_index())
+    return pd.DataFrame({
+        'ticker': sums['ticker'],
+        'period': sums['period'],
+        'date': sums['date'],
+        'dp_ratio': (sums['totalVolume'] / sums['market_vol'] * 100).clip(upper=100).round(2),
+        'dp_short_ratio': (sums['shortVolume'] / sums['totalVolume'] * 100).round(2),
+        'dp_short_market_impact': (sums['shortVolume'] / sums['market_vol'] * 100).round(2),
+        'market_vol': sums['market_vol'],
+        'days': sums['days']
+    })
@@ -0,0 +1,200 @@
+"""장기(1~5년) 모드: 종목별 일별 지표 연/월 파티션 (요청 구간이 걸치는 파티션만 지연 로드)"""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .config import (
+    MARKET_REFRESH_SECONDS, PANEL_PARTITION_DIR, PARTITION_CACHE_ENTRIES, PARTITION_WARMUP_DAYS
+)
+from .fetch import get_market_store
+from .files import atomic_write
+from .metrics import attach_short_info, daily_metrics
+from .rollups import RollupStore
+from .trading_calendar import latest_published_date, trading_dates_between
+
+# 파티션에 저장하는 일별 컬럼 (원 거래량 포함 — 주간/월간 롤업 합계용)
+PARTITION_COLUMNS = ['ticker', 'date', 'shortVolume', 'totalVolume', 'market_vol', 'dp_ratio',
+                     'dp_short_ratio', 'dp_short_market_impact', 'dp_short_ratio_10d_avg', 'dp_short_change_pct']
+
+class PanelPartitions:
+    """종목별 일별 지표를 연/월 파티션(YYYY/MM.pkl)으로 보관하고 요청 구간이 걸치는 파티션만 읽음
+
+    마지막 거래일까지 게시가 끝났고 모든 거래일의 FINRA 파일·거래량을 받은 달만 한 번 계산해 디스크에 저장하고 다시 계산하지 않는다.
+    진행 중인 달과 수집이 일부 실패한 달은 메모리에만 두고 refresh_seconds 가 지나면 다시 계산한다.
+    파티션을 계산하거나 읽을 때마다 새 거래일 분만 롤업 저장소에 더해 긴 구간 추세는 일별 행 없이 그린다.
+    """
+
+    def __init__(self, store, path=PANEL_PARTITION_DIR, max_entries=PARTITION_CACHE_ENTRIES,
+                 refresh_seconds=MARKET_REFRESH_SECONDS, rollup_store=None):
+        self.store = store
+        self.rollup_store = rollup_store or RollupStore()
+        self.path = path
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self._entries = OrderedDict()   # month -> (계산 시각, 파티션)
+        self._building = {}             # month -> 잠금 (같은 달을 동시에 두 번 계산하지 않도록)
+        self._lock = threading.Lock()   # _entries 조회·갱신에만 사용 (파티션 계산은 잠금 밖)
+
+    def _path(self, month):
+        return os.path.join(self.path, f"{month.year}", f"{month.month:02d}.pkl")
+
+    def _is_sealed(self, month):
+        """달의 마지막 날까지 FINRA 게시가 끝났는지 (이후 내용이 바뀌지 않음)"""
+        return month.end_time.date() <= latest_published_date()
+
+    def _is_complete(self, data, tickers):
+        """계획한 모든 거래일의 FINRA 파일(없는 것으로 확인된 날 제외)과 그날 요청 종목 거래량을 받았는지"""
+        missing = self.store.missing
+        dates = []
+        for d, df in data['finra_files'].items():
+            if df is not None:
+                dates.append(d)
+            elif missing is None or not missing.contains(d):
+                return False
+        if not dates:
+            return True
+
+        volumes = data['market_volumes']
+        if volumes is None or not set(tickers) <= set(volumes.columns):
+            return False
+        return bool(pd.to_datetime(dates, format='%Y%m%d').isin(volumes.index).all())
+
+    def _build(self, month, tickers):
+        """한 달 파티션 계산 → (일별 지표, 수집 완료 여부)
+
+        10일 평균은 앞쪽 여유 기간까지 포함해 계산한 뒤 해당 월만 남긴다.
+        """
+        start = month.start_time - timedelta(days=PARTITION_WARMUP_DAYS)
+        dates = trading_dates_between(start, month.end_time)
+        data = self.store.history(tickers, dates, start, month.end_time)
+        complete = self._is_complete(data, tickers)
+        daily = daily_metrics(data['finra_files'], data['market_volumes'], tickers)
+        if daily is None:
+            daily = pd.DataFrame({c: pd.Series(dtype='datetime64[ns]' if c == 'date' else 'float64')
+                                  for c in PARTITION_COLUMNS})
+        daily = daily.loc[daily['date'] >= month.start_time, PARTITION_COLUMNS]
+        daily['ticker'] = daily['ticker'].astype(object)
+        return daily.reset_index(drop=True), complete
+
+    def _load_file(self, month):
+        try:
+            with open(self._path(month), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _save_file(self, month, partition):
+        path = self._path(month)
+        try:
+            with atomic_write(path) as tmp_path, open(tmp_path, 'wb') as f:
+                pickle.dump(partition, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    def _is_current(self, month, tickers):
+        """메모리에 요청 종목이 모두 있는 최신 파티션이 있는지 (잠금 안에서 호출)"""
+        entry = self._entries.get(month)
+        if entry is None or not tickers <= entry[1]['tickers']:
+            return False
+        return entry[1]['sealed'] or time.time() - entry[0] < self.refresh_seconds
+
+    def _get(self, month, tickers):
+        """한 달 파티션 (메모리 → 디스크 → 계산 순, 없는 종목만 추가 계산)
+
+        같은 달의 계산은 달별 잠금으로 한 번만 하고, 다른 달·다른 요청은 기다리지 않는다.
+        """
+        with self._lock:
+            building = self._building.setdefault(month, threading.Lock())
+        with building:
+            with self._lock:
+                if self._is_current(month, tickers):
+                    self._entries.move_to_end(month)
+                    return self._entries[month][1]
+                entry = self._entries.get(month)
+
+            sealed = self._is_sealed(month)
+            partition = entry[1] if entry is not None and entry[1]['sealed'] else None
+            if partition is None and sealed:
+                partition = self._load_file(month)
+
+            have = partition['tickers'] if partition is not None else frozenset()
+            missing = tickers - have
+            if missing or partition is None:
+                built, complete = self._build(month, tuple(sorted(missing or tickers)))
+                daily = built if partition is None else pd.concat([partition['daily'], built], ignore_index=True)
+                # 수집이 일부 실패한 달은 마감하지 않고 메모리에만 두어 refresh_seconds 뒤 다시 계산
+                partition = {'tickers': have | tickers, 'sealed': sealed and complete, 'daily': daily}
+                if partition['sealed']:
+                    self._save_file(month, partition)
+            self.rollup_store.update(partition['daily'], partition['tickers'], month if partition['sealed'] else None)
+
+            with self._lock:
+                self._entries[month] = (time.time(), partition)
+                self._entries.move_to_end(month)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return partition
+
+    def _ensure(self, tickers, months):
+        """months 파티션을 모두 최신으로 준비 → 파티션 목록"""
+        with self._lock:
+            stale = [m for m in months if not self._is_current(m, tickers)]
+        if stale:
+            # 거래량 행렬은 가장 앞쪽 파티션까지 한 번에 확장 (파티션마다 따로 내려받지 않도록)
+            self.store.history(tuple(sorted(tickers)), [],
+                               stale[0].start_time - timedelta(days=PARTITION_WARMUP_DAYS))
+        return [self._get(m, tickers) for m in months]
+
+    def daily(self, tickers, start, end=None, yf_short_info=None):
+        """start ~ end 구간 일별 지표 패널 (공매도 정보가 있으면 Days to Cover·신호 포함 패널 형식)"""
+        end = end or datetime.now()
+        symbols = frozenset(t.upper() for t in tickers)
+        daily = pd.concat([p['daily'] for p in self._ensure(symbols, _months(start, end))], ignore_index=True)
+        daily = daily[daily['ticker'].isin(symbols)
+                      & (daily['date'] >= pd.Timestamp(start).normalize()) & (daily['date'] <= pd.Timestamp(end))]
+        daily = daily.assign(ticker=pd.Categorical(daily['ticker'],
+                                                   categories=list(dict.fromkeys(t.upper() for t in tickers))))
+        daily = daily.sort_values(['ticker', 'date']).reset_index(drop=True)
+        if yf_short_info is None:
+            return daily
+        return attach_short_info(daily, yf_short_info)
+
+    def rollups(self, tickers, start, end=None, freq='monthly'):
+        """start ~ end 구간 종목별 주간/월간 거래량 가중 지표
+
+        롤업 저장소에 반영이 끝난 마감 월은 건너뛰고, 나머지 달(진행 중인 달 포함)만 파티션을 거쳐 새 거래일을 더한다.
+        """
+        end = end or datetime.now()
+        symbols = frozenset(t.upper() for t in tickers)
+        pending = [m for m in _months(start, end)
+                   if not (self._is_sealed(m) and self.rollup_store.covers(symbols, m))]
+        if pending:
+            self._ensure(symbols, pending)
+        return self.rollup_store.read(tickers, start, end, freq)
+
+def _months(start, end):
+    return pd.period_range(pd.Timestamp(start).to_period('M'), pd.Timestamp(end).to_period('M'), freq='M')
+
+_shared_lock = threading.Lock()
+_shared = {}
+
+def get_panel_partitions():
+    """프로세스 전체에서 공유하는 연/월 파티션 저장소"""
+    store = get_market_store()
+    with _shared_lock:
+        if 'partitions' not in _shared:
+            _shared['partitions'] = PanelPartitions(store)
+        return _shared['partitions']
+
+def warm_partitions(tickers, days_back):
+    """최근 days_back 일 구간의 월 파티션과 롤업을 미리 계산 (마감 월은 디스크에 저장) → 반영된 롤업 행 수
+
+    앱의 장기 모드는 이후 저장된 파티션·롤업만 읽으므로 첫 요청에서 FINRA 파일을 내려받지 않는다.
+    """
+    start = datetime.now() - timedelta(days=days_back)
+    return len(get_panel_partitions().rollups(tuple(tickers), start))
@@ -0,0 +1,121 @@
+"""종목별 롤링 지표 증분 갱신 저장소 (새 거래일 추가 시 종목당 O(1))"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+class RollingMetricsStore:
+    """종목별 최근 N개 값 링버퍼 + 창 합계 (전 종목 벡터 연산으로 하루씩 갱신)"""
+
+    def __init__(self, window=10, capacity=None):
+        self.window = window
+        self.capacity = max(capacity or window, window)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def reset(self):
+        """전체 상태 초기화 (누락된 과거 날짜가 나중에 도착한 경우 재구성용)"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.symbols = pd.Index([], dtype=object)
+        self.buffer = np.full((0, self.capacity), np.nan)
+        self.pos = np.zeros(0, dtype=np.int64)          # 다음 기록 위치
+        self.count = np.zeros(0, dtype=np.int64)        # 누적 관측 수
+        self.window_sum = np.zeros(0)
+        self.latest = np.full(0, np.nan)
+        self.extra = {}                                 # 최신값만 보관하는 보조 컬럼 (거래량 등)
+        self.last_seen = np.zeros(0, dtype=np.int64)    # 종목별 마지막 관측일 (YYYYMMDD)
+        self.dates = set()                              # 반영된 거래일
+        self.last_date = None
+
+    def _rows(self, symbols):
+        """종목 → 행 번호 (신규 종목은 행 추가)"""
+        rows = self.symbols.get_indexer(symbols)
+        new_symbols = symbols[rows < 0]
+        if len(new_symbols):
+            n = len(new_symbols)
+            self.symbols = self.symbols.append(new_symbols)
+            self.buffer = np.vstack([self.buffer, np.full((n, self.capacity), np.nan)])
+            self.pos = np.concatenate([self.pos, np.zeros(n, dtype=np.int64)])
+            self.count = np.concatenate([self.count, np.zeros(n, dtype=np.int64)])
+            self.window_sum = np.concatenate([self.window_sum, np.zeros(n)])
+            self.latest = np.concatenate([self.latest, np.full(n, np.nan)])
+            self.last_seen = np.concatenate([self.last_seen, np.zeros(n, dtype=np.int64)])
+            for name, values in self.extra.items():
+                self.extra[name] = np.concatenate([values, np.full(n, np.nan)])
+            rows = self.symbols.get_indexer(symbols)
+        return rows
+
+    def push(self, date_str, values, **extra):
+        """거래일 하루치 값 추가 (이미 반영된 날짜면 무시하고 False 반환)"""
+        with self._lock:
+            if self.last_date is not None and date_str <= self.last_date:
+                return False
+
+            values = values.dropna()
+            rows = self._rows(values.index)
+            v = values.to_numpy(dtype=float)
+
+            # 창을 벗어나는 값은 덮어쓰기 전에 읽어 합계에서 제외
+            outgoing_pos = (self.pos[rows] - self.window) % self.capacity
+            outgoing = np.where(self.count[rows] >= self.window, self.buffer[rows, outgoing_pos], 0.0)
+
+            self.buffer[rows, self.pos[rows]] = v
+            self.window_sum[rows] += v - outgoing
+            self.pos[rows] = (self.pos[rows] + 1) % self.capacity
+            self.count[rows] += 1
+            self.latest[rows] = v
+            self.last_seen[rows] = int(date_str)
+
+            for name, series in extra.items():
+                if name not in self.extra:
+                    self.extra[name] = np.full(len(self.symbols), np.nan)
+                self.extra[name][rows] = series.reindex(values.index).to_numpy(dtype=float)
+
+            self.dates.add(date_str)
+            self.last_date = date_str
+            return True
+
+    def _recent_sum(self, window):
+        """종목별 최근 window개 값의 합 (링버퍼에서 직접 계산)"""
+        offsets = np.arange(window)
+        cols = (self.pos[:, None] - 1 - offsets[None, :]) % self.capacity
+        values = np.take_along_axis(self.buffer, cols, axis=1)
+        valid = offsets[None, :] < self.count[:, None]
+        return np.where(valid, values, 0.0).sum(axis=1)
+
+    def rolling_mean(self, window=None):
+        """종목별 최근 window개 평균 (기본 창은 누적 합계 사용, 다른 창은 버퍼에서 계산)"""
+        window = window or self.window
+        if window > self.capacity:
+            raise ValueError(f"창 길이 {window}가 보관 용량 {self.capacity}보다 큽니다 (rebuild 필요)")
+
+        with self._lock:
+            total = self.window_sum if window == self.window else self._recent_sum(window)
+            return total / np.maximum(np.minimum(self.count, window), 1)
+
+    def set_window(self, window):
+        """기본 창 길이 변경: 용량 이내면 버퍼에서 합계만 재계산, 초과하면 False (rebuild 필요)"""
+        if window > self.capacity:
+            return False
+        with self._lock:
+            self.window = window
+            self.window_sum = self._recent_sum(window)
+        return True
+
+    def snapshot(self, window=None, latest_only=True):
+        """종목별 최신값 / 창 평균 / 변화량 (latest_only면 마지막 거래일 관측 종목만)"""
+        mean = self.rolling_mean(window)
+        with self._lock:
+            df = pd.DataFrame({
+                'latest': self.latest,
+                'rolling_mean': mean,
+                'change': self.latest - mean,
+                'observations': self.count,
+                **{name: values.copy() for name, values in self.extra.items()}
+            }, index=self.symbols.copy())
+            if latest_only and self.last_date is not None:
+                df = df[self.last_seen == int(self.last_date)]
+        return df
@@ -0,0 +1,96 @@
+"""종목별 주간/월간 거래량 가중 롤업 저장소 (새 거래일만 증분 반영)"""
+import pickle
+import threading
+
+import pandas as pd
+
+from .config import ROLLUP_PATH
+from .files import atomic_write
+from .metrics import ROLLUP_FREQS, finalize_rollups, rollup_sums
+
+# 기간별 합계 컬럼
+SUM_COLUMNS = ['shortVolume', 'totalVolume', 'market_vol', 'days']
+
+class RollupStore:
+    """종목 × 기간별 거래량 합계 (shortVolume / totalVolume / 시장 거래량 / 일수) 보관
+
+    이미 반영한 (종목, 거래일)은 건너뛰므로 같은 일별 행을 여러 번 넘겨도 한 번만 더해지고,
+    진행 중인 주·월은 새 거래일 분만 기존 합계에 더한다. 마감된 달은 종목별로 반영 완료를 기록해
+    긴 구간 조회 때 일별 파티션을 다시 읽지 않는다.
+    """
+
+    def __init__(self, path=ROLLUP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._sums = {freq: pd.DataFrame(columns=['ticker', 'period', *SUM_COLUMNS, 'date'])
+                      for freq in ROLLUP_FREQS}
+        self._seen = pd.Index([], dtype=object)     # 반영된 "종목|YYYYMMDD"
+        self._sealed = set()                        # 반영 완료된 (종목, 'YYYY-MM')
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+            self._sums, self._seen, self._sealed = state['sums'], state['seen'], state['sealed']
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            self._reset()
+
+    def _save(self):
+        try:
+            with atomic_write(self.path) as tmp_path, open(tmp_path, 'wb') as f:
+                pickle.dump({'sums': self._sums, 'seen': self._seen, 'sealed': self._sealed}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    def covers(self, tickers, month):
+        """마감된 달의 요청 종목이 모두 반영되었는지"""
+        with self._lock:
+            return all((t, str(month)) in self._sealed for t in tickers)
+
+    def update(self, daily, tickers=(), sealed_month=None):
+        """일별 행(종목, 날짜, 원 거래량) 중 처음 보는 거래일만 합계에 더함 → 추가된 행 수
+
+        sealed_month 가 있으면 tickers 의 해당 달을 반영 완료로 기록한다 (거래가 없던 종목 포함, 모든 거래일 수집이 끝난 달만 전달).
+        """
+        with self._lock:
+            keys = daily['ticker'].astype(str) + '|' + daily['date'].dt.strftime('%Y%m%d')
+            # 거래량이 아직 없는 행(시장 거래량 지연 등)은 반영하지 않고 다음 갱신 때 다시 확인
+            complete = daily[['shortVolume', 'totalVolume', 'market_vol']].notna().all(axis=1).to_numpy()
+            fresh = ~keys.isin(self._seen).to_numpy() & complete
+            new = daily[fresh].assign(ticker=daily.loc[fresh, 'ticker'].astype(str))
+            if len(new):
+                self._seen = self._seen.append(pd.Index(keys[fresh], dtype=object))
+                for freq in ROLLUP_FREQS:
+                    sums = rollup_sums(new, freq)
+                    if len(self._sums[freq]):
+                        sums = pd.concat([self._sums[freq], sums], ignore_index=True)
+                    self._sums[freq] = (sums.groupby(['ticker', 'period'], sort=True)
+                                        .agg(**{c: (c, 'sum') for c in SUM_COLUMNS}, date=('date', 'max'))
+                                        .reset_index())
+
+            sealed = {(t, str(sealed_month)) for t in tickers} - self._sealed if sealed_month is not None else set()
+            self._sealed |= sealed
+            if len(new) or sealed:
+                self._save()
+            return len(new)
+
+    def read(self, tickers, start, end, freq='monthly'):
+        """start ~ end 구간 종목별 거래량 가중 지표 (기간 마지막 거래일 기준으로 구간 판정)"""
+        symbols = list(dict.fromkeys(t.upper() for t in tickers))
+        with self._lock:
+            sums = self._sums[freq]
+        sums = sums[sums['ticker'].isin(symbols)
+                    & (sums['date'] >= pd.Timestamp(start).normalize()) & (sums['date'] <= pd.Timestamp(end))]
+        rollups = finalize_rollups(sums)
+        rollups['ticker'] = pd.Categorical(rollups['ticker'], categories=symbols)
+        return rollups.sort_values(['ticker', 'period']).reset_index(drop=True)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._save()
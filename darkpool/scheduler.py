@@ -0,0 +1,194 @@
+"""FINRA 게시 시각 기준 백그라운드 사전 계산 및 결과 원자적 게시"""
+import os
+import pickle
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .config import MAG7_STOCKS, PRECOMPUTE_LONG_DAYS, PRECOMPUTE_WINDOWS, RESULT_MAX_AGE_SECONDS, RESULTS_DIR
+from .engine import compute_analysis, compute_screener
+from .files import atomic_write
+from .partitions import warm_partitions
+from .trading_calendar import MARKET_TZ, get_trading_dates, next_publication_time
+
+# 실패 또는 게시 지연 시 재시도 간격 / 최대 횟수
+RETRY_DELAY = timedelta(minutes=10)
+MAX_RETRIES = 12
+
+# 게시 결과 형식 버전 (결과 구조가 바뀌면 올려서 이전 파일을 읽지 않도록 함)
+RESULT_FORMAT = 2
+
+class ResultStore:
+    """완성된 분석 결과 저장소 (메모리 + 디스크, 교체는 원자적으로)"""
+
+    def __init__(self, results_dir=RESULTS_DIR):
+        self.results_dir = results_dir
+        self._lock = threading.Lock()
+        self._results = {}      # days_back -> (읽거나 쓴 파일의 mtime, 결과)
+
+    def _path(self, days_back):
+        return os.path.join(self.results_dir, f"results_{days_back}d.v{RESULT_FORMAT}.pkl")
+
+    def publish(self, days_back, result):
+        """결과 게시: 임시 파일 작성 후 os.replace, 메모리 참조는 한 번에 교체"""
+        path = self._path(days_back)
+        mtime = None
+        try:
+            with atomic_write(path) as tmp_path, open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self._results[days_back] = (mtime, result)
+
+    def get(self, days_back):
+        """게시된 결과 (없으면 None); 파일이 마지막으로 읽거나 쓴 뒤 바뀌었으면(다른 프로세스 게시) 다시 읽기"""
+        with self._lock:
+            loaded_mtime, result = self._results.get(days_back, (None, None))
+
+        path = self._path(days_back)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return result
+
+        if result is None or mtime != loaded_mtime:
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return result
+            with self._lock:
+                self._results[days_back] = (mtime, result)
+
+        return result
+
+def is_current(result, max_age=RESULT_MAX_AGE_SECONDS):
+    """결과가 가장 최근 게시 거래일까지 반영하고 max_age 초 이내에 게시되었는지"""
+    if result is None or time.time() - result['published_at'] > max_age:
+        return False
+    trading_dates = get_trading_dates(7)
+    if not trading_dates:
+        return True
+    latest = datetime.strptime(trading_dates[0], '%Y%m%d').strftime('%Y-%m-%d')
+    return result['dates_covered'][1] >= latest
+
+def precompute(days_back, tickers=None):
+    """한 분석 기간의 전체 결과 계산 (종목 분석 + 전체 시장 스크리너)"""
+    panel, df_main = compute_analysis(tickers, days_back)
+    if df_main is None:
+        return None
+
+    return {
+        'days_back': days_back,
+        'panel': panel,
+        'df_main': df_main,
+        'screener': compute_screener(days_back, df_main),
+        'dates_covered': (f"{panel['date'].min():%Y-%m-%d}", f"{panel['date'].max():%Y-%m-%d}"),
+        'published_at': time.time()
+    }
+
+class PrecomputeScheduler:
+    """FINRA 게시(18시 ET) 이후 설정된 분석 기간 결과를 미리 계산해 저장소에 게시
+
+    long_days 구간의 월 파티션·롤업도 함께 만들어 두어 장기 모드 첫 요청이 FINRA 파일을 내려받지 않게 한다.
+    """
+
+    def __init__(self, store, windows=PRECOMPUTE_WINDOWS, tickers=None, long_days=PRECOMPUTE_LONG_DAYS):
+        self.store = store
+        self.windows = tuple(windows)
+        self.tickers = tuple(tickers or MAG7_STOCKS.keys())
+        self.long_days = long_days
+        self._stop = threading.Event()
+        self._thread = None
+        self._status = {
+            'running': False,
+            'last_success': None,
+            'last_duration': None,
+            'dates_covered': None,
+            'last_error': None,
+            'next_run': None
+        }
+        self._status_lock = threading.Lock()
+
+    def status(self):
+        """마지막 성공 시각, 소요 시간, 커버 날짜 범위, 다음 실행 예정 시각"""
+        with self._status_lock:
+            return dict(self._status)
+
+    def _update_status(self, **kwargs):
+        with self._status_lock:
+            self._status.update(kwargs)
+
+    def run_once(self):
+        """모든 분석 기간 결과를 계산·게시, 성공 여부 반환"""
+        started = time.time()
+        self._update_status(running=True)
+        try:
+            covered = []
+            for days_back in self.windows:
+                result = precompute(days_back, self.tickers)
+                if result is None:
+                    raise RuntimeError(f"{days_back}일 결과 계산 실패 (데이터 없음)")
+                self.store.publish(days_back, result)
+                covered.extend(result['dates_covered'])
+            if self.long_days:
+                warm_partitions(self.tickers, self.long_days)
+
+            self._update_status(
+                last_success=datetime.now(MARKET_TZ),
+                last_duration=time.time() - started,
+                dates_covered=(min(covered), max(covered)),
+                last_error=None
+            )
+            return True
+        except Exception as e:
+            self._update_status(last_error=f"{type(e).__name__}: {e}")
+            return False
+        finally:
+            self._update_status(running=False)
+
+    def is_stale(self):
+        """게시된 결과 중 가장 최근 거래일 FINRA 파일을 반영하지 못했거나 오래된 것이 있으면 True"""
+        return not all(is_current(self.store.get(days_back)) for days_back in self.windows)
+
+    def _run_with_retries(self):
+        """실패하거나 당일 파일이 아직 게시되지 않았으면 일정 횟수까지 재시도"""
+        for _ in range(MAX_RETRIES):
+            if self.run_once() and not self.is_stale():
+                return
+            self._update_status(next_run=datetime.now(MARKET_TZ) + RETRY_DELAY)
+            if self._stop.wait(RETRY_DELAY.total_seconds()):
+                return
+
+    def _loop(self):
+        # 시작 시 게시된 결과가 없거나 오래되었으면 즉시 계산
+        if self.is_stale():
+            self._run_with_retries()
+
+        while not self._stop.is_set():
+            next_run = next_publication_time()
+            self._update_status(next_run=next_run)
+            if self._stop.wait(max(0.0, (next_run - datetime.now(MARKET_TZ)).total_seconds())):
+                break
+            self._run_with_retries()
+
+    def start(self):
+        """백그라운드 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='darkpool-precompute', daemon=True)
+            self._thread.start()
+        return self
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,143 @@
+"""데이터로 선언된 시그널 규칙 + 벡터화 평가 (np.select, 날짜 × 종목 패널 전체)"""
+import operator
+
+import numpy as np
+import pandas as pd
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+# ==================== 종목 신호 (우선순위 순, 첫 번째로 만족하는 규칙 적용) ====================
+
+# direction: 신호가 예상하는 이후 주가 방향 (+1 상승, -1 하락) — 백테스트 적중 판정 기준
+
+SIGNAL_RULES = [
+    {'name': '🔥 Short Squeeze 임박!', 'priority': 1,
+     'conditions': [('yf_short_ratio_days', '>', 5), ('dp_short_change_pct', '<', -5)], 'direction': 1},
+    {'name': '🟢 급락 (청산 신호)', 'priority': 2,
+     'conditions': [('dp_short_change_pct', '<', -5)], 'direction': 1},
+    {'name': '🔴🔴 극심한 공매도 (7일+)', 'priority': 3,
+     'conditions': [('yf_short_ratio_days', '>', 7)], 'direction': -1},
+    {'name': '🔴 기관 강한 약세', 'priority': 4,
+     'conditions': [('dp_ratio', '>', 50), ('dp_short_ratio', '>', 55)], 'direction': -1},
+    {'name': '💚 기관 매집 가능성', 'priority': 5,
+     'conditions': [('dp_ratio', '>', 50), ('dp_short_ratio', '<', 45)], 'direction': 1},
+    {'name': '✅ 건강 (DTC <3일)', 'priority': 6,
+     'conditions': [('yf_short_ratio_days', '<', 3)], 'direction': 1}
+]
+DEFAULT_SIGNAL = '⚪ 관망/정상'
+
+# ==================== 최종 요약 인사이트 (중복 가능, 선언 순서대로 표시) ====================
+
+# 인사이트 문구에 쓰이는 파생 라벨 (조건 순서대로 첫 번째 만족 라벨, 없으면 기본값)
+# squeeze_state 의 '유지'는 기존 판정(|변화| < 5)과 같이 양쪽 모두 미포함 — 정확히 -5 는 '증가 중'
+LABEL_RULES = {
+    'squeeze_state': {
+        'choices': [('청산 중', [('dp_short_change_pct', '<', -5)]),
+                    ('유지', [('dp_short_change_pct', '>', -5), ('dp_short_change_pct', '<', 5)])],
+        'default': '증가 중'
+    },
+    'finra_status': {
+        'choices': [('청산 진행', [('finra_yf_short_ratio', '<', 10)])],
+        'default': '정상'
+    }
+}
+
+INSIGHT_RULES = [
+    {'key': 'squeeze_risk',
+     'title': '🔥 Short Squeeze 고위험 종목 (DTC >5일 & Float >10%)',
+     'conditions': [('yf_short_ratio_days', '>', 5), ('yf_short_percent_float', '>', 10)],
+     'template': '**{ticker}**: DTC {yf_short_ratio_days:.2f}일, Float {yf_short_percent_float:.2f}% - {squeeze_state}'},
+    {'key': 'squeeze_starting',
+     'title': '🟢 청산 시작 종목 (DTC >5일 & DP Short 급락)',
+     'conditions': [('yf_short_ratio_days', '>', 5), ('dp_short_change_pct', '<', -5)],
+     'template': '**{ticker}**: {dp_short_change_pct:+.2f}%p 급락, FINRA/YF {finra_yf_short_ratio:.1f}% ({finra_status})'},
+    {'key': 'new_short_attack',
+     'title': '🔴 신규 공매도 공격 진행 (DP Short 급등 & FINRA/YF >50%)',
+     'conditions': [('dp_short_change_pct', '>', 5), ('finra_yf_short_ratio', '>', 50)],
+     'template': '**{ticker}**: {dp_short_change_pct:+.2f}%p 급등, FINRA/YF {finra_yf_short_ratio:.1f}%'},
+    {'key': 'healthy',
+     'title': '✅ 건강한 종목 (DTC <3일 & Float <5%)',
+     'conditions': [('yf_short_ratio_days', '<', 3), ('yf_short_percent_float', '<', 5)],
+     'template': '**{ticker}**: DTC {yf_short_ratio_days:.2f}일, Float {yf_short_percent_float:.2f}%'},
+    {'key': 'accumulation',
+     'title': '💚 기관 매집 가능성 (DP >50% & DP Short <45%)',
+     'conditions': [('dp_ratio', '>', 50), ('dp_short_ratio', '<', 45)],
+     'template': '**{ticker}**: DP {dp_ratio:.1f}%, DP Short {dp_short_ratio:.1f}%'},
+    {'key': 'relative_extreme',
+     'title': '📊 전 종목 대비 DP Short 이례적 급등 (시장 상위 10% & 자체 z >2)',
+     'conditions': [('dp_short_ratio_rank', '>=', 90), ('dp_short_ratio_ts_z', '>', 2)],
+     'template': '**{ticker}**: DP Short {dp_short_ratio:.1f}% (시장 백분위 {dp_short_ratio_rank:.0f}, '
+                 '시장 z {dp_short_ratio_z:+.2f}, 자체 z {dp_short_ratio_ts_z:+.2f})'}
+]
+
+# ==================== 평가 ====================
+
+def evaluate_conditions(df, conditions):
+    """조건 목록(AND)을 전체 행에 대해 한 번에 평가 → bool 배열 (컬럼이 없거나 NaN이면 False)"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, threshold in conditions:
+        if column not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        values = df[column].to_numpy(dtype=float)
+        mask &= OPERATORS[op](values, threshold)
+    return mask
+
+def signal_codes(df, rules=SIGNAL_RULES):
+    """우선순위가 가장 높은 만족 규칙의 번호 (우선순위 순 규칙 목록 기준, 없으면 -1) → (번호 배열, 정렬된 규칙)"""
+    ordered = sorted(rules, key=lambda r: r['priority'])
+    codes = np.select([evaluate_conditions(df, r['conditions']) for r in ordered],
+                      np.arange(len(ordered)), default=-1)
+    return codes, ordered
+
+def assign_signals(df, rules=SIGNAL_RULES, default=DEFAULT_SIGNAL):
+    """우선순위가 가장 높은(숫자가 작은) 만족 규칙의 신호 이름 (np.select)"""
+    codes, ordered = signal_codes(df, rules)
+    names = np.array([r['name'] for r in ordered] + [default], dtype=object)
+    return pd.Series(names[codes], index=df.index)
+
+def signal_masks(df, rules=SIGNAL_RULES):
+    """규칙별 만족 여부 (우선순위와 무관, 행 × 규칙 bool 테이블)"""
+    return pd.DataFrame({r['name']: evaluate_conditions(df, r['conditions']) for r in rules}, index=df.index)
+
+def assign_labels(df, label_rules=LABEL_RULES):
+    """파생 라벨 컬럼 추가 (복사본 반환)"""
+    df = df.copy()
+    for column, rule in label_rules.items():
+        df[column] = np.select([evaluate_conditions(df, c) for _, c in rule['choices']],
+                               [label for label, _ in rule['choices']], default=rule['default'])
+    return df
+
+def insight_lines(df, rules=INSIGHT_RULES):
+    """인사이트 규칙별 (규칙, 해당 종목 문구 목록) — 해당 종목이 없는 규칙은 제외"""
+    labeled = assign_labels(df)
+    results = []
+    for rule in rules:
+        matched = labeled[evaluate_conditions(labeled, rule['conditions'])]
+        if not matched.empty:
+            results.append((rule, [rule['template'].format(**r) for r in matched.to_dict('records')]))
+    return results
+
+# ==================== 일간 급등/급락 구간 ====================
+
+SHARP_MOVE_THRESHOLD = 5
+
+def sharp_moves(values, threshold=SHARP_MOVE_THRESHOLD):
+    """전일 대비 변화 방향 배열 (-1 급락, +1 급등, 0 그 외) — 첫날은 0"""
+    change = np.diff(np.asarray(values, dtype=float), prepend=np.nan)
+    return np.select([change < -threshold, change > threshold], [-1, 1], default=0)
+
+def move_spans(dates, moves):
+    """같은 방향으로 연속된 급등/급락을 하나의 (시작일, 종료일, 방향) 구간으로 병합"""
+    dates = np.asarray(dates)
+    moves = np.asarray(moves)
+    starts = np.flatnonzero(np.diff(moves, prepend=0) != 0)
+    ends = np.append(starts[1:], len(moves)) - 1
+    keep = moves[starts] != 0
+    starts, ends = starts[keep], ends[keep]
+    # 이벤트 i 는 (i-1, i) 구간을 칠하므로 연속 구간은 (시작-1, 끝)
+    return list(zip(dates[np.maximum(starts - 1, 0)].tolist(), dates[ends].tolist(), moves[starts].tolist()))
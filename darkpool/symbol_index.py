@@ -0,0 +1,365 @@
+"""FINRA 아카이브 종목 우선(symbol-major) 시계열 인덱스 (메모리 맵 컬럼 저장)
+
+날짜별 일일 파일을 종목별 연속 블록(date / short / total 컬럼)으로 옮겨 두고 오프셋 표로 찾는다.
+한 종목의 전체 히스토리는 오프셋 조회 한 번 + 메모리 맵 슬라이스(복사 없음)로 읽는다.
+새 일일 파일은 각 종목 블록 뒤에 덧붙이며, 블록이 가득 차면 용량을 두 배로 늘려 파일 끝으로 옮긴다.
+"""
+import glob
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .config import SYMBOL_INDEX_DIR, SYMBOL_INDEX_INITIAL_CAPACITY
+from .files import atomic_write
+
+# fcntl 이 없는 플랫폼(Windows)은 프로세스 간 잠금 없이 프로세스 내 잠금만 사용
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 컬럼 파일 (이름 → 저장 타입)
+INDEX_COLUMNS = {
+    'date': np.int32,       # YYYYMMDD
+    'short': np.float64,    # shortVolume
+    'total': np.float64     # totalVolume
+}
+
+class SymbolIndex:
+    """종목별 연속 블록 컬럼 저장소 — 오프셋 표(offsets.npz)를 원자적으로 교체해 커밋
+
+    데이터는 항상 커밋된 영역 밖에만 쓰므로 (블록 끝 추가, 이동 시 파일 끝에 복사, compact/reset 은 새 세대 파일)
+    중간에 중단되어도 마지막 커밋 상태가 그대로 유효하다. 오프셋 표가 컬럼 파일 세대를 가리키므로 표 교체가 유일한 전환 지점이다.
+    여러 프로세스(앱, 스케줄러 워커, index --rebuild)가 함께 쓸 수 있도록 변경은 lock 파일 배타 잠금 안에서만 한다.
+    """
+
+    def __init__(self, path=SYMBOL_INDEX_DIR, initial_capacity=SYMBOL_INDEX_INITIAL_CAPACITY):
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._columns = {}
+        self._signature = None
+        self._load()
+
+    def _table_signature(self):
+        """오프셋 표 파일 식별값 (다른 프로세스가 커밋하면 바뀜)"""
+        try:
+            stat = os.stat(os.path.join(self.path, 'offsets.npz'))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _process_lock(self, exclusive=True):
+        """다른 프로세스와의 잠금 — 변경은 배타, 표·컬럼 파일 열기는 공유 (열기 도중 이전 세대 파일이 지워지지 않도록)"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self, locked=False):
+        """다른 프로세스(별도 스케줄러 워커 등)가 커밋한 오프셋 표가 있으면 다시 읽기 (locked: 배타 잠금 보유 중)"""
+        if self._table_signature() != self._signature:
+            self._columns = {}
+            self._load(locked)
+
+    def _load(self, locked=False):
+        """디스크의 오프셋 표와 컬럼 파일 열기 (없으면 빈 인덱스)"""
+        if not locked:
+            with self._process_lock(exclusive=False):
+                return self._load(locked=True)
+
+        table_path = os.path.join(self.path, 'offsets.npz')
+        self._signature = self._table_signature()
+        if self._signature is not None:
+            with np.load(table_path, allow_pickle=False) as table:
+                self.symbols = pd.Index(table['symbols'].astype(object))
+                self.offset = table['offset']
+                self.length = table['length']
+                self.capacity = table['capacity']
+                self._dates = table['dates']
+                self.size = int(table['size'])
+                # 세대 번호가 없는 이전 형식 표는 0세대 (name.bin)
+                self.generation = int(table['generation']) if 'generation' in table.files else 0
+        else:
+            self._reset_table()
+        self._open_columns(self.size)
+
+    def _reset_table(self):
+        self.symbols = pd.Index([], dtype=object)
+        self.offset = np.zeros(0, dtype=np.int64)
+        self.length = np.zeros(0, dtype=np.int64)
+        self.capacity = np.zeros(0, dtype=np.int64)
+        self._dates = np.zeros(0, dtype=np.int32)     # 반영된 거래일 (오름차순)
+        self.size = 0                                  # 사용 중인 슬롯 수 (이동 후 남은 빈 블록 포함)
+        self.generation = 0                            # 컬럼 파일 세대 (compact/reset 마다 증가)
+
+    @property
+    def dates(self):
+        return [str(d) for d in self._dates]
+
+    @property
+    def last_date(self):
+        return str(self._dates[-1]) if len(self._dates) else None
+
+    def _column_path(self, name, generation=None):
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.path, f"{name}.bin" if generation == 0 else f"{name}.{generation}.bin")
+
+    def _remove_stale_columns(self):
+        """현재 세대가 아닌 컬럼 파일 삭제 (배타 잠금 안에서 커밋 후 호출 — 다른 프로세스의 기존 매핑은 그대로 유효)"""
+        current = {self._column_path(name) for name in INDEX_COLUMNS}
+        for path in glob.glob(os.path.join(self.path, '*.bin')):
+            if path not in current:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _open_columns(self, slots):
+        """컬럼 파일을 slots 개 이상 크기로 열기 (부족하면 파일 확장 후 다시 매핑)"""
+        if self._columns and len(self._columns['date']) >= slots:
+            return
+        slots = max(slots, 2 * len(self._columns.get('date', ())), self.initial_capacity * 1024)
+        os.makedirs(self.path, exist_ok=True)
+        path = self._column_path('date')
+        if os.path.exists(path):
+            slots = max(slots, os.path.getsize(path) // np.dtype(INDEX_COLUMNS['date']).itemsize)
+        for name, dtype in INDEX_COLUMNS.items():
+            path = self._column_path(name)
+            with open(path, 'ab') as f:
+                if f.tell() < slots * np.dtype(dtype).itemsize:
+                    f.truncate(slots * np.dtype(dtype).itemsize)
+            self._columns[name] = np.memmap(path, dtype=dtype, mode='r+', shape=(slots,))
+
+    def _commit(self):
+        """컬럼 flush 후 오프셋 표를 임시 파일에 써서 교체"""
+        for column in self._columns.values():
+            column.flush()
+        table_path = os.path.join(self.path, 'offsets.npz')
+        with atomic_write(table_path, suffix='.npz') as tmp_path:
+            np.savez(tmp_path, symbols=self.symbols.to_numpy(dtype=str), offset=self.offset, length=self.length,
+                     capacity=self.capacity, dates=self._dates, size=np.int64(self.size),
+                     generation=np.int64(self.generation))
+        self._signature = self._table_signature()
+
+    def _rows(self, symbols):
+        """종목 → 오프셋 표 행 번호 (신규 종목은 용량 0 행 추가 → 첫 기록 때 블록 할당)"""
+        rows = self.symbols.get_indexer(symbols)
+        new_symbols = symbols[rows < 0]
+        if len(new_symbols):
+            n = len(new_symbols)
+            self.symbols = self.symbols.append(pd.Index(new_symbols, dtype=object))
+            self.offset = np.concatenate([self.offset, np.zeros(n, dtype=np.int64)])
+            self.length = np.concatenate([self.length, np.zeros(n, dtype=np.int64)])
+            self.capacity = np.concatenate([self.capacity, np.zeros(n, dtype=np.int64)])
+            rows = self.symbols.get_indexer(symbols)
+        return rows
+
+    def _relocate(self, rows, capacity):
+        """rows 블록을 파일 끝의 새 용량 블록으로 복사 (이전 블록은 compact 전까지 빈 공간)"""
+        new_offset = self.size + np.cumsum(capacity) - capacity
+        self._open_columns(self.size + int(capacity.sum()))
+
+        lengths = self.length[rows]
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        src = np.repeat(self.offset[rows], lengths) + within
+        dst = np.repeat(new_offset, lengths) + within
+        for column in self._columns.values():
+            column[dst] = column[src]
+
+        self.offset[rows] = new_offset
+        self.capacity[rows] = capacity
+        self.size += int(capacity.sum())
+
+    def _append(self, date_str, df):
+        if self.last_date is not None and date_str <= self.last_date:
+            return False
+
+        df = df.dropna(subset=['shortVolume', 'totalVolume'])
+        rows = self._rows(df.index)
+        full = self.length[rows] >= self.capacity[rows]
+        if full.any():
+            self._relocate(rows[full], np.maximum(self.capacity[rows[full]] * 2, self.initial_capacity))
+
+        pos = self.offset[rows] + self.length[rows]
+        self._columns['date'][pos] = int(date_str)
+        self._columns['short'][pos] = df['shortVolume'].to_numpy(dtype=float)
+        self._columns['total'][pos] = df['totalVolume'].to_numpy(dtype=float)
+        self.length[rows] += 1
+        self._dates = np.append(self._dates, np.int32(date_str))
+        return True
+
+    def update(self, files):
+        """전 종목 일일 파일(date → DataFrame) 중 마지막 날짜 이후만 날짜순 추가 → 추가한 날짜 수"""
+        with self._lock, self._process_lock():
+            self._sync(locked=True)
+            added = sum(self._append(d, files[d]) for d in sorted(files) if files[d] is not None)
+            if added:
+                self._commit()
+            return added
+
+    def append(self, date_str, df):
+        """일일 파일 하루치 추가 (이미 반영된 날짜 이전이면 False, 과거 날짜는 rebuild 필요)"""
+        return self.update({date_str: df}) > 0
+
+    def read(self, symbol):
+        """한 종목의 (date, short, total) 배열 — 메모리 맵 슬라이스 (복사 없음), 없으면 None"""
+        with self._lock:
+            self._sync()
+            row = self.symbols.get_indexer([symbol.upper()])[0]
+            if row < 0:
+                return None
+            start, end = self.offset[row], self.offset[row] + self.length[row]
+            return tuple(self._columns[name][start:end] for name in INDEX_COLUMNS)
+
+    def history(self, symbol, start=None, end=None):
+        """한 종목의 날짜순 shortVolume / totalVolume (YYYYMMDD 범위 지정 가능)"""
+        arrays = self.read(symbol)
+        if arrays is None:
+            return None
+        dates, short, total = arrays
+        lo = 0 if start is None else np.searchsorted(dates, int(start))
+        hi = len(dates) if end is None else np.searchsorted(dates, int(end), side='right')
+        return pd.DataFrame({'shortVolume': short[lo:hi], 'totalVolume': total[lo:hi]},
+                            index=pd.to_datetime(dates[lo:hi].astype(str), format='%Y%m%d').rename('date'))
+
+    def frames(self, symbols, dates):
+        """인덱스에 반영된 날짜만 일일 파일 형식(date → 종목 × shortVolume/totalVolume)으로 복원"""
+        with self._lock:
+            self._sync()
+            indexed = self._dates
+        wanted = np.intersect1d(np.array([int(d) for d in dates], dtype=np.int32), indexed)
+        if not len(wanted):
+            return {}
+
+        parts = []
+        for symbol in symbols:
+            arrays = self.read(symbol)
+            if arrays is None:
+                continue
+            # 블록 안 날짜는 오름차순 — 요청 구간만 잘라서 복사
+            lo, hi = np.searchsorted(arrays[0], wanted[0]), np.searchsorted(arrays[0], wanted[-1], side='right')
+            date, short, total = (a[lo:hi] for a in arrays)
+            mask = np.isin(date, wanted)
+            parts.append(pd.DataFrame({'date': date[mask], 'symbol': symbol.upper(),
+                                       'shortVolume': short[mask], 'totalVolume': total[mask]}))
+
+        empty = pd.DataFrame({'shortVolume': [], 'totalVolume': []}, index=pd.Index([], dtype=object, name='symbol'))
+        frames = {str(d): empty for d in wanted}
+        if parts:
+            long = pd.concat(parts, ignore_index=True)
+            for d, df in long.groupby('date', sort=False):
+                # 일일 파일 파싱 결과와 같은 object 타입 종목 인덱스
+                df = df.set_index(pd.Index(df['symbol'], dtype=object, name='symbol'))
+                frames[str(d)] = df[['shortVolume', 'totalVolume']]
+        return frames
+
+    def _search(self, rows, date, side='left'):
+        """rows 블록마다 date 가 들어갈 슬롯 위치 (블록 안 날짜는 오름차순) — 전 블록을 함께 이진 탐색해 날짜 컬럼은 몇 칸만 읽음"""
+        lo = self.offset[rows].copy()
+        hi = lo + self.length[rows]
+        column = self._columns['date']
+        active = np.flatnonzero(lo < hi)
+        while len(active):
+            mid = (lo[active] + hi[active]) // 2
+            values = column[mid]
+            right = values < date if side == 'left' else values <= date
+            lo[active[right]] = mid[right] + 1
+            hi[active[~right]] = mid[~right]
+            active = active[lo[active] < hi[active]]
+        return lo
+
+    def _gather(self, rows, start=None, end=None):
+        """rows 블록 중 start ~ end 구간 슬롯 위치와 각 슬롯의 행 순번 (구간 경계를 먼저 찾아 구간 길이만큼만 읽음)"""
+        first = self.offset[rows] if start is None else self._search(rows, int(start))
+        last = self.offset[rows] + self.length[rows] if end is None else self._search(rows, int(end), side='right')
+        lengths = np.maximum(last - first, 0)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.repeat(first, lengths) + within, np.repeat(np.arange(len(rows)), lengths)
+
+    def matrix(self, symbols=None, start=None, end=None):
+        """종목들의 거래일 × 종목 shortVolume / totalVolume 행렬 (종목 순회 없이 배열 연산으로 배치, 빈 칸 NaN)
+
+        symbols 가 없으면 인덱스의 전 종목.
+        """
+        with self._lock:
+            self._sync()
+            symbols = pd.Index(list(dict.fromkeys(s.upper() for s in (self.symbols if symbols is None else symbols))),
+                               dtype=object, name='ticker')
+            lo = 0 if start is None else np.searchsorted(self._dates, int(start))
+            hi = len(self._dates) if end is None else np.searchsorted(self._dates, int(end), side='right')
+            dates = self._dates[lo:hi]
+            rows = self.symbols.get_indexer(symbols)
+            found = np.flatnonzero(rows >= 0)
+            slots, owner = self._gather(rows[found], start, end)
+            slot_dates = self._columns['date'][slots]
+            short = self._columns['short'][slots]
+            total = self._columns['total'][slots]
+
+        r, c = np.searchsorted(dates, slot_dates), found[owner]
+        matrices = []
+        for values in (short, total):
+            grid = np.full((len(dates), len(symbols)), np.nan)
+            grid[r, c] = values
+            matrices.append(pd.DataFrame(grid, columns=symbols,
+                                         index=pd.to_datetime(dates.astype(str), format='%Y%m%d').rename('date')))
+        return tuple(matrices)
+
+    def top_symbols(self, n, start=None, end=None):
+        """start ~ end 구간 FINRA 합계 거래량 상위 n 개 종목"""
+        with self._lock:
+            self._sync()
+            slots, owner = self._gather(np.arange(len(self.symbols)), start, end)
+            volume = np.bincount(owner, weights=self._columns['total'][slots], minlength=len(self.symbols))
+            return list(self.symbols[np.argsort(-volume, kind='stable')[:n]])
+
+    def compact(self):
+        """이동 후 남은 빈 블록 제거 — 종목별 블록을 현재 길이 기준 용량으로 새 세대 컬럼 파일에 다시 배치"""
+        with self._lock, self._process_lock():
+            self._sync(locked=True)
+            capacity = np.maximum(self.length, self.initial_capacity)
+            offset = np.cumsum(capacity) - capacity
+            size = int(capacity.sum())
+            lengths = self.length
+            within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            src = np.repeat(self.offset, lengths) + within
+            dst = np.repeat(offset, lengths) + within
+
+            # 새 세대 파일은 커밋 전까지 어디에서도 참조하지 않으므로 바로 써도 됨
+            generation = self.generation + 1
+            for name, dtype in INDEX_COLUMNS.items():
+                column = np.memmap(self._column_path(name, generation), dtype=dtype, mode='w+', shape=(max(size, 1),))
+                column[dst] = self._columns[name][src]
+                column.flush()
+                del column
+
+            self.offset, self.capacity, self.size, self.generation = offset, capacity, size, generation
+            self._columns = {}
+            self._open_columns(size)
+            self._commit()
+            self._remove_stale_columns()
+
+    def reset(self):
+        """전체 삭제 (과거 날짜부터 다시 만들 때) — 빈 새 세대로 커밋한 뒤 이전 세대 파일 삭제"""
+        with self._lock, self._process_lock():
+            self._sync(locked=True)
+            generation = self.generation + 1
+            self._reset_table()
+            self.generation = generation
+            self._columns = {}
+            for name in INDEX_COLUMNS:
+                if os.path.exists(self._column_path(name)):
+                    os.remove(self._column_path(name))
+            self._open_columns(0)
+            self._commit()
+            self._remove_stale_columns()
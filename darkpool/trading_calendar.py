@@ -0,0 +1,122 @@
+"""NYSE 거래일 캘린더 및 FINRA 게시 시각 기준 날짜 계획"""
+from datetime import datetime, timedelta, time as dtime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr, USPresidentsDay,
+    USMemorialDay, USLaborDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+MARKET_TZ = ZoneInfo('America/New_York')
+# FINRA 일일 파일은 장 마감 후 약 18시(ET)에 게시
+FINRA_PUBLISH_CUTOFF = dtime(18, 0)
+
+# 정규 휴장일 외 임시 휴장일 (허리케인, 국가 애도일 등)
+NYSE_SPECIAL_CLOSURES = ['2012-10-29', '2012-10-30', '2018-12-05', '2025-01-09']
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """NYSE 휴장일 캘린더 (FINRA 일일 파일 미게시일)"""
+    rules = [
+        Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+def latest_published_date(now=None):
+    """현재 시각(ET) 기준 FINRA 파일이 게시되었을 수 있는 가장 최근 날짜"""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    latest = now_et.date()
+    if now_et.time() < FINRA_PUBLISH_CUTOFF:
+        latest -= timedelta(days=1)
+    return latest
+
+def get_trading_dates(days_back, now=None):
+    """조회 대상 거래일 목록 (최신순, 주말·휴장일·미게시일 제외)"""
+    start = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ).date() - timedelta(days=days_back + 4)
+    return trading_dates_between(start, latest_published_date(now), now)[::-1]
+
+def trading_dates_between(start, end, now=None):
+    """start ~ end 사이 거래일 목록 (오래된 순, 아직 게시 전인 날짜 제외)"""
+    start = pd.Timestamp(start).date()
+    end = min(pd.Timestamp(end).date(), latest_published_date(now))
+    if start > end:
+        return []
+
+    holidays = NYSEHolidayCalendar().holidays(start, end).union(pd.to_datetime(NYSE_SPECIAL_CLOSURES))
+    days = pd.bdate_range(start, end).difference(holidays)
+    return [d.strftime('%Y%m%d') for d in days]
+
+@lru_cache(maxsize=None)
+def _closures(year):
+    """연도별 휴장일 (정규 + 임시) — 캘린더 규칙 계산은 연도당 한 번"""
+    holidays = NYSEHolidayCalendar().holidays(f'{year}-01-01', f'{year}-12-31')
+    return frozenset(holidays.union(pd.to_datetime(NYSE_SPECIAL_CLOSURES)).date)
+
+def is_trading_day(day):
+    """NYSE 거래일 여부"""
+    day = pd.Timestamp(day).normalize()
+    return day.weekday() < 5 and day.date() not in _closures(day.year)
+
+def next_publication_time(now=None, delay=timedelta(minutes=15)):
+    """다음 FINRA 일일 파일 게시 예상 시각 (거래일 18시 ET + 여유 시간)"""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now_et.date()
+    while True:
+        publish_at = datetime.combine(day, FINRA_PUBLISH_CUTOFF, tzinfo=MARKET_TZ) + delay
+        if publish_at > now_et and is_trading_day(day):
+            return publish_at
+        day += timedelta(days=1)
+
+# ==================== 공매도 잔고 결제 기준일 ====================
+
+def previous_trading_day(day):
+    """day 와 같거나 이전인 가장 가까운 거래일"""
+    day = pd.Timestamp(day).normalize()
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day.date()
+
+def add_trading_days(day, count):
+    """day 이후 count 번째 거래일"""
+    day = pd.Timestamp(day).normalize()
+    while count > 0:
+        day += timedelta(days=1)
+        if is_trading_day(day):
+            count -= 1
+    return day.date()
+
+def short_interest_settlements(start, end):
+    """FINRA 공매도 잔고 결제 기준일 (매월 15일·말일, 거래일이 아니면 직전 거래일), 오래된 순"""
+    months = pd.period_range(pd.Timestamp(start).to_period('M'), pd.Timestamp(end).to_period('M'), freq='M')
+    days = []
+    for month in months:
+        for day in (month.start_time + timedelta(days=14), month.end_time.normalize()):
+            settlement = previous_trading_day(day)
+            if pd.Timestamp(start).date() <= settlement <= pd.Timestamp(end).date():
+                days.append(settlement)
+    return days
+
+def short_interest_publication_time(settlement, lag):
+    """결제 기준일 데이터 게시 예상 시각 (lag 거래일 뒤 18시 ET)"""
+    return datetime.combine(add_trading_days(settlement, lag), FINRA_PUBLISH_CUTOFF, tzinfo=MARKET_TZ)
+
+def latest_short_interest_settlement(lag, now=None):
+    """현재 시각 기준 게시되었을 것으로 예상되는 가장 최근 결제 기준일"""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    candidates = short_interest_settlements(now_et.date() - timedelta(days=62), now_et.date())
+    return next(s for s in reversed(candidates) if short_interest_publication_time(s, lag) <= now_et)
+
+def next_short_interest_publication(lag, now=None):
+    """다음 결제 기준일 데이터 게시 예상 시각"""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    candidates = short_interest_settlements(now_et.date() - timedelta(days=31), now_et.date() + timedelta(days=62))
+    return min(t for t in (short_interest_publication_time(s, lag) for s in candidates) if t > now_et)
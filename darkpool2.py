@@ -1,14 +1,16 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
+import os
 import warnings
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
-from io import StringIO
-import time
+
+import pandas as pd
+
+from darkpool import (
+    LONG_HORIZON_SNAPSHOT_DAYS, LONG_HORIZON_YEARS, MAG7_STOCKS, OVERVIEW_FIGURES, RESOLUTION_LABELS, PrecomputeScheduler,
+    ResultStore, build_screener, cached, compute_analysis, data_version, get_market_store, get_panel_partitions,
+    get_shared_cache, get_universe_store, history_figure, insight_lines, is_current, load_finra_universe,
+    load_short_interest_table, rollup_trend_figure, sharp_moves, ticker_history, window_label
+)
 
 warnings.filterwarnings('ignore')
 
@@ -53,162 +55,128 @@ with st.sidebar:
         st.session_state['password_correct'] = False
         st.rerun()
 
-# ==================== 설정 및 종목 리스트 ====================
-MAG7_STOCKS = {
-    'AAPL': 'Apple', 'MSFT': 'Microsoft', 'GOOGL': 'Alphabet',
-    'AMZN': 'Amazon', 'NVDA': 'NVIDIA', 'META': 'Meta',
-    'TSLA': 'Tesla', 'COIN': 'Coinbase', 'IBIT': 'Bitcoin ETF'
-}
-
-# ==================== 데이터 수집 함수 ====================
-
-@st.cache_data(ttl=3600)
-def get_market_volume(ticker, days_back=65):
-    """Yahoo Finance에서 전체 시장 거래량 가져오기"""
-    try:
-        stock = yf.Ticker(ticker)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back + 10)
-        df = stock.history(start=start_date, end=end_date)
-        return df['Volume']
-    except:
-        return None
-
-@st.cache_data(ttl=3600)
-def get_yf_short_info(ticker):
-    """Yahoo Finance에서 공매도 정보 가져오기 (표준 지표)"""
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        return {
-            'shares_short': info.get('sharesShort', 0),
-            'short_percent_float': info.get('shortPercentOfFloat', 0) * 100,
-            'short_ratio_days': info.get('shortRatio', 0),
-            'shares_outstanding': info.get('sharesOutstanding', 0)
-        }
-    except:
-        return {
-            'shares_short': 0,
-            'short_percent_float': 0,
-            'short_ratio_days': 0,
-            'shares_outstanding': 0
-        }
+# ==================== 데이터 수집 (1시간 공유 캐시, 만료 시 기존 값 반환 후 백그라운드 갱신) ====================
+# 수집 실패는 예외 대신 빈 결과로 돌아오므로 validate 로 걸러 기존 항목을 덮어쓰지 않음
+
+def has_frames(value):
+    return value is not None and not getattr(value, 'empty', False)
+
+@cached(ttl=3600, validate=lambda result: has_frames(result[1]))
+def get_analysis(tickers, days_back=60):
+    """(지표 패널, 종목 요약 테이블) — 수집과 지표 계산을 한 항목으로 캐시해 갱신 때 항상 새로 수집한 데이터로 계산"""
+    return compute_analysis(tickers, days_back)
+
+@cached(ttl=3600, validate=lambda files: any(df is not None for df in files.values()))
+def get_finra_universe(days_back=60):
+    """FINRA 일일 파일 전 종목 로드"""
+    return load_finra_universe(days_back)
+
+@cached(ttl=3600, validate=has_frames)
+def get_long_history(ticker, days_back, dtc):
+    """장기 모드 종목 일별 패널 (구간이 걸치는 월 파티션만 로드)"""
+    start = datetime.now() - timedelta(days=days_back)
+    return get_panel_partitions().daily((ticker,), start, yf_short_info={ticker: {'short_ratio_days': dtc}})
+
+@cached(ttl=3600, validate=has_frames)
+def get_rollups(tickers, days_back, freq='monthly'):
+    """종목별 주간/월간 롤업 (롤업 저장소의 거래량 합계만 읽음, 새 거래일만 증분 반영)"""
+    start = datetime.now() - timedelta(days=days_back)
+    return get_panel_partitions().rollups(tickers, start, freq=freq)
+
+@st.cache_resource
+def get_precompute_scheduler():
+    """프로세스당 1개의 백그라운드 사전 계산 스케줄러 (DARKPOOL_SCHEDULER=off 이면 게시 결과 읽기만)"""
+    scheduler = PrecomputeScheduler(ResultStore())
+    if os.environ.get('DARKPOOL_SCHEDULER', 'on') != 'off':
+        scheduler.start()
+    return scheduler
+
+def render_scheduler_status(scheduler):
+    """사이드바: 사전 계산 상태 (마지막 성공, 소요 시간, 커버 날짜)"""
+    status = scheduler.status()
+    if status['running']:
+        st.caption("⏳ 백그라운드 사전 계산 진행 중...")
+    if status['last_success']:
+        start, end = status['dates_covered']
+        st.caption(f"🗂️ 사전 계산: {status['last_success']:%m-%d %H:%M} ET "
+                   f"({status['last_duration']:.1f}초) | {start} ~ {end}")
+    if status['next_run']:
+        st.caption(f"⏰ 다음 갱신: {status['next_run']:%m-%d %H:%M} ET")
+    if status['last_error']:
+        st.caption(f"⚠️ 최근 오류: {status['last_error']}")
+
+# ==================== 차트 캐시 (데이터 버전 × 종목 × 기간) ====================
+
+@st.cache_resource(max_entries=128)
+def get_overview_figure(chart, version, window, _df_main=None):
+    """종목 비교 차트 — 같은 데이터 버전이면 재실행 시 다시 만들지 않음"""
+    return OVERVIEW_FIGURES[chart](_df_main)
+
+@st.cache_resource(max_entries=128)
+def get_history_figure(version, ticker, window, resolution='daily', _summary=None, _history=None):
+    """종목별 시계열 차트 — 같은 데이터 버전이면 재실행 시 다시 만들지 않음"""
+    return history_figure(_summary, _history, window, resolution)
+
+@st.cache_resource(max_entries=16)
+def get_rollup_figure(version, window, _rollups=None):
+    """장기 추세 차트 — 같은 데이터 버전이면 재실행 시 다시 만들지 않음"""
+    return rollup_trend_figure(_rollups, window)
+
+# ==================== 전체 시장 스크리너 ====================
+
+def render_screener(days_back, market_snapshot=None, screener=None):
+    """전체 시장 스크리너 화면"""
+    st.header("🔎 전체 시장 스크리너 - FINRA 전 종목 DP 내부 공매도")
+
+    if screener is None:
+        with st.spinner("📊 전 종목 FINRA 데이터 분석 중..."):
+            screener = build_screener(get_finra_universe(days_back), market_snapshot, get_universe_store(),
+                                      short_interest=load_short_interest_table())
+
+    if screener is None or screener.empty:
+        st.error("❌ 데이터를 가져올 수 없습니다.")
+        return
+
+    st.caption(f"기준일: {screener['latest_date'].iloc[0]} | 전체 {len(screener):,}개 종목 | "
+               "DP 비중 기반 신호는 분석 대상 종목에만 적용 (Days to Cover는 FINRA 공매도 잔고 기준)")
 
-@st.cache_data(ttl=3600)
-def get_finra_data_full(ticker, days_back=60):
-    """FINRA 데이터 수집 및 핵심 지표 계산"""
-    try:
-        today = datetime.now()
-        data_list = []
-
-        yf_short_info = get_yf_short_info(ticker)
-        yf_shares_short = yf_short_info['shares_short']
-
-        market_volumes = get_market_volume(ticker, days_back)
-        if market_volumes is None or market_volumes.empty:
-            return None
-
-        for days in range(days_back + 5):
-            check_date = today - timedelta(days=days)
-            if check_date.weekday() >= 5:
-                continue
-
-            date_str = check_date.strftime('%Y%m%d')
-            date_key = check_date.strftime('%Y-%m-%d')
-
-            url = f"https://cdn.finra.org/equity/regsho/daily/CNMSshvol{date_str}.txt"
-
-            try:
-                response = requests.get(url, timeout=3)
-                if response.status_code == 200:
-                    df = pd.read_csv(StringIO(response.text), sep='|')
-                    if 'Symbol' in df.columns:
-                        df.rename(columns={'Symbol': 'symbol'}, inplace=True)
-                    if 'ShortVolume' in df.columns:
-                        df.rename(columns={'ShortVolume': 'shortVolume'}, inplace=True)
-                    if 'TotalVolume' in df.columns:
-                        df.rename(columns={'TotalVolume': 'totalVolume'}, inplace=True)
-
-                    row = df[df['symbol'] == ticker.upper()]
-
-                    if not row.empty:
-                        finra_total = int(row.iloc[0]['totalVolume'])
-                        finra_short = int(row.iloc[0]['shortVolume'])
-
-                        market_vol = 0
-                        if date_key in market_volumes.index:
-                            market_vol = market_volumes.loc[date_key]
-                        else:
-                            for idx in market_volumes.index:
-                                if idx.strftime('%Y-%m-%d') == date_key:
-                                    market_vol = market_volumes[idx]
-                                    break
-
-                        if market_vol > 0:
-                            dp_ratio = (finra_total / market_vol) * 100
-                            dp_short_ratio = (finra_short / finra_total) * 100
-                            dp_short_market_impact = (finra_short / market_vol) * 100
-
-                            if dp_ratio > 100:
-                                dp_ratio = 100
-
-                            data_list.append({
-                                'date': date_key,
-                                'dp_ratio': round(dp_ratio, 2),
-                                'dp_short_ratio': round(dp_short_ratio, 2),
-                                'dp_short_market_impact': round(dp_short_market_impact, 2),
-                                'market_vol': market_vol,
-                                'yf_shares_short': yf_shares_short
-                            })
-
-                if len(data_list) >= days_back:
-                    break
-            except:
-                continue
-
-        if not data_list:
-            return None
-
-        df_hist = pd.DataFrame(data_list).sort_values('date')
-        df_hist['dp_short_ratio_10d_avg'] = df_hist['dp_short_ratio'].rolling(window=10, min_periods=1).mean()
-        latest = df_hist.iloc[-1]
-        recent_10d_avg = df_hist.iloc[-10:]['dp_short_ratio'].mean()
-        dp_short_change = latest['dp_short_ratio'] - recent_10d_avg
-
-        return {
-            'ticker': ticker,
-            'name': MAG7_STOCKS[ticker],
-            'latest_date': latest['date'],
-            'dp_ratio': latest['dp_ratio'],
-            'dp_short_ratio': latest['dp_short_ratio'],
-            'dp_short_market_impact': latest['dp_short_market_impact'],
-            'dp_short_10d_avg': latest['dp_short_ratio_10d_avg'],
-            'dp_short_change_pct': dp_short_change,
-            'yf_shares_short': latest['yf_shares_short'],
-            'yf_short_percent_float': yf_short_info['short_percent_float'],
-            'yf_short_ratio_days': yf_short_info['short_ratio_days'],
-            'history': df_hist
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_col = st.selectbox("정렬 기준", ['dp_short_change_pct', 'dp_short_ratio', 'dp_short_10d_avg',
+                                            'dp_short_ratio_z', 'dp_short_change_pct_z', 'finra_total_volume'])
+    with col2:
+        ascending = st.toggle("오름차순", value=sort_col == 'dp_short_change_pct')
+    with col3:
+        top_n = st.number_input("표시 종목 수 (Top N)", 10, 1000, 50, step=10)
+    with col4:
+        min_volume = st.number_input("최소 FINRA 거래량", 0, 100_000_000, 100_000, step=50_000)
+
+    signals = st.multiselect("신호 필터", sorted(screener['Signal'].unique()))
+
+    filtered = screener[screener['finra_total_volume'] >= min_volume]
+    if signals:
+        filtered = filtered[filtered['Signal'].isin(signals)]
+
+    top = filtered.sort_values(sort_col, ascending=ascending).head(int(top_n))
+
+    st.dataframe(
+        top[['ticker', 'dp_short_ratio', 'dp_short_10d_avg', 'dp_short_change_pct',
+             'dp_short_ratio_rank', 'dp_short_ratio_z', 'dp_short_change_pct_z', 'finra_total_volume', 'days_observed', 'Signal']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'ticker': '티커',
+            'dp_short_ratio': st.column_config.NumberColumn('DP내부공매도_%', format="%.2f%%"),
+            'dp_short_10d_avg': st.column_config.NumberColumn('DP_10일평균', format="%.2f%%"),
+            'dp_short_change_pct': st.column_config.NumberColumn('1일vs10일', format="%+.2f%%p"),
+            'dp_short_ratio_rank': st.column_config.NumberColumn('시장백분위', format="%.0f"),
+            'dp_short_ratio_z': st.column_config.NumberColumn('시장_z', format="%+.2f"),
+            'dp_short_change_pct_z': st.column_config.NumberColumn('변화_시장_z', format="%+.2f"),
+            'finra_total_volume': st.column_config.NumberColumn('FINRA 거래량', format="%d"),
+            'days_observed': st.column_config.NumberColumn('관측일수', format="%d"),
+            'Signal': '신호'
         }
-
-    except Exception as e:
-        return None
-
-def create_signal(row):
-    """시그널 생성 함수"""
-    if row['yf_short_ratio_days'] > 5 and row['dp_short_change_pct'] < -5:
-        return '🔥 Short Squeeze 임박!'
-    if row['dp_short_change_pct'] < -5:
-        return '🟢 급락 (청산 신호)'
-    if row['yf_short_ratio_days'] > 7:
-        return '🔴🔴 극심한 공매도 (7일+)'
-    if row['dp_ratio'] > 50 and row['dp_short_ratio'] > 55:
-        return '🔴 기관 강한 약세'
-    if row['dp_ratio'] > 50 and row['dp_short_ratio'] < 45:
-        return '💚 기관 매집 가능성'
-    if row['yf_short_ratio_days'] < 3:
-        return '✅ 건강 (DTC <3일)'
-    return '⚪ 관망/정상'
+    )
 
 # ==================== 메인 앱 ====================
 
@@ -218,51 +186,51 @@ st.markdown("### Magnificent Seven + Bitcoin Exposure 종합 분석")
 # 사이드바 설정
 with st.sidebar:
     st.header("⚙️ 분석 설정")
-    days_back = st.slider("분석 기간 (일)", 30, 90, 60)
+    horizon = st.radio("분석 기간 단위", ["일", "년"], horizontal=True)
+    if horizon == "년":
+        days_back = st.slider("분석 기간 (년)", 1, LONG_HORIZON_YEARS, 1) * 365
+    else:
+        days_back = st.slider("분석 기간 (일)", 30, 90, 60)
+    # 장기 모드: 요약 테이블·비교 차트·스크리너는 최근 기간, 시계열은 월 파티션/롤업에서 읽음
+    snapshot_days = LONG_HORIZON_SNAPSHOT_DAYS if horizon == "년" else days_back
+    app_mode = st.radio("모드", ["MAG 7+2 심층 분석", "전체 시장 스크리너"])
     
     st.markdown("---")
     st.info(f"📅 분석 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     if st.button("🔄 데이터 새로고침", type="primary"):
-        st.cache_data.clear()
+        # 이 세션은 새로고침 이후 게시된 사전 계산 결과만 사용
+        st.session_state['refreshed_at'] = datetime.now().timestamp()
+        get_shared_cache().clear()
+        get_market_store().refresh()
         st.rerun()
 
-# 데이터 수집
-with st.spinner("📊 데이터 수집 중..."):
-    analysis_results = []
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i, ticker in enumerate(MAG7_STOCKS.keys()):
-        status_text.text(f"수집 중: {ticker}")
-        res = get_finra_data_full(ticker, days_back=days_back)
-        if res:
-            analysis_results.append(res)
-        progress_bar.progress((i + 1) / len(MAG7_STOCKS))
-    
-    status_text.empty()
-    progress_bar.empty()
-
-if not analysis_results:
-    st.error("❌ 데이터를 가져올 수 없습니다.")
+    scheduler = get_precompute_scheduler()
+    render_scheduler_status(scheduler)
+
+# 데이터 수집 (최신 거래일까지 반영된 사전 계산 결과가 있으면 바로 사용, 오래되었으면 직접 수집)
+precomputed = scheduler.store.get(snapshot_days)
+if not is_current(precomputed) or precomputed['published_at'] < st.session_state.get('refreshed_at', 0):
+    precomputed = None
+if precomputed is not None:
+    panel = precomputed['panel']
+    df_main = precomputed['df_main']
+else:
+    with st.spinner("📊 데이터 수집 중..."):
+        tickers = tuple(MAG7_STOCKS.keys())
+        panel, df_main = get_analysis(tickers, snapshot_days)
+
+    if df_main is None:
+        st.error("❌ 데이터를 가져올 수 없습니다.")
+        st.stop()
+
+chart_version = data_version(df_main)
+
+if app_mode == "전체 시장 스크리너":
+    render_screener(snapshot_days, df_main, precomputed['screener'] if precomputed is not None else None)
     st.stop()
 
-# FINRA/YF 비율 계산
-for item in analysis_results:
-    yf_shares_short = item['yf_shares_short']
-    if yf_shares_short > 0 and not item['history'].empty:
-        latest_market_vol = item['history'].iloc[-1]['market_vol']
-        daily_finra_short_vol = (item['dp_short_market_impact'] * latest_market_vol) / 100
-        finra_yf_short_ratio = (daily_finra_short_vol / yf_shares_short) * 100
-        item['finra_yf_short_ratio'] = finra_yf_short_ratio
-    else:
-        item['finra_yf_short_ratio'] = 0.0
-
-df_main = pd.DataFrame([{k:v for k,v in r.items() if k != 'history'} for r in analysis_results])
-df_main['Signal'] = df_main.apply(create_signal, axis=1)
-df_main = df_main.sort_values('yf_short_ratio_days', ascending=False)
-
-st.success(f"✅ {len(analysis_results)}개 종목 분석 완료!")
+st.success(f"✅ {len(df_main)}개 종목 분석 완료!")
 
 # ==================== 핵심 지표 해석 가이드 ====================
 
@@ -428,6 +396,8 @@ with st.expander("💡 테이블 읽는 법", expanded=False):
     - **DP내부공매도 >55%** = 장외에서 강한 약세
     - **1일vs10일 <-5%p** = 청산 시작 신호
     - **FINRA/YF >50%** = 활발한 신규 공매도, <10% = 청산 진행
+    - **시장백분위 / 시장_z** = 당일 FINRA 전 종목 중 DP내부공매도 순위 (0~100) / 중앙값 대비 로버스트 z
+    - **자체_z** = 종목 자신의 직전 20거래일 대비 DP내부공매도 z (>2 이면 이례적 급등)
     """)
 
 df_display = df_main.copy()
@@ -442,12 +412,15 @@ df_display = df_display.rename(columns={
     'dp_short_change_pct': '1일vs10일',
     'dp_short_market_impact': 'DP→시장_%',
     'finra_yf_short_ratio': 'FINRA/YF_%',
+    'dp_short_ratio_rank': '시장백분위',
+    'dp_short_ratio_z': '시장_z',
+    'dp_short_ratio_ts_z': '자체_z',
     'Signal': '신호'
 })
 
 table_cols = ['티커', '종목명', 'Days_to_Cover', 'Short_%_Float',
               'DP비중_%', 'DP내부공매도_%', 'DP_10일평균', '1일vs10일',
-              'DP→시장_%', 'FINRA/YF_%', '신호']
+              'DP→시장_%', 'FINRA/YF_%', '시장백분위', '시장_z', '자체_z', '신호']
 
 df_display['Days_to_Cover'] = df_display['Days_to_Cover'].apply(lambda x: f"{x:.2f}일")
 df_display['Short_%_Float'] = df_display['Short_%_Float'].apply(lambda x: f"{x:.2f}%")
@@ -457,6 +430,10 @@ df_display['DP_10일평균'] = df_display['DP_10일평균'].apply(lambda x: f"{x
 df_display['1일vs10일'] = df_display['1일vs10일'].apply(lambda x: f"{x:+.2f}%p")
 df_display['DP→시장_%'] = df_display['DP→시장_%'].apply(lambda x: f"{x:.2f}%")
 df_display['FINRA/YF_%'] = df_display['FINRA/YF_%'].apply(lambda x: f"{x:.1f}%")
+# 횡단면 점수는 계산 기간이 부족하거나 장기 모드면 비어 있음
+df_display['시장백분위'] = df_display['시장백분위'].apply(lambda x: '-' if pd.isna(x) else f"{x:.0f}")
+df_display['시장_z'] = df_display['시장_z'].apply(lambda x: '-' if pd.isna(x) else f"{x:+.2f}")
+df_display['자체_z'] = df_display['자체_z'].apply(lambda x: '-' if pd.isna(x) else f"{x:+.2f}")
 
 st.dataframe(df_display[table_cols], use_container_width=True, hide_index=True)
 
@@ -516,39 +493,7 @@ with st.expander("💡 Days to Cover 상세 해석", expanded=False):
     3. DTC <3일 = 안정적 종목, 펀더멘털 위주 투자
     """)
 
-fig1 = go.Figure()
-
-colors_dtc = []
-for x in df_main['yf_short_ratio_days']:
-    if x < 3:
-        colors_dtc.append('green')
-    elif x < 5:
-        colors_dtc.append('yellow')
-    elif x < 7:
-        colors_dtc.append('orange')
-    else:
-        colors_dtc.append('red')
-
-fig1.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['yf_short_ratio_days'],
-    text=[f"{x:.2f}일" for x in df_main['yf_short_ratio_days']],
-    textposition='auto',
-    marker_color=colors_dtc,
-    hovertemplate='<b>%{x}</b><br>Days to Cover: %{y:.2f}일<br>청산 소요 기간<extra></extra>'
-))
-
-fig1.add_hline(y=3, line_dash="dash", line_color="green", annotation_text="정상 (3일)")
-fig1.add_hline(y=5, line_dash="dash", line_color="orange", annotation_text="주의 (5일)")
-fig1.add_hline(y=7, line_dash="dash", line_color="red", annotation_text="위험 (7일)")
-
-fig1.update_layout(
-    title='Days to Cover (Short Ratio): 공매도 청산 소요 일수 - Short Squeeze 핵심 지표',
-    height=550,
-    template='plotly_white',
-    xaxis_title='종목',
-    yaxis_title='Days to Cover (일)'
-)
+fig1 = get_overview_figure('dtc', chart_version, snapshot_days, _df_main=df_main)
 
 st.plotly_chart(fig1, use_container_width=True)
 
@@ -573,31 +518,7 @@ with st.expander("💡 Short % of Float 해석", expanded=False):
     - Float <5% + DTC <3일 = ✅ 안정적 종목
     """)
 
-fig2 = go.Figure()
-
-colors_float = ['green' if x < 2 else 'yellowgreen' if x < 5 else 'orange' if x < 10 else 'red'
-               for x in df_main['yf_short_percent_float']]
-
-fig2.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['yf_short_percent_float'],
-    text=[f"{x:.2f}%" for x in df_main['yf_short_percent_float']],
-    textposition='auto',
-    marker_color=colors_float,
-    hovertemplate='<b>%{x}</b><br>Short % Float: %{y:.2f}%<extra></extra>'
-))
-
-fig2.add_hline(y=2, line_dash="dash", line_color="green", annotation_text="매우 낮음 (2%)")
-fig2.add_hline(y=5, line_dash="dash", line_color="yellowgreen", annotation_text="정상 (5%)")
-fig2.add_hline(y=10, line_dash="dash", line_color="red", annotation_text="높음 (10%)")
-
-fig2.update_layout(
-    title='Short % of Float: 유통주식 대비 공매도 비율',
-    xaxis_title='종목',
-    yaxis_title='Short % of Float (%)',
-    height=550,
-    template='plotly_white'
-)
+fig2 = get_overview_figure('short_float', chart_version, snapshot_days, _df_main=df_main)
 
 st.plotly_chart(fig2, use_container_width=True)
 
@@ -624,39 +545,7 @@ with st.expander("💡 DP Ratio (Dark Pool 비중) 해석", expanded=False):
     - DP Ratio <40% = 정상 시장, 기관 개입 낮음
     """)
 
-fig2_1 = go.Figure()
-
-colors_dp = []
-for x in df_main['dp_ratio']:
-    if x < 40:
-        colors_dp.append('green')
-    elif x < 50:
-        colors_dp.append('yellowgreen')
-    elif x < 60:
-        colors_dp.append('orange')
-    else:
-        colors_dp.append('red')
-
-fig2_1.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['dp_ratio'],
-    text=[f"{x:.1f}%" for x in df_main['dp_ratio']],
-    textposition='auto',
-    marker_color=colors_dp,
-    hovertemplate='<b>%{x}</b><br>DP Ratio: %{y:.2f}%<br>장외 거래 비중<extra></extra>'
-))
-
-fig2_1.add_hline(y=40, line_dash="dash", line_color="green", annotation_text="정상 (40%)")
-fig2_1.add_hline(y=50, line_dash="dash", line_color="orange", annotation_text="과열 (50%)")
-fig2_1.add_hline(y=60, line_dash="dash", line_color="red", annotation_text="극도과열 (60%)")
-
-fig2_1.update_layout(
-    title='DP Ratio (Dark Pool 비중): 전체 시장 대비 장외 거래 비중',
-    height=550,
-    template='plotly_white',
-    xaxis_title='종목',
-    yaxis_title='DP Ratio (%)'
-)
+fig2_1 = get_overview_figure('dp_ratio', chart_version, snapshot_days, _df_main=df_main)
 
 st.plotly_chart(fig2_1, use_container_width=True)
 
@@ -685,46 +574,7 @@ with st.expander("💡 4가지 지표 종합 비교", expanded=False):
     - DP Internal 높음 + FINRA/YF 낮음 = 청산 시작 (기회!)
     """)
 
-fig3 = go.Figure()
-
-fig3.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['dp_short_ratio'],
-    name='DP Internal Short',
-    marker_color='darkblue',
-    text=df_main['dp_short_ratio'].round(1),
-    textposition='auto'
-))
-
-fig3.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['dp_short_market_impact'],
-    name='DP Market Impact',
-    marker_color='gray',
-    text=df_main['dp_short_market_impact'].round(1),
-    textposition='auto'
-))
-
-fig3.add_trace(go.Bar(
-    x=df_main['ticker'],
-    y=df_main['finra_yf_short_ratio'],
-    name='FINRA/YF Ratio (신선도)',
-    marker_color='purple',
-    text=df_main['finra_yf_short_ratio'].round(1),
-    textposition='auto'
-))
-
-fig3.add_hline(y=50, line_dash="dash", line_color="orange", annotation_text="50% 기준")
-
-fig3.update_layout(
-    title='공매도 종합 비교: DP Internal vs Market Impact vs 신선도',
-    barmode='group',
-    height=550,
-    template='plotly_white',
-    xaxis_title='종목',
-    yaxis_title='비율 (%)',
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-)
+fig3 = get_overview_figure('short_comparison', chart_version, snapshot_days, _df_main=df_main)
 
 st.plotly_chart(fig3, use_container_width=True)
 
@@ -751,42 +601,7 @@ with st.expander("💡 2D 위험도 분석", expanded=False):
     **버블 색상** = Days to Cover (빨간색일수록 위험)
     """)
 
-fig4 = go.Figure()
-
-fig4.add_trace(go.Scatter(
-    x=df_main['yf_short_percent_float'],
-    y=df_main['yf_short_ratio_days'],
-    mode='markers+text',
-    text=df_main['ticker'],
-    textposition='top center',
-    marker=dict(
-        size=df_main['dp_short_ratio'] * 1.2,
-        color=df_main['yf_short_ratio_days'],
-        colorscale='RdYlGn_r',
-        showscale=True,
-        colorbar=dict(title="Days to Cover"),
-        line=dict(width=1, color='black')
-    ),
-    hovertemplate='<b>%{text}</b><br>Float: %{x:.2f}%<br>DTC: %{y:.2f}일<extra></extra>'
-))
-
-fig4.add_vline(x=10, line_dash="dot", line_color="gray", line_width=2)
-fig4.add_hline(y=5, line_dash="dot", line_color="gray", line_width=2)
-
-fig4.add_annotation(x=15, y=8, text="<b>🔥 극도 위험<br>Squeeze Zone</b>",
-                  showarrow=False, font=dict(color="darkred", size=12),
-                  bgcolor="rgba(255,200,200,0.3)", bordercolor="red", borderwidth=2, borderpad=4)
-fig4.add_annotation(x=3, y=2, text="<b>💚 안정적<br>Safe Zone</b>",
-                  showarrow=False, font=dict(color="darkgreen", size=12),
-                  bgcolor="rgba(200,255,200,0.3)", bordercolor="green", borderwidth=2, borderpad=4)
-
-fig4.update_layout(
-    title='Short Squeeze Risk Matrix: Float % vs Days to Cover',
-    xaxis_title='Short % of Float (%)',
-    yaxis_title='Days to Cover (일)',
-    height=600,
-    template='plotly_white'
-)
+fig4 = get_overview_figure('squeeze_matrix', chart_version, snapshot_days, _df_main=df_main)
 
 st.plotly_chart(fig4, use_container_width=True)
 
@@ -820,83 +635,27 @@ with st.expander("💡 기관 투자자 포지션 4분면 분석", expanded=Fals
     **버블 색상** = DP Short Ratio (빨간색일수록 약세)
     """)
 
-fig4_1 = go.Figure()
-
-fig4_1.add_trace(go.Scatter(
-    x=df_main['dp_ratio'],
-    y=df_main['dp_short_ratio'],
-    mode='markers+text',
-    text=df_main['ticker'],
-    textposition='top center',
-    marker=dict(
-        size=df_main['yf_short_ratio_days'] * 8,
-        color=df_main['dp_short_ratio'],
-        colorscale='RdYlGn_r',
-        showscale=True,
-        colorbar=dict(title="DP Short<br>Ratio (%)"),
-        line=dict(width=1, color='black'),
-        cmin=40,
-        cmax=60
-    ),
-    hovertemplate='<b>%{text}</b><br>DP Ratio: %{x:.1f}%<br>DP Short: %{y:.1f}%<br>DTC: ' + 
-                  df_main['yf_short_ratio_days'].round(2).astype(str) + '일<extra></extra>'
-))
-
-fig4_1.add_vline(x=50, line_dash="dot", line_color="gray", line_width=2)
-fig4_1.add_hline(y=50, line_dash="dot", line_color="gray", line_width=2)
-fig4_1.add_vline(x=40, line_dash="dash", line_color="lightgray", line_width=1)
-fig4_1.add_hline(y=45, line_dash="dash", line_color="lightgray", line_width=1)
-fig4_1.add_hline(y=55, line_dash="dash", line_color="lightgray", line_width=1)
-
-fig4_1.add_annotation(
-    x=60, y=60,
-    text="<b>🔴 기관 강한 약세<br>Active Short</b>",
-    showarrow=False,
-    font=dict(color="darkred", size=12),
-    bgcolor="rgba(255,200,200,0.3)",
-    bordercolor="red",
-    borderwidth=2,
-    borderpad=4
-)
+fig4_1 = get_overview_figure('position_matrix', chart_version, snapshot_days, _df_main=df_main)
 
-fig4_1.add_annotation(
-    x=60, y=40,
-    text="<b>💚 기관 매집<br>Accumulation</b>",
-    showarrow=False,
-    font=dict(color="darkgreen", size=12),
-    bgcolor="rgba(200,255,200,0.3)",
-    bordercolor="green",
-    borderwidth=2,
-    borderpad=4
-)
+st.plotly_chart(fig4_1, use_container_width=True)
 
-fig4_1.add_annotation(
-    x=35, y=50,
-    text="<b>⚪ 정상 범위<br>Normal Market</b>",
-    showarrow=False,
-    font=dict(color="gray", size=11),
-    bgcolor="rgba(240,240,240,0.3)",
-    bordercolor="gray",
-    borderwidth=1,
-    borderpad=4
-)
+# ==================== 차트 4-2: 장기 추세 (월별 롤업) ====================
 
-fig4_1.update_layout(
-    title='기관 포지션 매트릭스: DP Ratio vs DP Short Ratio<br><sub>버블 크기 = Days to Cover (Short Squeeze 위험도)</sub>',
-    xaxis_title='DP Ratio (%) - 장외 거래 비중',
-    yaxis_title='DP Short Ratio (%) - 장외 내부 공매도 비율',
-    height=650,
-    template='plotly_white',
-    xaxis=dict(range=[30, 70]),
-    yaxis=dict(range=[25, 65])
-)
+if horizon == "년":
+    st.markdown("---")
+    st.subheader(f"📊 Chart 4-2: 장기 추세 - {window_label(days_back)} 월별 DP 지표")
+    st.caption("월별 롤업: DP 비중·시장 영향은 시장 거래량, DP 내부 공매도는 FINRA 거래량 가중 평균")
 
-st.plotly_chart(fig4_1, use_container_width=True)
+    with st.spinner("📆 월별 롤업 로드 중..."):
+        rollups = get_rollups(tuple(MAG7_STOCKS.keys()), days_back)
+    fig4_2 = get_rollup_figure(data_version(rollups), days_back, _rollups=rollups)
+
+    st.plotly_chart(fig4_2, use_container_width=True)
 
 # ==================== 차트 5-6: 시계열 분석 + 종목별 해석 ====================
 
 st.markdown("---")
-st.subheader("📊 Chart 5-6: 전체 종목 시계열 분석 - 60일 트렌드")
+st.subheader(f"📊 Chart 5-6: 전체 종목 시계열 분석 - {window_label(days_back)} 트렌드")
 
 with st.expander("💡 시계열 차트 해석", expanded=False):
     st.markdown("""
@@ -917,109 +676,60 @@ with st.expander("💡 시계열 차트 해석", expanded=False):
     - 상단↑ + 중단↑ = 기관 분산
     """)
 
-# 종목 선택
-selected_ticker = st.selectbox(
-    "종목을 선택하세요:",
-    options=[item['ticker'] for item in analysis_results],
-    format_func=lambda x: f"{x} ({MAG7_STOCKS[x]})"
-)
-
-# 선택된 종목의 데이터 찾기
-selected_item = next((item for item in analysis_results if item['ticker'] == selected_ticker), None)
+@st.fragment
+def render_drilldown(panel, df_main, chart_version, days_back):
+    """종목별 시계열 드릴다운 — 종목을 바꾸면 페이지 전체가 아닌 이 부분만 다시 실행"""
+    # 종목 선택
+    selected_ticker = st.selectbox(
+        "종목을 선택하세요:",
+        options=panel['ticker'].unique().tolist(),
+        format_func=lambda x: f"{x} ({MAG7_STOCKS[x]})"
+    )
 
-if selected_item:
+    # 선택된 종목의 요약 행 + 히스토리
+    if selected_ticker not in df_main['ticker'].values:
+        return
+    selected_item = df_main.set_index('ticker', drop=False).loc[selected_ticker]
+    df_recent = ticker_history(panel, selected_ticker)
+    period_label = window_label(days_back)
+    
     ticker = selected_item['ticker']
     name = selected_item['name']
-    df_hist = selected_item['history']
     
     st.info(f"🔍 {ticker} ({name}) - DTC: {selected_item['yf_short_ratio_days']:.2f}일, Float: {selected_item['yf_short_percent_float']:.2f}%")
     
-    fig_ts = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
-        subplot_titles=(
-            f"{ticker} - Dark Pool 비중 Trend",
-            f"{ticker} - DP 내부 공매도 Trend + 10일 평균"
-        ),
-        vertical_spacing=0.12
-    )
-    
-    # 차트 1: DP 비중
-    fig_ts.add_trace(go.Scatter(
-        x=df_hist['date'],
-        y=df_hist['dp_ratio'],
-        mode='lines+markers',
-        name='DP 비중',
-        line=dict(color='blue', width=2),
-        showlegend=False,
-        hovertemplate='날짜: %{x}<br>DP비중: %{y:.2f}%<extra></extra>'
-    ), row=1, col=1)
-    
-    fig_ts.add_hline(y=50, line_dash="dot", line_color="red",
-                    annotation_text="과열 (50%)", row=1, col=1)
-    
-    # 차트 2: DP 내부 공매도 + 10일 평균
-    fig_ts.add_trace(go.Scatter(
-        x=df_hist['date'],
-        y=df_hist['dp_short_ratio'],
-        mode='lines+markers',
-        name='DP 내부 공매도',
-        line=dict(color='orange', width=2),
-        showlegend=False,
-        hovertemplate='DP Short: %{y:.2f}%<extra></extra>'
-    ), row=2, col=1)
-    
-    fig_ts.add_trace(go.Scatter(
-        x=df_hist['date'],
-        y=df_hist['dp_short_ratio_10d_avg'],
-        mode='lines',
-        name='10일 평균',
-        line=dict(color='gray', dash='dot', width=1.5),
-        showlegend=False,
-        hovertemplate='10일평균: %{y:.2f}%<extra></extra>'
-    ), row=2, col=1)
-    
-    fig_ts.add_hline(y=50, line_dash="dot", line_color="gray",
-                    annotation_text="분기점", row=2, col=1)
-    
-    # 급락/급등 구간 하이라이트
-    for i in range(1, len(df_hist)):
-        prev = df_hist.iloc[i-1]
-        curr = df_hist.iloc[i]
-        change = curr['dp_short_ratio'] - prev['dp_short_ratio']
-        
-        if change < -5:
-            fig_ts.add_vrect(
-                x0=prev['date'], x1=curr['date'],
-                fillcolor="green", opacity=0.15,
-                layer="below", line_width=0,
-                row=2, col=1
-            )
-        elif change > 5:
-            fig_ts.add_vrect(
-                x0=prev['date'], x1=curr['date'],
-                fillcolor="red", opacity=0.15,
-                layer="below", line_width=0,
-                row=2, col=1
-            )
-    
-    fig_ts.update_layout(
-        height=700,
-        title_text=f"📊 {ticker} ({name}) - 60일 트렌드 | DTC: {selected_item['yf_short_ratio_days']:.2f}일",
-        template='plotly_white',
-        hovermode='x unified'
+    # 차트 해상도 (장기 모드 기본값은 주간 — 수천 개 일별 행 대신 수백 개 롤업 행)
+    resolution = st.radio(
+        "차트 해상도", list(RESOLUTION_LABELS), index=1 if days_back > snapshot_days else 0,
+        format_func=RESOLUTION_LABELS.get, horizontal=True
     )
+    if resolution == 'daily':
+        if days_back > snapshot_days:
+            df_hist = get_long_history(selected_ticker, days_back, float(selected_item['yf_short_ratio_days']))
+            df_hist = ticker_history(df_hist, selected_ticker)
+        else:
+            df_hist = df_recent
+    else:
+        # 주간/월간은 추세 통계·급변 횟수도 롤업 행으로 계산 (장기 구간 일별 파티션을 읽지 않음)
+        df_hist = ticker_history(get_rollups((ticker,), days_back, resolution), ticker)
+
+    # 마감된 달이 아직 없는 등 기간 데이터가 비어 있으면 차트·트렌드 분석 생략
+    if df_hist.empty:
+        st.info(f"📭 {ticker} {period_label} {RESOLUTION_LABELS[resolution]} 데이터가 아직 없습니다.")
+        return
+    if resolution == 'daily':
+        fig_ts = get_history_figure(chart_version, ticker, days_back, _summary=selected_item, _history=df_hist)
+    else:
+        fig_ts = get_history_figure(data_version(df_hist), ticker, days_back, resolution,
+                                    _summary=selected_item, _history=df_hist)
     
-    fig_ts.update_xaxes(title_text="날짜", row=2, col=1)
-    fig_ts.update_yaxes(title_text="DP 비중 (%)", row=1, col=1)
-    fig_ts.update_yaxes(title_text="DP 내부 공매도 (%)", row=2, col=1)
-    
+
     st.plotly_chart(fig_ts, use_container_width=True)
     
-    # ==================== 60일 트렌드 종목별 해석 ====================
+    # ==================== 기간 트렌드 종목별 해석 ====================
     
     st.markdown("---")
-    st.subheader(f"📝 {ticker} ({name}) - 60일 트렌드 상세 분석")
+    st.subheader(f"📝 {ticker} ({name}) - {period_label} 트렌드 상세 분석")
     
     # 데이터 분석
     latest = df_hist.iloc[-1]
@@ -1027,21 +737,18 @@ if selected_item:
     
     dp_ratio_change = latest['dp_ratio'] - oldest['dp_ratio']
     dp_short_change = latest['dp_short_ratio'] - oldest['dp_short_ratio']
-    avg_dp_ratio = df_hist['dp_ratio'].mean()
-    avg_dp_short = df_hist['dp_short_ratio'].mean()
+    # 롤업 행은 기간별 거래일 수로 가중해 일별 평균과 맞춤
+    weights = df_hist['days'] if resolution != 'daily' else pd.Series(1.0, index=df_hist.index)
+    avg_dp_ratio = (df_hist['dp_ratio'] * weights).sum() / weights.sum()
+    avg_dp_short = (df_hist['dp_short_ratio'] * weights).sum() / weights.sum()
     
     # 급락/급등 구간 카운트
-    sharp_drop_count = 0
-    sharp_rise_count = 0
-    for i in range(1, len(df_hist)):
-        change = df_hist.iloc[i]['dp_short_ratio'] - df_hist.iloc[i-1]['dp_short_ratio']
-        if change < -5:
-            sharp_drop_count += 1
-        elif change > 5:
-            sharp_rise_count += 1
+    moves = sharp_moves(df_hist['dp_short_ratio'])
+    sharp_drop_count = int((moves < 0).sum())
+    sharp_rise_count = int((moves > 0).sum())
     
     # 최근 추세 (최근 10일)
-    recent_10d = df_hist.iloc[-10:]
+    recent_10d = df_recent.iloc[-10:]
     recent_trend = recent_10d['dp_short_ratio'].iloc[-1] - recent_10d['dp_short_ratio'].iloc[0]
     
     # 분석 결과 표시
@@ -1049,27 +756,27 @@ if selected_item:
     
     with col1:
         st.metric(
-            "60일 DP 비중 변화", 
+            f"{period_label} DP 비중 변화", 
             f"{latest['dp_ratio']:.1f}%",
             f"{dp_ratio_change:+.1f}%p"
         )
     
     with col2:
         st.metric(
-            "60일 DP Short 변화", 
+            f"{period_label} DP Short 변화", 
             f"{latest['dp_short_ratio']:.1f}%",
             f"{dp_short_change:+.1f}%p"
         )
     
     with col3:
         st.metric(
-            "평균 DP 비중 (60일)", 
+            f"평균 DP 비중 ({period_label})", 
             f"{avg_dp_ratio:.1f}%"
         )
     
     with col4:
         st.metric(
-            "평균 DP Short (60일)", 
+            f"평균 DP Short ({period_label})", 
             f"{avg_dp_short:.1f}%"
         )
     
@@ -1126,7 +833,8 @@ if selected_item:
         st.write("💚 **최근 급락** - 지난 10일간 공매도가 급감했습니다. 청산 진행 중.")
     
     # 급등/급락 이벤트
-    st.write(f"\n**4️⃣ 60일간 주요 이벤트:**")
+    move_basis = "" if resolution == 'daily' else f" ({RESOLUTION_LABELS[resolution]} 기준)"
+    st.write(f"\n**4️⃣ {period_label}간 주요 이벤트{move_basis}:**")
     st.write(f"- 🟢 공매도 급락 구간 (청산): **{sharp_drop_count}회**")
     st.write(f"- 🔴 공매도 급등 구간 (공격): **{sharp_rise_count}회**")
     
@@ -1145,14 +853,14 @@ if selected_item:
     # 현재 상태 평가
     current_dtc = selected_item['yf_short_ratio_days']
     current_float = selected_item['yf_short_percent_float']
-    current_dp_ratio = latest['dp_ratio']
-    current_dp_short = latest['dp_short_ratio']
+    current_dp_ratio = df_recent.iloc[-1]['dp_ratio']
+    current_dp_short = df_recent.iloc[-1]['dp_short_ratio']
     
     # 시나리오 판단
     if current_dtc > 5 and dp_short_change < -5:
         scenario = "🔥 **Short Squeeze 가능성**"
         evaluation = f"""
-        DTC {current_dtc:.2f}일로 높은 상태에서 60일간 공매도가 {abs(dp_short_change):.1f}%p 감소했습니다.
+        DTC {current_dtc:.2f}일로 높은 상태에서 {period_label}간 공매도가 {abs(dp_short_change):.1f}%p 감소했습니다.
         공매도 세력이 청산하기 시작했으나 아직 높은 잔고가 남아있어 연쇄 청산 가능성이 있습니다.
         
         **투자 전략**: 
@@ -1164,7 +872,7 @@ if selected_item:
         scenario = "💚 **기관 매집 시나리오**"
         evaluation = f"""
         DP 비중 {current_dp_ratio:.1f}%로 기관 개입이 높지만, DP Short {current_dp_short:.1f}%로 매수가 우세합니다.
-        60일간 공매도가 감소 추세로, 기관들이 조용히 매집 중일 가능성이 있습니다.
+        {period_label}간 공매도가 감소 추세로, 기관들이 조용히 매집 중일 가능성이 있습니다.
         
         **투자 전략**:
         - 중장기 관점에서 안정적 매수 기회
@@ -1174,7 +882,7 @@ if selected_item:
     elif current_dp_short > 55 and dp_short_change > 5:
         scenario = "🔴 **공매도 공격 진행**"
         evaluation = f"""
-        DP Short {current_dp_short:.1f}%로 높고, 60일간 {dp_short_change:.1f}%p 증가했습니다.
+        DP Short {current_dp_short:.1f}%로 높고, {period_label}간 {dp_short_change:.1f}%p 증가했습니다.
         기관들이 적극적으로 공매도 포지션을 늘리고 있어 하락 압력이 강화될 수 있습니다.
         
         **투자 전략**:
@@ -1187,7 +895,7 @@ if selected_item:
         scenario = "✅ **건강한 종목**"
         evaluation = f"""
         DTC {current_dtc:.2f}일, Float {current_float:.2f}%로 공매도 압력이 낮습니다.
-        60일 트렌드도 안정적이어서 건전한 거래 환경입니다.
+        {period_label} 트렌드도 안정적이어서 건전한 거래 환경입니다.
         
         **투자 전략**:
         - 펀더멘털 분석 기반 투자 적합
@@ -1221,47 +929,17 @@ if selected_item:
     투자 결정은 본인의 책임이며, 이 분석은 참고 자료일 뿐입니다.
     """)
 
+render_drilldown(panel, df_main, chart_version, days_back)
+
 # ==================== 최종 요약 및 인사이트 ====================
 
 st.markdown("---")
 st.header("✨ 최종 분석 요약 - 핵심 인사이트")
 
-# 1. Short Squeeze 고위험 종목
-squeeze_risk = df_main[(df_main['yf_short_ratio_days'] > 5) & (df_main['yf_short_percent_float'] > 10)]
-if not squeeze_risk.empty:
-    st.subheader("🔥 Short Squeeze 고위험 종목 (DTC >5일 & Float >10%)")
-    for _, row in squeeze_risk.iterrows():
-        dtc_change = "청산 중" if row['dp_short_change_pct'] < -5 else "유지" if abs(row['dp_short_change_pct']) < 5 else "증가 중"
-        st.write(f"**{row['ticker']}**: DTC {row['yf_short_ratio_days']:.2f}일, Float {row['yf_short_percent_float']:.2f}% - {dtc_change}")
-
-# 2. 청산 진행 중
-squeeze_starting = df_main[(df_main['yf_short_ratio_days'] > 5) & (df_main['dp_short_change_pct'] < -5)]
-if not squeeze_starting.empty:
-    st.subheader("🟢 청산 시작 종목 (DTC >5일 & DP Short 급락)")
-    for _, row in squeeze_starting.iterrows():
-        finra_status = "청산 진행" if row['finra_yf_short_ratio'] < 10 else "정상"
-        st.write(f"**{row['ticker']}**: {row['dp_short_change_pct']:+.2f}%p 급락, FINRA/YF {row['finra_yf_short_ratio']:.1f}% ({finra_status})")
-
-# 3. 신규 공매도 공격
-new_short_attack = df_main[(df_main['dp_short_change_pct'] > 5) & (df_main['finra_yf_short_ratio'] > 50)]
-if not new_short_attack.empty:
-    st.subheader("🔴 신규 공매도 공격 진행 (DP Short 급등 & FINRA/YF >50%)")
-    for _, row in new_short_attack.iterrows():
-        st.write(f"**{row['ticker']}**: {row['dp_short_change_pct']:+.2f}%p 급등, FINRA/YF {row['finra_yf_short_ratio']:.1f}%")
-
-# 4. 건강한 종목
-healthy = df_main[(df_main['yf_short_ratio_days'] < 3) & (df_main['yf_short_percent_float'] < 5)]
-if not healthy.empty:
-    st.subheader("✅ 건강한 종목 (DTC <3일 & Float <5%)")
-    for _, row in healthy.iterrows():
-        st.write(f"**{row['ticker']}**: DTC {row['yf_short_ratio_days']:.2f}일, Float {row['yf_short_percent_float']:.2f}%")
-
-# 5. 기관 매집 의심
-accumulation = df_main[(df_main['dp_ratio'] > 50) & (df_main['dp_short_ratio'] < 45)]
-if not accumulation.empty:
-    st.subheader("💚 기관 매집 가능성 (DP >50% & DP Short <45%)")
-    for _, row in accumulation.iterrows():
-        st.write(f"**{row['ticker']}**: DP {row['dp_ratio']:.1f}%, DP Short {row['dp_short_ratio']:.1f}%")
+for rule, lines in insight_lines(df_main):
+    st.subheader(rule['title'])
+    for line in lines:
+        st.write(line)
 
 # ==================== 하단 정보 ====================
 
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from darkpool.backtest import backtest_signals, dtc_matrix, forward_returns, signal_matrices
+from darkpool.metrics import attach_short_info, daily_metrics
+from darkpool.signals import DEFAULT_SIGNAL, signal_codes
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+DTC = {'AAA': 6.0, 'BBB': 2.0, 'CCC': 4.0}
+
+
+def market_fixture(days=40, seed=0):
+    """거래일 × 종목 FINRA 거래량 (BBB 는 사흘에 하루 파일에 없음, CCC 는 가끔 거래량 0) + 시장 거래량"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-02', periods=days)
+    total = pd.DataFrame(rng.integers(1_000, 100_000, (days, len(TICKERS))).astype(float),
+                         index=dates, columns=TICKERS)
+    short = (total * rng.uniform(0.2, 0.8, total.shape)).round()
+    total.loc[dates[::3], 'BBB'] = np.nan
+    short.loc[dates[::3], 'BBB'] = np.nan
+    total.loc[dates[5::7], 'CCC'] = 0.0
+    market_vol = total.fillna(0) * rng.uniform(1.5, 4.0, total.shape)
+    market_vol.loc[dates[4::11], 'AAA'] = 0.0
+    return short, total, market_vol
+
+
+def test_signal_matrices_match_live_signals():
+    short, total, market_vol = market_fixture()
+    finra_files = {
+        f"{d:%Y%m%d}": pd.DataFrame({'shortVolume': short.loc[d], 'totalVolume': total.loc[d]}).dropna()
+        for d in short.index
+    }
+    live = attach_short_info(daily_metrics(finra_files, market_vol, TICKERS),
+                             {t: {'short_ratio_days': v} for t, v in DTC.items()})
+
+    dtc = pd.DataFrame([DTC] * len(short.index), index=short.index)
+    metrics = signal_matrices(short, total, market_vol, dtc)
+    codes, ordered = signal_codes(pd.DataFrame({k: m.stack(future_stack=True) for k, m in metrics.items()}))
+    names = np.array([r['name'] for r in ordered] + [DEFAULT_SIGNAL], dtype=object)
+    backtest = pd.Series(names[codes], index=metrics['dp_short_ratio'].stack(future_stack=True).index)
+
+    live = live.set_index(['date', live['ticker'].astype(str)])
+    change = metrics['dp_short_change_pct'].stack(future_stack=True).dropna()
+    assert np.allclose(change.loc[live.index].to_numpy(), live['dp_short_change_pct'].to_numpy(), atol=1e-4)
+    assert (backtest.loc[live.index].to_numpy() == live['Signal'].astype(str).to_numpy()).all()
+    # 라이브 패널에 없는 칸(거래 없음)은 신호 입력도 비어 있음
+    assert len(change) == len(live)
+
+
+def test_forward_returns_enter_at_next_close():
+    dates = pd.bdate_range('2024-03-01', periods=6)
+    close = pd.DataFrame({'AAA': [100.0, 110.0, 99.0, 121.0, 88.0, 132.0]}, index=dates)
+
+    ret, low, high = forward_returns(close, 2)
+
+    # 신호일 t → t+1 종가 진입, t+3 종가 청산; 보유 중 최저/최고는 t+2 ~ t+3 종가
+    assert ret['AAA'].iloc[0] == pytest.approx((121.0 / 110.0 - 1) * 100)
+    assert low['AAA'].iloc[0] == pytest.approx((99.0 / 110.0 - 1) * 100)
+    assert high['AAA'].iloc[0] == pytest.approx((121.0 / 110.0 - 1) * 100)
+    assert ret['AAA'].iloc[2] == pytest.approx((132.0 / 121.0 - 1) * 100)
+    # 진입 후 horizon 거래일을 채울 수 없는 마지막 horizon + 1 일은 NaN
+    assert ret['AAA'].iloc[3:].isna().all()
+
+
+def test_dtc_is_used_only_from_its_publication_date():
+    dates = pd.bdate_range('2024-03-01', periods=10)
+    tables = {
+        dates[3]: pd.DataFrame({'days_to_cover': [8.0, 2.0]}, index=['AAA', 'BBB']),
+        dates[7]: pd.DataFrame({'days_to_cover': [1.0]}, index=['AAA'])
+    }
+
+    dtc = dtc_matrix(tables, dates, ['AAA', 'BBB'])
+
+    assert dtc.loc[dates[:3]].isna().all().all()
+    assert (dtc.loc[dates[3:7], 'AAA'] == 8.0).all()
+    assert (dtc.loc[dates[7:], 'AAA'] == 1.0).all()
+    # 새 표에 없는 종목은 예전 값을 이어 쓰지 않음
+    assert dtc.loc[dates[7:], 'BBB'].isna().all()
+
+
+def test_backtest_signal_returns_follow_point_in_time_dtc():
+    dates = pd.bdate_range('2024-03-01', periods=10)
+    close = pd.DataFrame({'AAA': [100.0, 101.0, 102.0, 103.0, 104.0, 100.0, 95.0, 90.0, 91.0, 92.0]}, index=dates)
+    empty = pd.DataFrame(np.nan, index=dates, columns=['AAA'])
+    # DTC 8일 (극심한 공매도, 하락 방향) 표가 dates[4] 에 게시되고 dates[6] 에 2일로 바뀜
+    tables = {dates[4]: pd.DataFrame({'days_to_cover': [8.0]}, index=['AAA']),
+              dates[6]: pd.DataFrame({'days_to_cover': [2.0]}, index=['AAA'])}
+    metrics = {'dp_ratio': empty, 'dp_short_ratio': empty, 'dp_short_change_pct': empty,
+               'yf_short_ratio_days': dtc_matrix(tables, dates, ['AAA'])}
+
+    summary = backtest_signals(metrics, close, horizons=(1,)).set_index('signal')
+
+    extreme = summary.loc['🔴🔴 극심한 공매도 (7일+)']
+    # 신호일은 dates[4], dates[5] 뿐 → 진입 dates[5]/dates[6] 종가, 1거래일 뒤 청산
+    returns = [(95.0 / 100.0 - 1) * 100, (90.0 / 95.0 - 1) * 100]
+    assert extreme['events'] == 2
+    assert extreme['avg_return'] == pytest.approx(round(np.mean(returns), 2))
+    assert extreme['hit_rate'] == 100.0
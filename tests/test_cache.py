@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from darkpool.cache import SharedCache, SQLiteCacheBackend, cached
+
+
+def wait_refreshed(cache, timeout=5):
+    deadline = time.time() + timeout
+    while cache.is_refreshing() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite')) if request.param == 'sqlite' else None
+    return SharedCache(backend)
+
+
+def test_swr_keeps_stale_entry_when_refresh_returns_empty(cache):
+    results = iter([('panel', 'table'), (None, None)])
+
+    @cached(ttl=0, cache=cache, validate=lambda result: result[1] is not None)
+    def analysis():
+        return next(results)
+
+    assert analysis() == ('panel', 'table')
+    # 만료 → 기존 값 반환 + 백그라운드 갱신 (실패 결과)
+    assert analysis() == ('panel', 'table')
+    wait_refreshed(cache)
+    assert analysis() == ('panel', 'table')
+
+    # 공유 백엔드도 덮어쓰지 않음 (다른 프로세스의 새 캐시가 같은 값을 읽음)
+    if cache.backend is not None:
+        other = SharedCache(cache.backend)
+        assert other.get(next(iter(cache._entries)), lambda: None, ttl=3600) == ('panel', 'table')
+
+
+def test_swr_replaces_entry_when_refresh_is_valid(cache):
+    results = iter(['old', 'new'])
+
+    @cached(ttl=0, cache=cache, validate=lambda result: result is not None)
+    def load():
+        return next(results)
+
+    assert load() == 'old'
+    assert load() == 'old'
+    wait_refreshed(cache)
+    assert cache.get(next(iter(cache._entries)), lambda: None, ttl=3600) == 'new'
+
+
+def test_invalid_first_load_is_returned_but_not_stored(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    assert cache.get('key', loader, validate=lambda result: result is not None) is None
+    assert cache.get('key', loader, validate=lambda result: result is not None) is None
+    assert len(calls) == 2
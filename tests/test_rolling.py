@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from darkpool.metrics import daily_metrics
+from darkpool.rolling import RollingMetricsStore
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+
+
+@pytest.fixture
+def finra_files():
+    """45 거래일 (보관 용량 20 을 두 번 넘게 순환) — BBB 는 나흘에 하루, CCC 는 앞 12일 동안 거래 없음"""
+    rng = np.random.default_rng(7)
+    files = {}
+    for i, d in enumerate(pd.bdate_range('2024-01-02', periods=45)):
+        symbols = [t for t in TICKERS if not (t == 'BBB' and i % 4 == 0) and not (t == 'CCC' and i < 12)]
+        total = rng.integers(1_000, 100_000, len(symbols)).astype(float)
+        files[f"{d:%Y%m%d}"] = pd.DataFrame({'shortVolume': (total * rng.uniform(0.2, 0.8, len(symbols))).round(),
+                                             'totalVolume': total}, index=pd.Index(symbols, dtype=object))
+    return files
+
+
+def metrics_panel(files):
+    """시장 거래량은 모든 칸에 충분히 크게 (거래가 없는 칸은 FINRA 파일에서만 빠짐)"""
+    volumes = pd.DataFrame(1e9, index=pd.to_datetime(list(files), format='%Y%m%d'), columns=TICKERS)
+    panel = daily_metrics(files, volumes, TICKERS)
+    panel['ticker'] = panel['ticker'].astype(str)
+    return panel
+
+
+def reference(files, window):
+    panel = metrics_panel(files)
+    panel['avg'] = (panel.groupby('ticker')['dp_short_ratio']
+                    .transform(lambda s: s.rolling(window, min_periods=1).mean()))
+    return panel
+
+
+def push_all(store, files, upto=None):
+    for d, df in list(files.items())[:upto]:
+        store.push(d, (df['shortVolume'] / df['totalVolume'] * 100).round(2))
+
+
+@pytest.mark.parametrize('upto', [9, 20, 21, 33, 45])
+def test_ring_buffer_wraparound_matches_daily_metrics(finra_files, upto):
+    store = RollingMetricsStore(window=10, capacity=20)
+    push_all(store, finra_files, upto)
+
+    panel = metrics_panel(dict(list(finra_files.items())[:upto]))
+    latest = panel.groupby('ticker').tail(1).set_index('ticker')
+    snapshot = store.snapshot(latest_only=False).loc[latest.index]
+
+    assert np.allclose(snapshot['rolling_mean'], latest['dp_short_ratio_10d_avg'])
+    assert np.allclose(snapshot['change'], latest['dp_short_change_pct'])
+
+
+@pytest.mark.parametrize('window', [5, 15, 20])
+def test_other_windows_after_wraparound(finra_files, window):
+    store = RollingMetricsStore(window=10, capacity=20)
+    push_all(store, finra_files)
+    expected = reference(finra_files, window).groupby('ticker').tail(1).set_index('ticker')['avg']
+
+    assert np.allclose(pd.Series(store.rolling_mean(window), index=store.symbols)[expected.index], expected)
+    assert store.set_window(window)
+    assert np.allclose(store.snapshot(latest_only=False)['rolling_mean'][expected.index], expected)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from darkpool.signals import assign_labels, assign_signals
+
+BOUNDARIES = [-5.01, -5.0, -4.99, 0.0, 4.99, 5.0, 5.01, np.nan]
+
+
+def original_squeeze_state(change):
+    """기존 if/elif 판정 (NaN 은 모든 비교가 거짓)"""
+    return "청산 중" if change < -5 else "유지" if abs(change) < 5 else "증가 중"
+
+
+def original_signal(row):
+    if row['yf_short_ratio_days'] > 5 and row['dp_short_change_pct'] < -5:
+        return '🔥 Short Squeeze 임박!'
+    if row['dp_short_change_pct'] < -5:
+        return '🟢 급락 (청산 신호)'
+    if row['yf_short_ratio_days'] > 7:
+        return '🔴🔴 극심한 공매도 (7일+)'
+    if row['dp_ratio'] > 50 and row['dp_short_ratio'] > 55:
+        return '🔴 기관 강한 약세'
+    if row['dp_ratio'] > 50 and row['dp_short_ratio'] < 45:
+        return '💚 기관 매집 가능성'
+    if row['yf_short_ratio_days'] < 3:
+        return '✅ 건강 (DTC <3일)'
+    return '⚪ 관망/정상'
+
+
+@pytest.mark.parametrize('change', BOUNDARIES)
+def test_squeeze_state_boundaries(change):
+    labeled = assign_labels(pd.DataFrame({'dp_short_change_pct': [change], 'finra_yf_short_ratio': [20.0]}))
+    assert labeled['squeeze_state'].iloc[0] == original_squeeze_state(change)
+
+
+@pytest.mark.parametrize('ratio, expected', [(9.99, '청산 진행'), (10.0, '정상'), (np.nan, '정상')])
+def test_finra_status_boundaries(ratio, expected):
+    labeled = assign_labels(pd.DataFrame({'dp_short_change_pct': [0.0], 'finra_yf_short_ratio': [ratio]}))
+    assert labeled['finra_status'].iloc[0] == expected
+
+
+@pytest.mark.parametrize('dtc', [2.99, 3.0, 5.0, 5.01, 7.0, 7.01])
+@pytest.mark.parametrize('change', BOUNDARIES)
+@pytest.mark.parametrize('dp_ratio, dp_short_ratio', [(50.0, 60.0), (50.01, 55.0), (50.01, 55.01),
+                                                      (50.01, 45.0), (50.01, 44.99)])
+def test_signal_boundaries(dtc, change, dp_ratio, dp_short_ratio):
+    row = {'yf_short_ratio_days': dtc, 'dp_short_change_pct': change,
+           'dp_ratio': dp_ratio, 'dp_short_ratio': dp_short_ratio}
+    assert assign_signals(pd.DataFrame([row])).iloc[0] == original_signal(row)
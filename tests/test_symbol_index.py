@@ -0,0 +1,119 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from darkpool import symbol_index
+from darkpool.symbol_index import SymbolIndex
+
+DATES = [f"{d:%Y%m%d}" for d in pd.bdate_range('2024-01-02', periods=8)]
+
+
+def daily_file(i, symbols=('AAA', 'BBB')):
+    return pd.DataFrame({'shortVolume': [float(10 * i + k) for k in range(len(symbols))],
+                         'totalVolume': [float(100 * i + k) for k in range(len(symbols))]},
+                        index=pd.Index(list(symbols), dtype=object))
+
+
+def expected_short(symbol, days):
+    k = 0 if symbol == 'AAA' else 1
+    return [float(10 * i + k) for i in range(days)]
+
+
+def test_append_within_capacity_then_relocate(tmp_path):
+    index = SymbolIndex(str(tmp_path), initial_capacity=2)
+    index.update({DATES[i]: daily_file(i) for i in range(2)})
+    row = index.symbols.get_loc('AAA')
+    offset, size = index.offset[row], index.size
+    assert index.capacity[row] == 2
+
+    # 블록이 가득 차지 않았으면 제자리 추가, 가득 차면 두 배 용량으로 파일 끝에 이동
+    index.update({DATES[2]: daily_file(2)})
+    assert index.offset[row] >= size
+    assert index.offset[row] != offset
+    assert index.capacity[row] == 4
+    assert index.history('AAA')['shortVolume'].tolist() == expected_short('AAA', 3)
+    assert index.history('BBB')['shortVolume'].tolist() == expected_short('BBB', 3)
+
+    # 이미 반영된 날짜 이전은 추가하지 않음
+    assert not index.append(DATES[1], daily_file(1))
+
+
+def test_compact_switches_generation(tmp_path):
+    index = SymbolIndex(str(tmp_path), initial_capacity=2)
+    for i in range(5):
+        index.update({DATES[i]: daily_file(i)})
+    reader = SymbolIndex(str(tmp_path), initial_capacity=2)
+    old = reader.read('AAA')[1]
+    generation = index.generation
+
+    index.compact()
+
+    assert index.generation == generation + 1
+    assert index.size == int(np.maximum(index.length, 2).sum())
+    files = sorted(f for f in os.listdir(tmp_path) if f.endswith('.bin'))
+    assert files == sorted(f"{name}.{index.generation}.bin" for name in symbol_index.INDEX_COLUMNS)
+    # 이전 세대를 매핑한 다른 인스턴스의 슬라이스는 그대로 유효하고, 다음 읽기에서 새 세대로 전환
+    assert old.tolist() == expected_short('AAA', 5)
+    assert reader.history('AAA')['shortVolume'].tolist() == expected_short('AAA', 5)
+    assert reader.generation == index.generation
+
+    index.reset()
+    assert reader.read('AAA') is None
+    assert SymbolIndex(str(tmp_path)).last_date is None
+
+
+def test_matrix_window_slices_blocks(tmp_path):
+    index = SymbolIndex(str(tmp_path), initial_capacity=2)
+    for i in range(len(DATES)):
+        # CCC 는 홀수 날에만 거래
+        symbols = ('AAA', 'BBB', 'CCC') if i % 2 else ('AAA', 'BBB')
+        index.update({DATES[i]: daily_file(i, symbols)})
+
+    short, total = index.matrix(['CCC', 'AAA', 'ZZZ'], DATES[2], DATES[5])
+
+    assert list(short.index.strftime('%Y%m%d')) == DATES[2:6]
+    assert short['AAA'].tolist() == [10.0 * i for i in range(2, 6)]
+    assert short['CCC'].isna().tolist() == [True, False, True, False]
+    assert short['CCC'].dropna().tolist() == [10.0 * 3 + 2, 10.0 * 5 + 2]
+    assert short['ZZZ'].isna().all()
+    # 구간 합계 기준 순위 (CCC 는 하루만 있는 구간에서만 1위)
+    assert index.top_symbols(3, DATES[2], DATES[5]) == ['BBB', 'AAA', 'CCC']
+    assert index.top_symbols(3, DATES[3], DATES[3]) == ['CCC', 'BBB', 'AAA']
+
+
+@pytest.mark.skipif(symbol_index.fcntl is None, reason='프로세스 간 잠금은 fcntl 이 있는 플랫폼만')
+def test_read_while_writer_holds_lock(tmp_path):
+    writer = SymbolIndex(str(tmp_path))
+    writer.update({DATES[0]: daily_file(0)})
+    reader = SymbolIndex(str(tmp_path))
+
+    opened, release = threading.Event(), threading.Event()
+    loaded = {}
+
+    def hold_lock():
+        with writer._process_lock():
+            opened.set()
+            release.wait(5)
+
+    def open_fresh():
+        loaded['index'] = SymbolIndex(str(tmp_path))
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    opened.wait(5)
+    try:
+        # 이미 연 인스턴스는 커밋된 데이터를 잠금 없이 읽음
+        assert reader.history('AAA')['shortVolume'].tolist() == expected_short('AAA', 1)
+        # 새로 여는 인스턴스는 쓰기가 끝날 때까지 기다림 (열기 도중 이전 세대 파일이 지워지지 않도록)
+        opener = threading.Thread(target=open_fresh)
+        opener.start()
+        opener.join(0.3)
+        assert opener.is_alive()
+    finally:
+        release.set()
+        holder.join()
+    opener.join(5)
+    assert loaded['index'].last_date == DATES[0]